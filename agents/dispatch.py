@@ -0,0 +1,54 @@
+"""
+The agents wired to the intent router: one query in, one bilingual
+AgentResponse out. Used by app.py, the HTTP API (api.py) and the benchmarks.
+"""
+import config
+from agents.intent_classifier import train_from_file as train_intent_classifier
+from agents.location import extract_location
+from agents.market import get_market_price
+from agents.router import create_default_router
+from agents.weather import get_weather_forecast
+from services.rendering import AgentResponse, register_templates
+from services.tracing import span
+
+DEFAULT_LOCATION = 'indore'
+
+# Replies of the router itself, so they render in both languages without translation
+DISPATCH_TEMPLATES = {
+    "trigger_disease": {"en": "It sounds like you have a sick plant. *Please upload a photo of the affected leaf below.", "hi": "लगता है आपके पौधे में कोई बीमारी है। **कृपया नीचे प्रभावित पत्ती की तस्वीर अपलोड करें।*"},
+    "fallback_message": {"en": "I'm sorry, I can only help with market prices, weather, crop planning, and plant diseases.", "hi": "माफ़ कीजिए, मैं केवल बाजार भाव, मौसम, फसल योजना और पौधों की बीमारियों में मदद कर सकता हूँ।"},
+}
+register_templates(DISPATCH_TEMPLATES)
+
+# Built once per process: the local intent classifier (trained from
+# static/intent_examples.jsonl in milliseconds) with the compiled keyword router
+# as fallback. Each agent attaches its handler to an intent.
+intent_router = create_default_router(train_intent_classifier(), config.INTENT_MIN_CONFIDENCE, config.INTENT_MIN_MARGIN)
+intent_router.register("price", handler=lambda query, location: get_market_price(query, location))
+intent_router.register("weather", handler=lambda query, location: get_weather_forecast(location))
+intent_router.register("disease", handler=lambda query, location: AgentResponse("trigger_disease"))
+
+
+def run_agent(handler, query, intent=None):
+    """Runs an intent's handler on the query (None: the fallback reply); returns an AgentResponse."""
+    if handler is None:
+        return AgentResponse("fallback_message")
+    location = extract_location(query) or DEFAULT_LOCATION
+    with span(f"agent.{intent or 'unknown'}", location=location) as trace:
+        response = handler(query, location)
+        trace.set(template=response.template_id)
+        return response
+
+
+def answer_query(query):
+    """(intent, AgentResponse) for a query; the intent is None when no agent matched."""
+    with span("route_query") as trace:
+        query = query.lower()
+        intent, handler = intent_router.resolve(query)
+        trace.set(intent=intent)
+        return intent, run_agent(handler, query, intent)
+
+
+def route_query(query):
+    """Router that directs query to the correct agent; returns a bilingual AgentResponse."""
+    return answer_query(query)[1]
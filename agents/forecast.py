@@ -0,0 +1,177 @@
+"""
+Vectorized analytics over the full 5-day / 3-hour OpenWeather forecast.
+
+Every 3-hour slot of the payload is loaded into one pandas frame; daily
+statistics, precipitation, growing degree days and spray windows are then
+computed with column operations instead of Python loops.
+"""
+import numpy as np
+import pandas as pd
+
+from services.rendering import localized
+
+# --- Agronomic thresholds ---
+GDD_BASE_TEMP = 10.0          # °C, base temperature for growing degree days
+SPRAY_MAX_WIND = 4.2          # m/s (~15 km/h): above this, spray drifts
+SPRAY_MAX_POP = 0.2           # probability of precipitation in the slot
+SPRAY_TEMP_RANGE = (10.0, 30.0)
+SPRAY_DAY_HOURS = (6, 18)     # local hours; slots starting in [6, 18)
+HEAVY_RAIN_MM = 20.0          # daily total
+RAIN_LIKELY_POP = 0.6
+HEAT_STRESS_TEMP = 38.0
+COLD_STRESS_TEMP = 5.0
+
+WEEKDAYS_HI = ['सोमवार', 'मंगलवार', 'बुधवार', 'गुरुवार', 'शुक्रवार', 'शनिवार', 'रविवार']
+MONTHS_HI = ['जनवरी', 'फ़रवरी', 'मार्च', 'अप्रैल', 'मई', 'जून', 'जुलाई', 'अगस्त', 'सितंबर', 'अक्टूबर', 'नवंबर', 'दिसंबर']
+
+
+# --- Loading ---
+def forecast_frame(forecast_data):
+    """One row per 3-hour slot, indexed by local time (the city's UTC offset)."""
+    slots = forecast_data.get('list', [])
+    offset = pd.to_timedelta(forecast_data.get('city', {}).get('timezone', 0), unit='s')
+    frame = pd.DataFrame({
+        'time': pd.to_datetime([slot['dt'] for slot in slots], unit='s') + offset,
+        'temp': [slot['main']['temp'] for slot in slots],
+        'temp_min': [slot['main'].get('temp_min', slot['main']['temp']) for slot in slots],
+        'temp_max': [slot['main'].get('temp_max', slot['main']['temp']) for slot in slots],
+        'humidity': [slot['main'].get('humidity', np.nan) for slot in slots],
+        'wind_speed': [slot.get('wind', {}).get('speed', 0.0) for slot in slots],
+        'pop': [slot.get('pop', 0.0) for slot in slots],
+        'rain_mm': [slot.get('rain', {}).get('3h', 0.0) for slot in slots],
+        'weather_main': [slot.get('weather', [{}])[0].get('main', '') for slot in slots],
+    })
+    frame['date'] = frame['time'].dt.normalize()
+    return frame.set_index('time')
+
+
+# --- Aggregates ---
+def daily_summary(frame, gdd_base=GDD_BASE_TEMP):
+    """
+    Per-day min/max/mean temperature, total precipitation, chance of rain
+    (highest slot `pop` of the day) and growing degree days.
+    """
+    daily = frame.groupby('date').agg(
+        temp_min=('temp_min', 'min'),
+        temp_max=('temp_max', 'max'),
+        temp_mean=('temp', 'mean'),
+        rain_mm=('rain_mm', 'sum'),
+        rain_probability=('pop', 'max'),
+        humidity_mean=('humidity', 'mean'),
+        wind_max=('wind_speed', 'max'),
+        slots=('temp', 'size'),
+    )
+    daily['gdd'] = ((daily['temp_min'] + daily['temp_max']) / 2 - gdd_base).clip(lower=0)
+    return daily
+
+
+def next_hours(frame, hours=24):
+    """Temperature range, rain chance and rain total over the next `hours`."""
+    window = frame.iloc[:max(1, hours // 3)]
+    return {
+        'temp_min': float(window['temp_min'].min()),
+        'temp_max': float(window['temp_max'].max()),
+        # Highest slot `pop`, the same rule as the daily chance of rain
+        'rain_probability': float(window['pop'].max()) * 100,
+        'rain_mm': float(window['rain_mm'].sum()),
+    }
+
+
+def spray_windows(frame):
+    """
+    Daytime stretches of consecutive slots that are dry, calm and mild enough
+    to spray. Returns (start, end) local timestamps, end exclusive.
+    """
+    hours = frame.index.hour
+    suitable = (
+        (frame['pop'] < SPRAY_MAX_POP)
+        & (frame['rain_mm'] == 0)
+        & (frame['wind_speed'] < SPRAY_MAX_WIND)
+        & frame['temp'].between(*SPRAY_TEMP_RANGE)
+        & (hours >= SPRAY_DAY_HOURS[0]) & (hours < SPRAY_DAY_HOURS[1])
+    ).to_numpy()
+    if not suitable.any():
+        return []
+    # Label runs of consecutive suitable slots, splitting at day boundaries
+    new_day = np.r_[True, frame['date'].to_numpy()[1:] != frame['date'].to_numpy()[:-1]]
+    run_id = np.cumsum(~suitable | new_day)
+    times = frame.index[suitable]
+    runs = pd.Series(times, index=run_id[suitable]).groupby(level=0).agg(['min', 'max'])
+    return [(start, end + pd.Timedelta(hours=3)) for start, end in runs.itertuples(index=False)]
+
+
+def advisories(daily):
+    """Multi-day agricultural advisories; one localized line per triggered condition."""
+    lines = []
+    for date, day in daily.iterrows():
+        label = day_label(date)
+        if day['rain_mm'] >= HEAVY_RAIN_MM:
+            lines.append(localized(
+                f"⚠ {label['en']}: heavy rain ({day['rain_mm']:.0f} mm) - clear field drainage, delay sowing and fertilizer",
+                f"⚠ {label['hi']}: भारी बारिश ({day['rain_mm']:.0f} mm) - खेत से पानी निकासी की व्यवस्था करें, बुवाई और खाद टालें",
+            ))
+        elif day['rain_probability'] >= RAIN_LIKELY_POP:
+            lines.append(localized(
+                f"⚠ {label['en']}: rain likely ({day['rain_probability']:.0%}) - take crop protection measures, avoid spraying",
+                f"⚠ {label['hi']}: बारिश की संभावना ({day['rain_probability']:.0%}) - फसल संरक्षण के उपाय करें, छिड़काव न करें",
+            ))
+        if day['temp_max'] >= HEAT_STRESS_TEMP:
+            lines.append(localized(
+                f"🌡 {label['en']}: heat stress risk ({day['temp_max']:.0f}°C) - irrigate in the early morning or evening",
+                f"🌡 {label['hi']}: गर्मी से तनाव का खतरा ({day['temp_max']:.0f}°C) - सुबह जल्दी या शाम को सिंचाई करें",
+            ))
+        if day['temp_min'] <= COLD_STRESS_TEMP:
+            lines.append(localized(
+                f"❄ {label['en']}: frost/cold risk ({day['temp_min']:.0f}°C) - protect nurseries and light-irrigate in the evening",
+                f"❄ {label['hi']}: पाला/ठंड का खतरा ({day['temp_min']:.0f}°C) - नर्सरी को ढकें और शाम को हल्की सिंचाई करें",
+            ))
+    if not lines:
+        lines.append(localized(
+            "✅ Weather favorable - Continue normal farming activities",
+            "✅ मौसम अनुकूल है - सामान्य कृषि गतिविधियां जारी रखें",
+        ))
+    return lines
+
+
+# --- Localized labels ---
+def day_label(date):
+    """'Thu 06 Aug' / 'गुरुवार 06 अगस्त'."""
+    return localized(
+        date.strftime('%a %d %b'),
+        f"{WEEKDAYS_HI[date.weekday()]} {date.day:02d} {MONTHS_HI[date.month - 1]}",
+    )
+
+
+def daily_lines(daily):
+    """One localized outlook line per day."""
+    lines = []
+    for date, day in daily.iterrows():
+        label = day_label(date)
+        stats = f"{day['temp_min']:.0f}–{day['temp_max']:.0f}°C, {day['rain_mm']:.1f} mm ({day['rain_probability']:.0%})"
+        lines.append(localized(f"* {label['en']}: {stats}", f"* {label['hi']}: {stats}"))
+    return lines
+
+
+def spray_window_lines(windows, limit=3):
+    if not windows:
+        return [localized("* No suitable spray window in the next 5 days", "* अगले 5 दिनों में छिड़काव के लिए उपयुक्त समय नहीं है")]
+    lines = []
+    for start, end in windows[:limit]:
+        label = day_label(start)
+        hours = f"{start:%H:%M}–{end:%H:%M}"
+        lines.append(localized(f"* {label['en']} {hours}", f"* {label['hi']} {hours}"))
+    return lines
+
+
+def analyze(forecast_data):
+    """All template slots derived from the forecast payload."""
+    frame = forecast_frame(forecast_data)
+    daily = daily_summary(frame)
+    upcoming = next_hours(frame)
+    return {
+        **upcoming,
+        'daily_outlook': daily_lines(daily),
+        'gdd_total': float(daily['gdd'].sum()),
+        'spray_windows': spray_window_lines(spray_windows(frame)),
+        'advisory': advisories(daily),
+    }
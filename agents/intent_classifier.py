@@ -0,0 +1,116 @@
+"""
+Local intent classifier: a multinomial naive Bayes model over hashed word
+and character n-grams of English, Hindi and romanized Hindi text.
+
+Examples labelled "other" (greetings, schemes, sowing advice, ...) teach the
+model what none of the agents handles.
+
+Training is a single counting pass over static/intent_examples.jsonl, so the
+model is built in milliseconds at startup and needs no translation: a Hindi
+query is scored directly. Scoring a batch of queries is one gather and one
+segmented sum over the weight matrix.
+"""
+import json
+import os
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'intent_examples.jsonl')
+NUM_FEATURES = 2 ** 15
+CHAR_NGRAMS = (2, 3, 4)
+SMOOTHING = 0.1
+SHARPNESS = 3.0
+
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u097F]+")
+
+
+# --- Features ---
+def _hash(feature):
+    return zlib.crc32(feature.encode("utf-8")) % NUM_FEATURES
+
+
+def features(text):
+    """Hashed feature ids: words, word bigrams and character n-grams inside each word."""
+    tokens = TOKEN_PATTERN.findall(unicodedata.normalize("NFC", text).casefold())
+    grams = [f"w:{token}" for token in tokens]
+    grams += [f"b:{left} {right}" for left, right in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f"<{token}>"
+        for n in CHAR_NGRAMS:
+            grams += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    return [_hash(gram) for gram in grams]
+
+
+def _batch_features(texts):
+    """Feature ids of all texts concatenated, with each text's start offset and feature count."""
+    ids = [features(text) or [0] for text in texts]
+    lengths = np.array([len(row) for row in ids])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.fromiter((i for row in ids for i in row), dtype=np.int64), offsets, lengths
+
+
+# --- Model ---
+class IntentClassifier:
+    """
+    Length-normalized naive Bayes: a text's score for an intent is the mean
+    log-likelihood of its features under that intent, times `sharpness`.
+    Averaging (rather than summing) keeps long queries from producing
+    absurdly confident probabilities, so `min_confidence` thresholds mean
+    the same thing for a two-word and a twenty-word question.
+    """
+
+    def __init__(self, labels, weights, sharpness=SHARPNESS):
+        self.labels = list(labels)
+        self.weights = weights
+        self.sharpness = sharpness
+
+    @classmethod
+    def train(cls, texts, labels, smoothing=SMOOTHING):
+        classes = sorted(set(labels))
+        ids, offsets, lengths = _batch_features(texts)
+        label_ids = np.repeat([classes.index(label) for label in labels], lengths)
+        counts = np.full((len(classes), NUM_FEATURES), smoothing, dtype=np.float64)
+        np.add.at(counts, (label_ids, ids), 1.0)
+        weights = np.log(counts / counts.sum(axis=1, keepdims=True)).astype(np.float32)
+        return cls(classes, weights)
+
+    def predict_proba(self, texts):
+        """(N, n_intents) probabilities for a batch of texts, columns in `labels` order."""
+        ids, offsets, lengths = _batch_features(texts)
+        # Sum each text's feature log-likelihoods in one gather + segmented reduction
+        logits = np.add.reduceat(self.weights[:, ids], offsets, axis=1).T / lengths[:, None] * self.sharpness
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, texts):
+        """
+        [(intent, probability, margin)] for a batch of texts; `margin` is how far
+        the best intent's probability is ahead of the runner-up's.
+        """
+        probabilities = self.predict_proba(texts)
+        if probabilities.shape[1] < 2:
+            return [(self.labels[0], 1.0, 1.0) for _ in texts]
+        top_two = -np.partition(-probabilities, 1, axis=1)[:, :2]
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[i], float(top_two[row, 0]), float(top_two[row, 0] - top_two[row, 1]))
+                for row, i in enumerate(best)]
+
+
+def load_examples(path=EXAMPLES_PATH):
+    with open(path, encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+    return [example["text"] for example in examples], [example["intent"] for example in examples]
+
+
+def train_from_file(path=EXAMPLES_PATH):
+    """Trains on the labelled examples file; returns None (keyword routing only) if it cannot be read."""
+    try:
+        texts, labels = load_examples(path)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        print(f"[WARN] Intent classifier disabled, could not load {path}: {e}")
+        return None
+    return IntentClassifier.train(texts, labels)
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+from model.registry import register
+from services.tracing import span
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+CITIES_EN_PATH = os.path.join(STATIC_DIR, 'data.json')
+# {canonical name: Hindi name}
+CITIES_HI_PATH = os.path.join(STATIC_DIR, 'hinidData.json')
+# {canonical name: [extra names: Hindi names of cities missing above, transliterations, old names, misspellings]}
+CITY_ALIASES_PATH = os.path.join(STATIC_DIR, 'city_aliases.json')
+
+# Latin word characters plus the whole Devanagari block (its vowel signs are not \w)
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u097F]+")
+NER_CACHE_SIZE = 2048
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFC", text).casefold())
+
+
+# --- Location index ---
+class LocationIndex:
+    """
+    Word-level trie over every city name and alias (English, Hindi,
+    multi-word, transliterated), each mapped to its canonical name. A query is
+    matched in one left-to-right pass over its words, taking the longest name
+    at each position ("new delhi" beats "delhi"), so lookup cost depends on
+    the query length, not on the number of cities.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.canonical_names = set()
+
+    def add(self, name, canonical):
+        tokens = tokenize(name)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = canonical
+        self.canonical_names.add(canonical)
+
+    def find_all(self, text):
+        """Canonical names of all cities mentioned in `text`, in order of appearance."""
+        tokens = tokenize(text)
+        found = []
+        position = 0
+        while position < len(tokens):
+            node, match, match_end = self._root, None, position
+            for end in range(position, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], end + 1
+            if match is None:
+                position += 1
+            else:
+                found.append(match)
+                position = match_end
+        return found
+
+    def find(self, text):
+        """The first city mentioned in `text`, or None."""
+        found = self.find_all(text)
+        return found[0] if found else None
+
+    def __len__(self):
+        return len(self.canonical_names)
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error loading cities file {path}: {e}")
+        return default
+
+
+def build_location_index(cities_path=CITIES_EN_PATH, hindi_path=CITIES_HI_PATH, aliases_path=CITY_ALIASES_PATH):
+    """Index over the English cities list, their Hindi names and the alias table."""
+    index = LocationIndex()
+    names = {}
+    for canonical, hindi in _load_json(hindi_path, {}).items():
+        names.setdefault(canonical, []).append(hindi)
+    for canonical, variants in _load_json(aliases_path, {}).items():
+        names.setdefault(canonical, []).extend(variants)
+    canonical_of = {}
+    for canonical, variants in names.items():
+        for name in (canonical, *variants):
+            canonical_of[name.casefold()] = canonical
+            index.add(name, canonical)
+    for city in _load_json(cities_path, []):
+        if city.casefold() not in canonical_of:
+            index.add(city, city)
+    return index
+
+
+LOCATION_INDEX = build_location_index()
+
+
+# --- NER fallback ---
+def _load_spacy_ner():
+    import spacy
+    # Only the entity recognizer is needed (it has its own embedding layer in the
+    # en_core_web_sm pipeline), so skip the tagger, parser and lemmatizer entirely
+    return spacy.load("en_core_web_sm", exclude=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"])
+
+# Loaded on the first location lookup that needs NER, then shared by all sessions
+nlp_model = register("spacy_en_core_web_sm_ner", _load_spacy_ner)
+
+
+@lru_cache(maxsize=NER_CACHE_SIZE)
+def _ner_location(text):
+    nlp = nlp_model.get()
+    if nlp is None:
+        return None
+    for ent in nlp(text).ents:
+        if ent.label_ == "GPE":
+            return ent.text
+    return None
+
+
+def extract_location(text):
+    """
+    Canonical name of the first known city in `text` (English or Hindi). Falls
+    back to spaCy's place-name entities only when no known city matches;
+    those results are memoized per query text.
+    """
+    with span("extract_location") as trace:
+        city = LOCATION_INDEX.find(text)
+        if city is not None:
+            trace.set(source="index")
+            return city
+        trace.set(source="ner")
+        return _ner_location(text.strip())
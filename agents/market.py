@@ -0,0 +1,184 @@
+import re
+import threading
+
+import config
+from services.mandi_client import MandiPriceStore
+from services.price_history import open_price_history
+from services.rendering import AgentResponse, localized, register_templates
+from services.tracing import current_span
+
+COMMODITIES_URL = f"{config.MANDI_BASE_URL}/commodities"
+COMMODITY_URL = config.MANDI_BASE_URL + "/commodity/{slug}"
+
+# This dictionary maps keywords to the specific URL slugs on the website
+CROP_URL_SLUGS = {
+    "soybean": "soyabean-soyabean",
+    "soya bean": "soyabean-soyabean",
+    "सोयाबीन": "soyabean-soyabean",
+    "wheat": "wheat",
+    "gehu": "wheat",
+    "गेहूं": "wheat",
+    "cotton": "cotton-kapas",
+    "kapas": "cotton-kapas",
+    "कपास": "cotton-kapas"
+}
+
+# Display name per slug in both languages
+CROP_NAMES = {
+    "soyabean-soyabean": localized("Soybean", "सोयाबीन"),
+    "wheat": localized("Wheat", "गेहूं"),
+    "cotton-kapas": localized("Cotton", "कपास"),
+}
+
+# --- Localized templates ---
+MARKET_TEMPLATES = {
+    "market_price": {
+        "en": """Here are the live prices for *{crop}* in the *{location}* market:
+- *Min Price:* ₹{min_price:,.0f} / Quintal
+- *Max Price:* ₹{max_price:,.0f} / Quintal
+- *Modal (Average) Price:* ₹{modal_price:,.0f} / Quintal
+
+{trend}""",
+        "hi": """*{location}* मंडी में *{crop}* के लाइव भाव यहाँ दिए गए हैं:
+- *न्यूनतम मूल्य:* ₹{min_price:,.0f} / क्विंटल
+- *अधिकतम मूल्य:* ₹{max_price:,.0f} / क्विंटल
+- *औसत मूल्य:* ₹{modal_price:,.0f} / क्विंटल
+
+{trend}""",
+    },
+    "market_unknown_crop": {
+        "en": "I don't have a specific scraper for that crop yet. You can find a full list of all available commodities here:\n{url}",
+        "hi": "मेरे पास अभी उस फसल के लिए एक विशिष्ट स्क्रैपर नहीं है। आप सभी उपलब्ध जिंसों की पूरी सूची यहां देख सकते हैं:\n{url}",
+    },
+    "market_not_found": {
+        "en": "Could not find price data for {location} in the {crop} listings today. You can check all markets here: {url}",
+        "hi": "आज {crop} की सूची में {location} के लिए भाव नहीं मिले। आप सभी मंडियों के भाव यहां देख सकते हैं: {url}",
+    },
+    "market_error": {
+        "en": "Sorry, I couldn't fetch the live prices right now. You can check manually at this link:\n{url}",
+        "hi": "माफ़ कीजिए, मैं अभी लाइव भाव प्राप्त नहीं कर सका। आप इस लिंक पर स्वयं जांच सकते हैं:\n{url}",
+    },
+}
+register_templates(MARKET_TEMPLATES)
+
+# Week-over-week change (%) beyond which prices count as rising/falling
+TREND_THRESHOLD_PCT = 2.0
+NO_HISTORY = localized(
+    "_Price trends will appear here once a week of prices has been recorded._",
+    "_एक सप्ताह के भाव दर्ज होने के बाद यहाँ भाव का रुझान दिखेगा।_",
+)
+
+
+def find_crop_slug(query):
+    """Returns the URL slug of the first known crop mentioned in the query, or None."""
+    query = query.lower()
+    for keyword, slug in CROP_URL_SLUGS.items():
+        if keyword in query:
+            return slug
+    return None
+
+
+# One in-memory price store per process; each commodity page is fetched once per MANDI_PRICE_TTL
+# and every row is recorded in the local price history
+_market_store = None
+_market_store_lock = threading.Lock()
+
+def get_market_store():
+    """Process-wide MandiPriceStore and its price history, opened on first use rather than at import."""
+    global _market_store
+    if _market_store is None:
+        with _market_store_lock:
+            if _market_store is None:
+                history = open_price_history(config.MANDI_HISTORY_PATH)
+                _market_store = MandiPriceStore(CROP_URL_SLUGS.values(), history=history)
+    return _market_store
+
+
+_prefetch_lock = threading.Lock()
+_prefetched = False
+
+def prefetch_prices():
+    """Loads every known commodity page in the background (once per process)."""
+    global _prefetched
+    with _prefetch_lock:
+        if _prefetched:
+            return
+        _prefetched = True
+    get_market_store().prefetch(wait=False)
+
+
+def market_region(market):
+    """'Indore (Madhya Pradesh)' -> 'Madhya Pradesh'; None if the page gives no state."""
+    match = re.search(r"\(([^)]+)\)\s*$", market)
+    return match.group(1) if match else None
+
+
+def price_trend(slug, price):
+    """Localized "sell now or wait" lines from the recorded price history."""
+    price_history = get_market_store().history
+    if price_history is None:
+        return []
+    change = price_history.week_over_week(slug, price.market)
+    if change is None:
+        return [NO_HISTORY]
+    latest, week_ago, pct = change
+    average = price_history.moving_average(slug, price.market)["moving_average"].iloc[-1]
+    lines = [localized(
+        f"- *7-day average:* ₹{average:,.0f} | *Week-over-week:* {pct:+.1f}% (₹{week_ago:,.0f} → ₹{latest:,.0f})",
+        f"- *7 दिन का औसत:* ₹{average:,.0f} | *पिछले सप्ताह से:* {pct:+.1f}% (₹{week_ago:,.0f} → ₹{latest:,.0f})",
+    )]
+    if pct >= TREND_THRESHOLD_PCT and latest >= average:
+        lines.append(localized(
+            "📈 Prices are rising. If you can store the crop safely, waiting a few days may fetch more.",
+            "📈 भाव बढ़ रहे हैं। यदि आप फसल सुरक्षित रख सकते हैं, तो कुछ दिन रुकने पर अधिक दाम मिल सकता है।",
+        ))
+    elif pct <= -TREND_THRESHOLD_PCT:
+        lines.append(localized(
+            "📉 Prices are falling. Selling soon may be better than waiting.",
+            "📉 भाव गिर रहे हैं। इंतज़ार करने के बजाय जल्दी बेचना बेहतर हो सकता है।",
+        ))
+    else:
+        lines.append(localized("➖ Prices are steady this week.", "➖ इस सप्ताह भाव स्थिर हैं।"))
+
+    region = market_region(price.market)
+    best = price_history.best_market(slug, region=region, exclude=price.market) if region else None
+    if best is not None and best[1] > price.modal_price:
+        market, modal = best
+        lines.append(localized(
+            f"🏪 Best nearby market: *{market}* at ₹{modal:,.0f} / Quintal (modal)",
+            f"🏪 आसपास की सबसे अच्छी मंडी: *{market}*, ₹{modal:,.0f} / क्विंटल (औसत)",
+        ))
+    return lines
+
+
+def get_market_price(query, location='indore'):
+    """
+    Identifies a known crop from the user's query and looks up its live price.
+    If the crop is not recognized, it provides a link to the main commodities page.
+    Returns a bilingual AgentResponse.
+    """
+    crop_slug = find_crop_slug(query)
+    current_span().set(crop=crop_slug)
+            
+    # --- NEW, IMPROVED FALLBACK LOGIC ---
+    if not crop_slug:
+        return AgentResponse("market_unknown_crop", {"url": COMMODITIES_URL})
+
+    crop = CROP_NAMES[crop_slug]
+    URL = COMMODITY_URL.format(slug=crop_slug)
+    try:
+        price = get_market_store().lookup(crop_slug, location)
+    except Exception as e:
+        print(f"An error occurred during scraping: {e}")
+        return AgentResponse("market_error", {"url": URL})
+
+    if price is None:
+        return AgentResponse("market_not_found", {"crop": crop, "location": location.title(), "url": URL})
+    return AgentResponse("market_price", {
+        "crop": crop,
+        "location": location.title(),
+        "min_price": price.min_price,
+        "max_price": price.max_price,
+        "modal_price": price.modal_price,
+        "trend": price_trend(crop_slug, price),
+    })
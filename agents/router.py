@@ -0,0 +1,149 @@
+import re
+from collections import defaultdict
+
+from services.tracing import span
+
+# --- Default intents ---
+# {intent: {"en": [...], "hi": [...]}}; English keywords also match their plural (-s/-es)
+INTENT_KEYWORDS = {
+    "price": {
+        "en": ["price", "rate", "cost", "mandi", "bhav", "sell", "selling", "market price"],
+        "hi": ["भाव", "दाम", "कीमत", "मंडी", "रेट", "बेचना", "बेचें", "बाज़ार भाव", "बाजार भाव"],
+    },
+    "weather": {
+        "en": ["weather", "forecast", "temperature", "rain", "raining", "rainfall", "humidity", "mausam"],
+        "hi": ["मौसम", "तापमान", "बारिश", "बरसात", "वर्षा", "आर्द्रता", "पूर्वानुमान"],
+    },
+    "disease": {
+        "en": ["disease", "sick", "pest", "infection", "infected", "spots", "fungus", "blight", "rot", "insect", "diagnose"],
+        "hi": ["बीमारी", "रोग", "संक्रमण", "धब्बे", "बीमार", "कीट", "कीड़े", "फफूंद"],
+    },
+}
+# Words that hint at an intent but also appear in other questions ("leaf price")
+WEAK_KEYWORDS = {
+    "disease": {"en": ["leaf", "leaves", "plant", "ill", "yellow"], "hi": ["पत्ती", "पत्ते", "पौधा", "पौधे"]},
+}
+WEAK_WEIGHT = 0.5
+
+# A keyword must not be glued to other letters, Latin or Devanagari
+WORD_CHARS = r"\w\u0900-\u097F"
+
+
+# --- Compiled keyword router ---
+class IntentRouter:
+    """
+    Keyword intent router compiled into ONE regular expression over the
+    keywords of every intent (English and Hindi) with word boundaries, so
+    "ill" no longer matches "will". A query is scanned once and every intent
+    is scored at the same time; the highest score wins and ties go to the
+    intent registered first.
+
+    Agents plug in with `register(intent, keywords, handler=...)`; the
+    pattern is recompiled on registration, never per query.
+
+    With a `classifier` (agents.intent_classifier.IntentClassifier), its
+    prediction is used whenever it is at least `min_confidence` sure and at
+    least `min_margin` ahead of the runner-up intent, and the keywords decide
+    otherwise.
+    """
+
+    def __init__(self, classifier=None, min_confidence=0.7, min_margin=0.0):
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self._keywords = {}      # intent -> {keyword: weight}
+        self._handlers = {}
+        self._lookup = {}        # keyword -> [(intent, weight)]
+        self._pattern = None
+
+    @property
+    def intents(self):
+        return list(self._keywords)
+
+    def register(self, intent, keywords=(), weight=1.0, handler=None):
+        """Adds keywords (and optionally the handler) for an intent; registering again extends it."""
+        table = self._keywords.setdefault(intent, {})
+        for keyword in keywords:
+            table[keyword.casefold()] = weight
+        if handler is not None:
+            self._handlers[intent] = handler
+        self._compile()
+
+    def _compile(self):
+        lookup = defaultdict(list)
+        for intent, table in self._keywords.items():
+            for keyword, weight in table.items():
+                lookup[keyword].append((intent, weight))
+        self._lookup = dict(lookup)
+        alternatives = []
+        # Longest first, so "market price" wins over "price"
+        for keyword in sorted(self._lookup, key=len, reverse=True):
+            escaped = re.escape(keyword).replace(r"\ ", r"\s+")
+            alternatives.append(escaped + "(?:e?s)?" if keyword.isascii() else escaped)
+        self._pattern = re.compile(
+            rf"(?<![{WORD_CHARS}])(?:{'|'.join(alternatives)})(?![{WORD_CHARS}])"
+        ) if alternatives else None
+
+    def _keyword_of(self, match):
+        text = " ".join(match.split())
+        if text in self._lookup:
+            return text
+        # Plural of an English keyword
+        for suffix in ("es", "s"):
+            if text.endswith(suffix) and text[:-len(suffix)] in self._lookup:
+                return text[:-len(suffix)]
+        return None
+
+    def scores(self, query):
+        """{intent: score} for every registered intent."""
+        scores = dict.fromkeys(self._keywords, 0.0)
+        if self._pattern is None:
+            return scores
+        for match in self._pattern.findall(query.casefold()):
+            keyword = self._keyword_of(match)
+            for intent, weight in self._lookup.get(keyword, ()):
+                scores[intent] += weight
+        return scores
+
+    def classify_keywords(self, query):
+        """The best-scoring keyword intent, or None if no keyword matched."""
+        scores = self.scores(query)
+        best = max(scores, key=scores.get, default=None)
+        return best if best is not None and scores[best] > 0 else None
+
+    def classify_batch(self, queries):
+        """Intents (or None) for a batch of queries, scored by the classifier in one call."""
+        if self.classifier is None:
+            return [self.classify_keywords(query) for query in queries]
+        intents = []
+        for query, (intent, confidence, margin) in zip(queries, self.classifier.predict(queries)):
+            if confidence < self.min_confidence or margin < self.min_margin:
+                intents.append(self.classify_keywords(query))
+            else:
+                intents.append(intent if intent in self._keywords else None)
+        return intents
+
+    def classify(self, query):
+        return self.classify_batch([query])[0]
+
+    def resolve(self, query):
+        """(intent, handler) for a query; the handler is None if nothing matched or it has none."""
+        with span("classify_intent") as trace:
+            intent = self.classify(query)
+            trace.set(intent=intent)
+        return intent, self._handlers.get(intent)
+
+    def route(self, query, *args, **kwargs):
+        """Calls the handler of the query's intent; returns None if nothing matched or it has no handler."""
+        intent, handler = self.resolve(query)
+        return handler(query, *args, **kwargs) if handler else None
+
+
+def create_default_router(classifier=None, min_confidence=0.7, min_margin=0.0):
+    """Router with the built-in price/weather/disease keywords and no handlers attached."""
+    router = IntentRouter(classifier, min_confidence, min_margin)
+    for intent, keywords in INTENT_KEYWORDS.items():
+        router.register(intent, keywords["en"] + keywords["hi"])
+    for intent, keywords in WEAK_KEYWORDS.items():
+        router.register(intent, keywords["en"] + keywords["hi"], weight=WEAK_WEIGHT)
+    return router
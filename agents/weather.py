@@ -0,0 +1,181 @@
+import time
+
+import requests
+
+import config
+from agents.forecast import analyze
+from agents.location import LOCATION_INDEX
+from services.rendering import AgentResponse, localized, register_templates
+from services.tracing import span
+from services.weather_client import OpenWeatherClient, WeatherUnavailable
+
+# --- Localized vocabulary ---
+# Professional weather descriptions, keyed by OpenWeather's `weather.main`
+WEATHER_DESCRIPTIONS = {
+    'Clear': localized('Clear skies with excellent visibility', 'साफ आसमान, उत्कृष्ट दृश्यता'),
+    'Clouds': localized('Partly cloudy conditions', 'आंशिक रूप से बादल छाए रहेंगे'),
+    'Rain': localized('Rainy conditions expected', 'बारिश की संभावना है'),
+    'Thunderstorm': localized('Thunderstorm activity likely', 'आंधी-तूफान की संभावना है'),
+    'Drizzle': localized('Light drizzle expected', 'हल्की बूंदाबांदी की संभावना है'),
+    'Mist': localized('Misty conditions with reduced visibility', 'धुंधली स्थिति, कम दृश्यता'),
+    'Fog': localized('Foggy conditions with poor visibility', 'कोहरा, खराब दृश्यता'),
+    'Snow': localized('Snowfall expected', 'बर्फबारी की संभावना है'),
+}
+
+# Precomputed translations of OpenWeather's free-text `weather.description`,
+# used when `weather.main` has no hand-written description above
+DESCRIPTION_TRANSLATIONS_HI = {
+    'haze': 'धुंध',
+    'smoke': 'धुआँ',
+    'dust': 'धूल',
+    'sand': 'रेत भरी हवा',
+    'ash': 'ज्वालामुखीय राख',
+    'squalls': 'तेज़ झोंकेदार हवाएँ',
+    'tornado': 'बवंडर',
+    'sand/dust whirls': 'रेत/धूल के भंवर',
+}
+
+WIND_DIRECTIONS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+
+# --- Localized templates ---
+WEATHER_TEMPLATES = {
+    "weather_report": {
+        "en": """🌤 Detailed Weather Report for {location}
+
+Current Conditions:
+* Temperature: {temp}°C (Feels like: {feels_like}°C)
+* Weather: {description}
+* Humidity: {humidity}%
+* Pressure: {pressure} hPa
+* Wind: {wind_speed} km/h from {wind_dir}
+* Visibility: {visibility:.1f} km
+
+Sunrise/Sunset:
+* Sunrise: {sunrise}
+* Sunset: {sunset}
+
+24-Hour Forecast:
+* Temperature Range: {temp_min:.1f}°C - {temp_max:.1f}°C
+* Rain Probability: {rain_probability:.0f}%
+* Expected Rainfall: {rain_mm:.1f} mm
+
+5-Day Outlook (min–max, rainfall, chance of rain):
+{daily_outlook}
+* Growing degree days (base 10°C): {gdd_total:.0f}
+
+Best Spray Windows (dry, calm, daytime):
+{spray_windows}
+
+Agricultural Advisory:
+{advisory}""",
+        "hi": """🌤 {location} का विस्तृत मौसम विवरण
+
+वर्तमान स्थिति:
+* तापमान: {temp}°C (महसूस हो रहा: {feels_like}°C)
+* मौसम: {description}
+* आर्द्रता: {humidity}%
+* वायु दाब: {pressure} hPa
+* हवा: {wind_speed} km/h {wind_dir} दिशा से
+* दृश्यता: {visibility:.1f} km
+
+सूर्योदय/सूर्यास्त:
+* सूर्योदय: {sunrise}
+* सूर्यास्त: {sunset}
+
+24 घंटे का पूर्वानुमान:
+* तापमान सीमा: {temp_min:.1f}°C - {temp_max:.1f}°C
+* बारिश की संभावना: {rain_probability:.0f}%
+* अनुमानित वर्षा: {rain_mm:.1f} mm
+
+5 दिन का पूर्वानुमान (न्यूनतम–अधिकतम, वर्षा, बारिश की संभावना):
+{daily_outlook}
+* वृद्धि डिग्री दिवस (आधार 10°C): {gdd_total:.0f}
+
+छिड़काव का सबसे अच्छा समय (सूखा, शांत, दिन में):
+{spray_windows}
+
+कृषि सलाह:
+{advisory}""",
+    },
+    "weather_missing_key": {
+        "en": "Error: OpenWeather API key not found. Please set it in the .env file.",
+        "hi": "त्रुटि: OpenWeather API कुंजी नहीं मिली। कृपया इसे .env फ़ाइल में सेट करें।",
+    },
+    "weather_unavailable": {
+        "en": "Error: Could not retrieve weather data for {location}.",
+        "hi": "त्रुटि: {location} के लिए मौसम डेटा प्राप्त नहीं किया जा सका।",
+    },
+    "weather_network_error": {
+        "en": "A network error occurred: {error}",
+        "hi": "नेटवर्क त्रुटि हुई: {error}",
+    },
+}
+register_templates(WEATHER_TEMPLATES)
+
+
+def get_wind_direction(degrees):
+    """Wind direction helper: degrees to a 16-point compass label."""
+    index = round(degrees / 22.5) % 16
+    return WIND_DIRECTIONS[index]
+
+
+def describe_weather(weather_main, weather_desc):
+    """Localized description from the hand-written table, the precomputed translations, or English as-is."""
+    if weather_main in WEATHER_DESCRIPTIONS:
+        return WEATHER_DESCRIPTIONS[weather_main]
+    return localized(weather_desc, DESCRIPTION_TRANSLATIONS_HI.get(weather_desc.lower()))
+
+
+# Known cities (canonical names from the location index) are kept warm by the background refresher
+KNOWN_CITIES = {city.lower() for city in LOCATION_INDEX.canonical_names}
+
+
+def popular_cities():
+    """The most requested known cities, in order of demand."""
+    requested = weather_client.current_cache.most_requested()
+    return [city for city in requested if city in KNOWN_CITIES][:config.WEATHER_REFRESH_TOP_N]
+
+
+# One pooled, caching client per process, configured once at startup
+weather_client = OpenWeatherClient(popular_locations=popular_cities)
+
+
+def get_weather_forecast(location):
+    """Returns a comprehensive weather forecast as a bilingual AgentResponse."""
+    if not config.WEATHER_API_KEY:
+        return AgentResponse("weather_missing_key")
+
+    try:
+        # Current weather and 5-day forecast, fetched concurrently
+        current_data, forecast_data = weather_client.fetch(location)
+    except WeatherUnavailable as e:
+        print(f"Weather data unavailable for {location}: {e}")
+        return AgentResponse("weather_unavailable", {"location": location})
+    except requests.exceptions.RequestException as e:
+        return AgentResponse("weather_network_error", {"error": str(e)})
+
+    if not forecast_data.get('list'):
+        # An empty forecast has no range, rain or advisory to report
+        print(f"Weather data unavailable for {location}: empty forecast")
+        return AgentResponse("weather_unavailable", {"location": location})
+
+    # Daily statistics, rainfall, GDD and spray windows over the full 5-day payload
+    with span("weather.analyze", points=len(forecast_data.get('list', ()))):
+        forecast = analyze(forecast_data)
+    # Sunrise/sunset in the city's local time, not the server's
+    utc_offset = current_data.get('timezone', 0)
+
+    return AgentResponse("weather_report", {
+        "location": location,
+        "temp": current_data['main']['temp'],
+        "feels_like": current_data['main']['feels_like'],
+        "humidity": current_data['main']['humidity'],
+        "pressure": current_data['main']['pressure'],
+        "wind_speed": round(current_data['wind']['speed'] * 3.6, 1),  # m/s (units=metric) to km/h
+        "wind_dir": get_wind_direction(current_data['wind'].get('deg', 0)),
+        "description": describe_weather(current_data['weather'][0]['main'], current_data['weather'][0]['description']),
+        "visibility": current_data.get('visibility', 10000) / 1000,  # Convert to km
+        "sunrise": time.strftime('%H:%M', time.gmtime(current_data['sys']['sunrise'] + utc_offset)),
+        "sunset": time.strftime('%H:%M', time.gmtime(current_data['sys']['sunset'] + utc_offset)),
+        **forecast,
+    })
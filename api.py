@@ -0,0 +1,208 @@
+"""
+Headless HTTP API over the agents and the pest detector, for the SMS/IVR
+gateway and for app.py in client mode (INFERENCE_API_URL). A plain ASGI
+application with no framework; serve it with any ASGI server:
+
+    python -m api                                   # uvicorn, API_HOST:API_PORT, API_WORKERS processes
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints (JSON responses; "rendered" holds the reply in every language):
+    GET  /health
+    GET  /route?query=...                 -> {"intent", "template_id", "rendered"}
+    GET  /price?query=...&location=...    -> {"template_id", "rendered"}
+    GET  /weather?location=...            -> {"template_id", "rendered"}
+    POST /diagnose[?high_accuracy=1]      -> {"result", "template_id", "rendered"}   (body: image bytes)
+    GET  /metrics                         (Prometheus text, with TRACING_ENABLED=1)
+
+Each worker process loads the models once and shares them across requests.
+Blocking work runs on the shared agent pool (services/executor.py), under the
+same per-agent timeouts and concurrency limits as the chat UI; a worker sheds
+load with 503 once API_MAX_INFLIGHT requests are in progress.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import config
+from agents.dispatch import DEFAULT_LOCATION, answer_query
+from agents.location import nlp_model
+from agents.market import get_market_price, prefetch_prices as prefetch_market_prices
+from agents.weather import get_weather_forecast
+from model.pest_detector import diagnose_plant_disease, diagnosis_response, prewarm as prewarm_pest_detector
+from model.registry import get_load_metrics
+from services.executor import AgentBusy, get_executor
+from services.rendering import render_all
+from services.tracing import span, tracer
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --- Request helpers ---
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self._receive = receive
+        self.query = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+    def param(self, name, default=None):
+        value = self.query.get(name, default)
+        if value is None or not str(value).strip():
+            raise HTTPError(400, f"Missing query parameter '{name}'.")
+        return value
+
+    async def body(self, limit):
+        chunks, size = [], 0
+        while True:
+            message = await self._receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                raise HTTPError(413, f"Request body is larger than {limit} bytes.")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+
+def _json_default(value):
+    # numpy scalars in diagnosis results
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def send_response(send, status, body, content_type="application/json", headers=()):
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False, default=_json_default).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def call_agent(agent, fn, *args):
+    """Runs a blocking agent call on the shared pool and awaits it within the agent's timeout."""
+    executor = get_executor()
+    task = executor.submit(agent, fn, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(task.future), task.timeout)
+    except asyncio.TimeoutError:
+        executor.record_timeout(task)
+        raise HTTPError(504, f"'{agent}' did not answer within {task.timeout:.0f}s.")
+    except AgentBusy as e:
+        raise HTTPError(503, str(e))
+
+
+def rendered(response):
+    return {"template_id": response.template_id, "rendered": render_all(response)}
+
+
+# --- Endpoints ---
+async def health(request):
+    return {"status": "ok", "models": get_load_metrics()}
+
+
+async def route(request):
+    intent, response = await call_agent("route", answer_query, request.param("query"))
+    return {"intent": intent, **rendered(response)}
+
+
+async def price(request):
+    query = request.param("query")
+    return rendered(await call_agent("price", get_market_price, query, request.query.get("location") or DEFAULT_LOCATION))
+
+
+async def weather(request):
+    return rendered(await call_agent("weather", get_weather_forecast, request.param("location")))
+
+
+async def diagnose(request):
+    image = await request.body(config.API_MAX_UPLOAD_BYTES)
+    if not image:
+        raise HTTPError(400, "Send the image bytes as the request body.")
+    # Unset follows PEST_HIGH_ACCURACY; 1/0 forces test-time augmentation on or off
+    high_accuracy = request.query.get("high_accuracy")
+    if high_accuracy is not None:
+        high_accuracy = high_accuracy.lower() in ("1", "true", "yes")
+    result = await call_agent("diagnose", diagnose_plant_disease, image, high_accuracy)
+    return {"result": result.to_dict(), **rendered(diagnosis_response(result))}
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/route"): route,
+    ("GET", "/price"): price,
+    ("GET", "/weather"): weather,
+    ("POST", "/diagnose"): diagnose,
+}
+
+
+# --- ASGI application ---
+def startup():
+    """Per worker: start loading the models and fetching prices before the first request."""
+    prewarm_pest_detector()
+    prefetch_market_prices()
+    nlp_model.prewarm()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            get_executor().shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+_inflight = 0
+
+async def app(scope, receive, send):
+    global _inflight
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    path = scope["path"].rstrip("/") or "/"
+    if path == "/metrics" and tracer.enabled:
+        return await send_response(send, 200, tracer.prometheus_text().encode(), "text/plain; version=0.0.4")
+    handler = ROUTES.get((scope["method"], path))
+    if handler is None:
+        known = any(route_path == path for _, route_path in ROUTES)
+        return await send_response(send, 405 if known else 404, {"error": "Method not allowed." if known else "Not found."})
+    if _inflight >= config.API_MAX_INFLIGHT:
+        return await send_response(send, 503, {"error": "Server busy, retry shortly."}, headers=[(b"retry-after", b"1")])
+
+    _inflight += 1
+    try:
+        with span(f"api{path.replace('/', '.')}", method=scope["method"]) as trace:
+            try:
+                payload = await handler(Request(scope, receive))
+                status = 200
+            except HTTPError as e:
+                payload, status = {"error": e.message}, e.status
+            except Exception as e:
+                print(f"[WARN] {scope['method']} {path} failed: {e}")
+                payload, status = {"error": "Internal error."}, 500
+            trace.set(status=status)
+        await send_response(send, status, payload)
+    finally:
+        _inflight -= 1
+
+
+def main():
+    import uvicorn
+
+    uvicorn.run("api:app", host=config.API_HOST, port=config.API_PORT, workers=config.API_WORKERS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
-import requests
-from dotenv import load_dotenv
-import os
-import json
-import re
+import uuid
+
 import streamlit as st
-import spacy
-from googletrans import Translator
-import time
-from bs4 import BeautifulSoup
+# Settings (incl. .env) are read once, before any module below reads its configuration
+import config
 # --- IMPORT THE REAL DIAGNOSIS FUNCTION ---
-from model.pest_detector import diagnose_plant_disease
+# (cheap import: the classifier itself is loaded lazily and shared process-wide)
+from model.pest_detector import diagnose_plant_disease, diagnosis_response, prewarm as prewarm_pest_detector
+from model.registry import get_load_metrics
+from services.translation import get_translation_service
+from services.rendering import AgentResponse, register_templates, render_all
+from agents.location import nlp_model
+from agents.market import prefetch_prices as prefetch_market_prices
+from agents.dispatch import DISPATCH_TEMPLATES, intent_router, run_agent
+from services.executor import get_executor
+from services.api_client import get_inference_client
+from services.chat_history import ChatHistory, get_chat_archive
+from services.tracing import span, start_metrics_server, tracer
 
 # --- 1. TEXT & LOCALIZATION ---
 TEXT = {
@@ -17,9 +23,9 @@ TEXT = {
     "page_icon": "🌿",
     "main_chat_placeholder": {"en": "Or ask me anything directly...", "hi": "या मुझसे सीधे कुछ भी पूछें..."},
     "welcome_message": {"en": "Hello, farmer! How can I help you today?", "hi": "नमस्ते किसान! मैं आपकी कैसे मदद कर सकता हूँ?"},
-    "trigger_disease": {"en": "It sounds like you have a sick plant. *Please upload a photo of the affected leaf below.", "hi": "लगता है आपके पौधे में कोई बीमारी है। **कृपया नीचे प्रभावित पत्ती की तस्वीर अपलोड करें।*"},
+    "trigger_disease": DISPATCH_TEMPLATES["trigger_disease"],
     "trigger_upload_check": {"en": "upload a photo", "hi": "तस्वीर अपलोड करें"},
-    "fallback_message": {"en": "I'm sorry, I can only help with market prices, weather, crop planning, and plant diseases.", "hi": "माफ़ कीजिए, मैं केवल बाजार भाव, मौसम, फसल योजना और पौधों की बीमारियों में मदद कर सकता हूँ।"},
+    "fallback_message": DISPATCH_TEMPLATES["fallback_message"],
     "crop_planner_title": {"en": "Crop Planner(Coming Soon)", "hi": "फसल योजनाकार(जल्द आ रहा है)"},
     "crop_planner_desc": {"en": "What should I grow?", "hi": "मुझे क्या उगाना चाहिए?"},
     "water_manage_title": {"en": "Weather Condition", "hi": "मौसम की स्थिति"},
@@ -42,310 +48,86 @@ TEXT = {
     "app_intro": {"en": "Ask me about crop prices, weather, or upload a photo of a sick plant!", "hi": "मुझसे फसल की कीमतों, मौसम के बारे में पूछें, या किसी बीमार पौधे की तस्वीर अपलोड करें!"},
     "chat_placeholder": {"en": "Ask a follow-up question...", "hi": "अगला प्रश्न पूछें..."},
     "spinner_thinking": {"en": "Thinking...", "hi": "सोच रहा हूँ..."},
+    "show_earlier": {"en": "Show earlier messages", "hi": "पिछले संदेश दिखाएँ"},
+    "agent_pending": {"en": "⏳ Working on it...", "hi": "⏳ जानकारी ला रहा हूँ..."},
     "spinner_analyzing": {"en": "Analyzing the image...", "hi": "तस्वीर का विश्लेषण हो रहा है..."},
     "upload_prompt": {"en": "Choose a plant leaf image...", "hi": "पौधे की पत्ती की एक तस्वीर चुनें..."},
     "upload_caption": {"en": "Uploaded Image.", "hi": "अपलोड की गई तस्वीर।"},
     "post_diagnosis_message": {"en": "Here is the diagnosis for your plant.", "hi": "आपके पौधे की जांच की रिपोर्ट यहाँ है।"},
     "back_to_menu": {"en": "⬅ Back to Menu", "hi": "⬅ मेनू पर वापस जाएं"}
 }
+# Chat-only replies; the router's own replies are registered by agents.dispatch
+register_templates({
+    "agent_timeout": {"en": "Sorry, that is taking too long right now. Please try again in a moment.", "hi": "माफ़ कीजिए, अभी इसमें बहुत समय लग रहा है। कृपया थोड़ी देर बाद फिर से कोशिश करें।"},
+    "agent_error": {"en": "Sorry, I could not get that information right now. Please try again.", "hi": "माफ़ कीजिए, मैं अभी यह जानकारी नहीं ला सका। कृपया फिर से कोशिश करें।"},
+})
 st.set_page_config(page_title="KrishiMitra", page_icon=TEXT["page_icon"], layout="centered")
+# With INFERENCE_API_URL set, diagnosis and the agents run on the API's nodes (api.py)
+inference_client = get_inference_client()
+if inference_client is None:
+    # Start loading the disease classifier in the background; only the pest path waits for it
+    prewarm_pest_detector()
+    # Fetch every known commodity's mandi prices concurrently, also in the background
+    prefetch_market_prices()
+# Per-stage timings as Prometheus text on TRACE_METRICS_PORT (only with TRACING_ENABLED=1)
+start_metrics_server()
 
 if 'language' not in st.session_state: st.session_state.language = 'en'
-if "messages_en" not in st.session_state: st.session_state.messages_en = []
-if "messages_hi" not in st.session_state: st.session_state.messages_hi = []
+# One record per message with both languages; old turns are moved out of memory
+if "chat" not in st.session_state: st.session_state.chat = ChatHistory(uuid.uuid4().hex, get_chat_archive())
+if "history_shown" not in st.session_state: st.session_state.history_shown = config.CHAT_HISTORY_PAGE
 if 'view_mode' not in st.session_state:
     st.session_state.view_mode = 'hybrid'  # Start in 'hybrid' mode (cards + chat)
 if 'view' not in st.session_state: st.session_state.view = 'menu'
 if "initial_prompt" not in st.session_state: st.session_state.initial_prompt = None
 if 'card_clicked' not in st.session_state: st.session_state.card_clicked = None
 if 'cards_hidden' not in st.session_state: st.session_state.cards_hidden = False
+# task id -> {"task": AgentTask, "kind": "reply" | "translation", "lang": language it fills}
+if "pending_tasks" not in st.session_state: st.session_state.pending_tasks = {}
 
 lang = st.session_state.language
 
 # Translation function
-def simple_translate_to_hindi(text_to_translate):
-    """Translates text to Hindi, handling a known bug in the googletrans library."""
-    try:
-        translator = Translator()
-        # The key fix is adding raise_exception=True
-        translation = translator.translate(text_to_translate, dest='hi', raise_exception=True)
-        return translation.text
-    except Exception as e:
-        print(f"Translation Error: {e}")
-        # Fallback to returning the original text if translation fails
-        return text_to_translate
-
-# --- 2. BILINGUAL AGENT FUNCTIONS ---
-
-def get_market_price(query, location='indore', lang='en'):
+def simple_translate_to_hindi(text_to_translate, dest='hi'):
     """
-    Identifies a known crop from the user's query and scrapes its live price.
-    If the crop is not recognized, it provides a link to the main commodities page.
+    Translates text (to Hindi by default) through the shared, persistently cached
+    translation service. Falls back to the original text if translation fails.
     """
-    query = query.lower()
-    
-    # This dictionary maps keywords to the specific URL slugs on the website
-    CROP_URL_SLUGS = {
-        "soybean": "soyabean-soyabean",
-        "soya bean": "soyabean-soyabean",
-        "सोयाबीन": "soyabean-soyabean",
-        "wheat": "wheat",
-        "gehu": "wheat",
-        "गेहूं": "wheat",
-        "cotton": "cotton-kapas",
-        "kapas": "cotton-kapas",
-        "कपास": "cotton-kapas"
-    }
-    
-    crop_slug = None
-    crop_display_name = ""
-    for keyword, slug in CROP_URL_SLUGS.items():
-        if keyword in query:
-            crop_slug = slug
-            crop_display_name = keyword.split('-')[0].capitalize()
-            break
-            
-    # --- NEW, IMPROVED FALLBACK LOGIC ---
-    if not crop_slug:
-        commodities_url = "https://mandibhavindia.in/commodities"
-        if lang == 'en':
-            return f"I don't have a specific scraper for that crop yet. You can find a full list of all available commodities here:\n{commodities_url}"
-        else:
-            return f"मेरे पास अभी उस फसल के लिए एक विशिष्ट स्क्रैपर नहीं है। आप सभी उपलब्ध जिंसों की पूरी सूची यहां देख सकते हैं:\n{commodities_url}"
-
-    # --- Scraper Logic (remains the same) ---
-    URL = f"https://mandibhavindia.in/commodity/{crop_slug}"
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(URL, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        price_table = soup.find('table')
-        if not price_table:
-            raise ValueError("Price table not found on the page.")
-
-        rows = price_table.find_all('tr')[1:]
-        for row in rows:
-            cells = row.find_all('td')
-            market_name = cells[0].get_text(strip=True).lower()
-            if location in market_name:
-                min_price = cells[2].get_text(strip=True)
-                max_price = cells[3].get_text(strip=True)
-                modal_price = cells[4].get_text(strip=True)
-                
-                if lang == 'en':
-                    return f"""
-                    Here are the live prices for *{crop_display_name}* in the *{location.capitalize()}* market:
-                    - *Min Price:* ₹{min_price} / Quintal
-                    - *Max Price:* ₹{max_price} / Quintal
-                    - *Modal (Average) Price:* ₹{modal_price} / Quintal
-                    """
-                else:
-                    return f"""
-                    *{location.capitalize()}* मंडी में *{crop_display_name}* के लाइव भाव यहाँ दिए गए हैं:
-                    - *न्यूनतम मूल्य:* ₹{min_price} / क्विंटल
-                    - *अधिकतम मूल्य:* ₹{max_price} / क्विंटल
-                    - *औसत मूल्य:* ₹{modal_price} / क्विंटल
-                    """
-        
-        return f"Could not find price data for {location.capitalize()} in the {crop_display_name} listings today. You can check all markets here: {URL}"
+    return get_translation_service().translate(text_to_translate, dest)
 
-    except Exception as e:
-        print(f"An error occurred during scraping: {e}")
-        if lang == 'en':
-            return f"Sorry, I couldn't fetch the live prices right now. You can check manually at this link:\n{URL}"
-        else:
-            return f"माफ़ कीजिए, मैं अभी लाइव भाव प्राप्त नहीं कर सका। आप इस लिंक पर स्वयं जांच सकते हैं:\n{URL}"
-    
+# --- 2. BILINGUAL AGENT FUNCTIONS ---
+# Agents return an AgentResponse (template id + data); both languages are rendered
+# locally from the localized templates, without a translation call.
 
+# Known cities are matched through the location index; spaCy NER (loaded on the
+# first lookup that needs it, then shared by all sessions) is the last resort
+if inference_client is None:
+    nlp_model.prewarm()
 
-nlp = spacy.load("en_core_web_sm")
-json_file_path = os.path.join(os.path.dirname(__file__), 'static', 'data.json')
-INDIAN_CITIES = []
-try:
-    with open(json_file_path, 'r') as file:
-        data = json.load(file)
-        if isinstance(data, list):
-            # Store a list of lowercase city names for easy matching
-            INDIAN_CITIES = [city.lower() for city in data]
-except (FileNotFoundError, json.JSONDecodeError) as e:
-    st.error(f"Error loading cities file: {e}")
-def extract_location(text):
-    words = re.findall(r'\w+', text.lower())
-    for city in INDIAN_CITIES:
-        for word in words:
-            if word == city:
-                return city
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ == "GPE":
-            return ent.text
-    return None
-def get_weather_forecast(location, lang='en'):
-    load_dotenv()
-    """Returns comprehensive weather forecast in the selected language."""
+def _diagnose_rendered(image_bytes):
+    if inference_client is not None:
+        return inference_client.diagnose(image_bytes)["rendered"]
+    return render_all(diagnosis_response(diagnose_plant_disease(image_bytes)))
 
-    api_key = os.getenv("WEATHER_API_KEY")
-    if not api_key:
-        return "Error: OpenWeather API key not found. Please set it in the .env file."
-    
-    # Get current weather
-    current_url = "http://api.openweathermap.org/data/2.5/weather"
-    forecast_url = "http://api.openweathermap.org/data/2.5/forecast"
-    
+def diagnose_bilingual(image_bytes):
+    """
+    Returns (diagnosis_en, diagnosis_hi) for an uploaded image, both rendered
+    from the localized diagnosis templates. Repeat uploads of the same photo are
+    answered from the diagnosis cache, skipping the model. Runs on the agent
+    pool under the "diagnose" timeout and concurrency limit; the uploader waits
+    for it behind a spinner.
+    """
+    executor = get_executor()
+    task = executor.submit("diagnose", _diagnose_rendered, image_bytes)
     try:
-        # Get current weather
-        current_params = {
-            "q": location,
-            "appid": api_key,
-            "units": "metric"
-        }
-        current_response = requests.get(current_url, params=current_params)
-        
-        # Get 5-day forecast
-        forecast_params = {
-            "q": location,
-            "appid": api_key,
-            "units": "metric"
-        }
-        forecast_response = requests.get(forecast_url, params=forecast_params)
-        
-        if current_response.status_code == 200 and forecast_response.status_code == 200:
-            current_data = current_response.json()
-            forecast_data = forecast_response.json()
-            
-            # Extract current weather data
-            temp = current_data['main']['temp']
-            feels_like = current_data['main']['feels_like']
-            humidity = current_data['main']['humidity']
-            pressure = current_data['main']['pressure']
-            wind_speed = current_data['wind']['speed']
-            wind_direction = current_data['wind'].get('deg', 0)
-            weather_desc = current_data['weather'][0]['description']
-            weather_main = current_data['weather'][0]['main']
-            visibility = current_data.get('visibility', 10000) / 1000  # Convert to km
-            
-            # Get sunrise and sunset times
-            sunrise = time.strftime('%H:%M', time.localtime(current_data['sys']['sunrise']))
-            sunset = time.strftime('%H:%M', time.localtime(current_data['sys']['sunset']))
-            
-            # Analyze forecast for trends
-            forecast_list = forecast_data['list']
-            temp_trend = []
-            rain_chance = []
-            
-            for item in forecast_list[:8]:  # Next 24 hours (3-hour intervals)
-                temp_trend.append(item['main']['temp'])
-                if 'rain' in item.get('weather', [{}])[0].get('main', '').lower():
-                    rain_chance.append(True)
-                else:
-                    rain_chance.append(False)
-            
-            # Calculate trends
-            temp_min = min(temp_trend)
-            temp_max = max(temp_trend)
-            rain_probability = (sum(rain_chance) / len(rain_chance)) * 100 if rain_chance else 0
-            
-            # Professional weather descriptions
-            weather_descriptions = {
-                'Clear': {
-                    'en': 'Clear skies with excellent visibility',
-                    'hi': 'साफ आसमान, उत्कृष्ट दृश्यता'
-                },
-                'Clouds': {
-                    'en': 'Partly cloudy conditions',
-                    'hi': 'आंशिक रूप से बादल छाए रहेंगे'
-                },
-                'Rain': {
-                    'en': 'Rainy conditions expected',
-                    'hi': 'बारिश की संभावना है'
-                },
-                'Thunderstorm': {
-                    'en': 'Thunderstorm activity likely',
-                    'hi': 'आंधी-तूफान की संभावना है'
-                },
-                'Drizzle': {
-                    'en': 'Light drizzle expected',
-                    'hi': 'हल्की बूंदाबांदी की संभावना है'
-                },
-                'Mist': {
-                    'en': 'Misty conditions with reduced visibility',
-                    'hi': 'धुंधली स्थिति, कम दृश्यता'
-                },
-                'Fog': {
-                    'en': 'Foggy conditions with poor visibility',
-                    'hi': 'कोहरा, खराब दृश्यता'
-                },
-                'Snow': {
-                    'en': 'Snowfall expected',
-                    'hi': 'बर्फबारी की संभावना है'
-                }
-            }
-            
-            # Get appropriate description
-            weather_desc_localized = weather_descriptions.get(
-                weather_main, 
-                {'en': weather_desc, 'hi': simple_translate_to_hindi(weather_desc)}
-            )
-            
-            # Wind direction helper
-            def get_wind_direction(degrees):
-                directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-                index = round(degrees / 22.5) % 16
-                return directions[index]
-            
-            wind_dir = get_wind_direction(wind_direction)
-            
-            # Build comprehensive weather report
-            if lang == 'hi':
-                report = f"""🌤 {location} का विस्तृत मौसम विवरण
-
-वर्तमान स्थिति:
-* तापमान: {temp}°C (महसूस हो रहा: {feels_like}°C)
-* मौसम: {weather_desc_localized['hi']}
-* आर्द्रता: {humidity}%
-* वायु दाब: {pressure} hPa
-* हवा: {wind_speed} km/h {wind_dir} दिशा से
-* दृश्यता: {visibility:.1f} km
-
-सूर्योदय/सूर्यास्त:
-* सूर्योदय: {sunrise}
-* सूर्यास्त: {sunset}
-
-24 घंटे का पूर्वानुमान:
-* तापमान सीमा: {temp_min:.1f}°C - {temp_max:.1f}°C
-* बारिश की संभावना: {rain_probability:.0f}%
-
-कृषि सलाह:
-{f"⚠ बारिश की संभावना है - फसल संरक्षण के उपाय करें" if rain_probability > 30 else "✅ मौसम अनुकूल है - सामान्य कृषि गतिविधियां जारी रखें"}"""
-            else:
-                report = f"""🌤 Detailed Weather Report for {location}
-
-Current Conditions:
-* Temperature: {temp}°C (Feels like: {feels_like}°C)
-* Weather: {weather_desc_localized['en']}
-* Humidity: {humidity}%
-* Pressure: {pressure} hPa
-* Wind: {wind_speed} km/h from {wind_dir}
-* Visibility: {visibility:.1f} km
-
-Sunrise/Sunset:
-* Sunrise: {sunrise}
-* Sunset: {sunset}
-
-24-Hour Forecast:
-* Temperature Range: {temp_min:.1f}°C - {temp_max:.1f}°C
-* Rain Probability: {rain_probability:.0f}%
-
-Agricultural Advisory:
-{f"⚠ Rain expected - Take crop protection measures" if rain_probability > 30 else "✅ Weather favorable - Continue normal farming activities"}"""
-
-            return report
-        else:
-            return {"en": f"Error: Could not retrieve weather data for {location}.", "hi": f"त्रुटि: {location} के लिए मौसम डेटा प्राप्त नहीं किया जा सका।"}[lang]
-    except requests.exceptions.RequestException as e:
-        return f"A network error occurred: {e}"
+        rendered = task.result()
+    except TimeoutError:
+        executor.record_timeout(task)
+        rendered = render_all(AgentResponse("agent_timeout"))
+    except Exception as e:
+        print(f"[WARN] Diagnosis failed: {e}")
+        rendered = render_all(AgentResponse("agent_error"))
+    return rendered["en"], rendered["hi"]
 
 # NOTE: The mocked diagnose_plant_disease function has been removed.
 def plant_diagnosis_agent(lang='en'):
@@ -360,75 +142,58 @@ def plant_diagnosis_agent(lang='en'):
         uploaded_file = st.file_uploader(TEXT["upload_prompt"][lang], type=["jpg", "jpeg", "png"])
 
         if uploaded_file is not None:
-            with open("temp_image.jpg", "wb") as f:
-                f.write(uploaded_file.getbuffer())
-
             with st.chat_message("user", avatar="🧑‍🌾"):
                 st.image(uploaded_file, caption=TEXT["upload_caption"][lang], width=150)
 
             with st.chat_message("assistant", avatar="🤖"):
                 with st.spinner(TEXT["spinner_analyzing"][lang]):
-                    diagnosis_en = diagnose_plant_disease("temp_image.jpg")
-                    diagnosis_hi = simple_translate_to_hindi(diagnosis_en)
+                    diagnosis_en, diagnosis_hi = diagnose_bilingual(uploaded_file.getvalue())
 
                     diagnosis_final = diagnosis_hi if lang == 'hi' else diagnosis_en
                     st.markdown(diagnosis_final)
 
             # Append to chat history if used in chat interface
-            st.session_state.messages_en.append({"role": "assistant", "content": diagnosis_en})
-            st.session_state.messages_hi.append({"role": "assistant", "content": diagnosis_hi})
+            st.session_state.chat.append("assistant", diagnosis_en, diagnosis_hi)
 
-            st.session_state.messages_en.append({"role": "assistant", "content": TEXT["post_diagnosis_message"]["en"]})
-            st.session_state.messages_hi.append({"role": "assistant", "content": TEXT["post_diagnosis_message"]["hi"]})
+            st.session_state.chat.append("assistant", TEXT["post_diagnosis_message"]["en"], TEXT["post_diagnosis_message"]["hi"])
 
             return diagnosis_final
 
     return None
 
 
-def route_query(query, lang='en'):
-    """Router that directs query to the correct agent based on language."""
-    query = query.lower()
-    location = extract_location(query) or 'indore' # Use extracted location or default to Indore
-
-    # print(location)
-    # --- EXPANDED KEYWORDS FOR BETTER DETECTION ---
-    keywords = {
-        "price": {"en": ["price", "rate", "cost", "mandi"], "hi": ["भाव", "दाम", "कीमत", "मंडी"]},
-        "weather": {"en": ["weather", "forecast", "temperature"], "hi": ["मौसम", "तापमान"]},
-        "disease": {
-            "en": ["disease", "sick", "pest", "leaf", "plant", "infection", "spots", "ill"],
-            "hi": ["बीमारी", "रोग", "पत्ती", "पौधा", "संक्रमण", "धब्बे", "बीमार"]
-        }
-    }
-
-    # --- ROUTING LOGIC (REMAINS THE SAME) ---
-    if any(word in query for word in keywords["price"]["en"] + keywords["price"]["hi"]):
-        # --- Pass BOTH the query and the location ---
-        return get_market_price(query, location, lang)
-    elif any(word in query for word in keywords["weather"]["en"] + keywords["weather"]["hi"]):
-        if location:
-            return get_weather_forecast(location, lang)
-        else:
-            return "Sure, I can get the weather. For which city?" if lang == 'en' else "ज़रूर, मैं मौसम बता सकता हूँ। किस शहर के लिए?"
-    elif any(word in query for word in keywords["disease"]["en"] + keywords["disease"]["hi"]):
-        return TEXT["trigger_disease"][lang]
-    else:
-        return TEXT["fallback_message"][lang]
-
-
-
 def process_and_display(prompt, change_view=False):
-    # This function now accepts an optional flag
-    prompt_en = simple_translate_to_hindi(prompt) if lang == 'hi' else prompt
-    prompt_hi = simple_translate_to_hindi(prompt) if lang == 'en' else prompt
-    st.session_state.messages_en.append({"role": "user", "content": prompt_en})
-    st.session_state.messages_hi.append({"role": "user", "content": prompt_hi})
-    
-    response_en = route_query(prompt_en, 'en')
-    response_hi = simple_translate_to_hindi(response_en)
-    st.session_state.messages_en.append({"role": "assistant", "content": response_en})
-    st.session_state.messages_hi.append({"role": "assistant", "content": response_hi})
+    """
+    Submits the turn to the shared agent pool and returns without waiting:
+    the prompt and a pending reply go into the history at once, and
+    collect_agent_results() fills them in on a later rerun. The agent call and
+    the translation of the prompt into the other language run concurrently.
+    """
+    executor = get_executor()
+    other = 'en' if lang == 'hi' else 'hi'
+    chat = st.session_state.chat
+    pending = st.session_state.pending_tasks
+
+    # One trace per turn: the pool runs each task in a copy of this context
+    with span("turn", lang=lang) as trace:
+        # Shown as typed in the other language until its translation arrives
+        translation = executor.submit("translate", simple_translate_to_hindi, prompt, other)
+        pending[translation.id] = {"task": translation, "kind": "translation", "lang": other}
+        chat.append("user", prompt, task=translation.id)
+
+        # Routed on the prompt as typed: the classifier, the keywords and the location
+        # index all understand Hindi, so no translation is needed to pick an agent.
+        # Picking the intent is local and instant; only the agent itself runs on the pool.
+        query = prompt.lower()
+        if inference_client is not None:
+            # Routed and answered by the inference API
+            reply = executor.submit("route", lambda: inference_client.route(query)["rendered"])
+        else:
+            intent, handler = intent_router.resolve(query)
+            trace.set(intent=intent)
+            reply = executor.submit(intent or "fallback", lambda: render_all(run_agent(handler, query, intent)))
+        pending[reply.id] = {"task": reply, "kind": "reply"}
+        chat.append("assistant", TEXT["agent_pending"]["en"], TEXT["agent_pending"]["hi"], task=reply.id)
     
     # If the flag is set (i.e., a card was clicked), change the view mode
     if change_view:
@@ -436,6 +201,34 @@ def process_and_display(prompt, change_view=False):
         
     st.rerun()
 
+def collect_agent_results():
+    """Moves finished (or timed-out) agent calls into the chat history; returns True while any are pending."""
+    chat, pending = st.session_state.chat, st.session_state.pending_tasks
+    for task_id, entry in list(pending.items()):
+        task = entry["task"]
+        status = task.status()
+        if status == "pending":
+            continue
+        if status == "timeout":
+            get_executor().record_timeout(task)
+        elif status == "error":
+            print(f"[WARN] Agent '{task.agent}' failed: {task.future.exception()}")
+        if entry["kind"] == "translation":
+            # On failure the prompt simply stays as typed
+            chat.settle(task_id, {entry["lang"]: task.future.result()} if status == "done" else {})
+        elif status == "done":
+            chat.settle(task_id, task.future.result())
+        else:
+            chat.settle(task_id, render_all(AgentResponse("agent_timeout" if status == "timeout" else "agent_error")))
+        del pending[task_id]
+    return bool(pending)
+
+@st.fragment(run_every=config.AGENT_POLL_INTERVAL)
+def wait_for_agents():
+    """Polls the pending agent calls without rerunning the page; reruns it once one has finished."""
+    if any(entry["task"].status() != "pending" for entry in st.session_state.pending_tasks.values()):
+        st.rerun()
+
 # --- 3. STREAMLIT APP ---
 
 
@@ -496,6 +289,11 @@ with st.sidebar:
     st.markdown(TEXT['sidebar_feature_3'][lang])
     st.markdown(TEXT['sidebar_feature_4'][lang])
     st.markdown("---")
+    if tracer.enabled:
+        with st.expander("Stage timings"):
+            st.dataframe([{"stage": stage, **stats} for stage, stats in tracer.summary().items()], hide_index=True)
+        with st.expander("Model load times"):
+            st.dataframe(get_load_metrics(), hide_index=True)
 
 # --- 6. MAIN APP LAYOUT ---
 # Header
@@ -585,51 +383,53 @@ if st.session_state.view_mode == 'hybrid' and not st.session_state.cards_hidden:
     st.write("---")
 
 # --- 8. CHAT HISTORY (always visible) ---
-messages_to_display = st.session_state.messages_hi if lang == 'hi' else st.session_state.messages_en
-if not messages_to_display:
+agents_pending = collect_agent_results()
+chat = st.session_state.chat
+# Only the newest page of messages is rendered on each rerun; earlier pages on request
+if len(chat) - st.session_state.history_shown > chat.oldest_available:
+    if st.button(TEXT["show_earlier"][lang], key="show_earlier"):
+        st.session_state.history_shown += config.CHAT_HISTORY_PAGE
+        st.rerun()
+if not len(chat):
     with st.chat_message("assistant", avatar="🤖"):
         st.markdown(TEXT["welcome_message"][lang])
-for message in messages_to_display:
-    with st.chat_message(message["role"], avatar="🧑‍🌾" if message["role"] == "user" else "🤖"):
-        st.markdown(message["content"])
+with span("render", messages=min(len(chat), st.session_state.history_shown)):
+    for message in chat.recent(st.session_state.history_shown):
+        with st.chat_message(message["role"], avatar="🧑‍🌾" if message["role"] == "user" else "🤖"):
+            st.markdown(message[lang])
+if agents_pending:
+    wait_for_agents()
 
 # --- FINAL, WORKING FILE UPLOADER LOGIC ---
-# Get the last message from the correct history list
-last_message_list = st.session_state.messages_hi if lang == 'hi' else st.session_state.messages_en
+last_message = chat.last()
 
 # Check if the last message from the assistant is the one prompting for an image upload
-if last_message_list and last_message_list[-1]["role"] == "assistant" and TEXT["trigger_disease"][lang] in last_message_list[-1]["content"]:
+if last_message and last_message["role"] == "assistant" and TEXT["trigger_disease"][lang] in last_message[lang]:
     
     uploaded_file = st.file_uploader(TEXT["upload_prompt"][lang], type=["jpg", "png", "jpeg"], key="file_uploader")
     
     if uploaded_file is not None:
-        # Save the file temporarily to pass its path to the model
-        with open("temp_image.jpg", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
         # --- Display the user's uploaded image in the chat ---
         with st.chat_message("user", avatar="🧑‍🌾"):
             st.image(uploaded_file, caption=TEXT["upload_caption"][lang], width=150)
 
         # Append a placeholder to the history
-        st.session_state.messages_en.append({"role": "user", "content": "[Image Uploaded]"})
-        st.session_state.messages_hi.append({"role": "user", "content": "[तस्वीर अपलोड की गई]"})
+        chat.append("user", "[Image Uploaded]", "[तस्वीर अपलोड की गई]")
         
         # --- Call the AI model and display the diagnosis ---
         with st.chat_message("assistant", avatar="🤖"):
             with st.spinner(TEXT["spinner_analyzing"][lang]):
                 # Call the REAL diagnosis function from pest_detector.py
-                diagnosis_en = diagnose_plant_disease("temp_image.jpg")
-                # Translate the response for the other history
-                diagnosis_hi = simple_translate_to_hindi(diagnosis_en)
+                # (decoded in memory: no shared temp file between sessions) and
+                # translated for the other history, both cached per image
+                diagnosis_en, diagnosis_hi = diagnose_bilingual(uploaded_file.getvalue())
 
                 # Display the correct language
                 final_diagnosis = diagnosis_hi if lang == 'hi' else diagnosis_en
                 st.markdown(final_diagnosis)
         
-        # Add the diagnosis to both histories
-        st.session_state.messages_en.append({"role": "assistant", "content": diagnosis_en})
-        st.session_state.messages_hi.append({"role": "assistant", "content": diagnosis_hi})
+        # Add the diagnosis to the history, in both languages
+        chat.append("assistant", diagnosis_en, diagnosis_hi)
 
         # Set a flag to clear the uploader and prevent re-submission
         st.session_state.view_mode = 'chat_only' 
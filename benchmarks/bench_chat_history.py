@@ -0,0 +1,107 @@
+"""
+Per-rerun cost of the chat history as a session grows.
+
+"legacy" is the original layout: two unbounded lists (messages_en and
+messages_hi) with every message rendered on every rerun. "paged" is
+services.chat_history.ChatHistory: one record per message, the newest
+CHAT_HISTORY_PAGE messages rendered, older ones moved to a SQLite archive.
+
+Streamlit is not needed: rendering a message is stood in for by serializing
+it to JSON, as Streamlit does for each st.markdown delta it sends. Session
+memory is the pickled size of what stays in session state.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_chat_history --turns 10 100 1000
+"""
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+import config
+from services.chat_history import ChatArchive, ChatHistory
+
+QUESTION = {"en": "What is the soyabean price in Indore mandi? ({turn})", "hi": "इंदौर मंडी में सोयाबीन का भाव क्या है? ({turn})"}
+REPLY = {
+    "en": "Soyabean prices in Indore mandi ({turn}):\n" + "- Modal price: ₹4,650 per quintal (min ₹4,400, max ₹4,800)\n" * 8,
+    "hi": "इंदौर मंडी में सोयाबीन के भाव ({turn}):\n" + "- मॉडल भाव: ₹4,650 प्रति क्विंटल (न्यूनतम ₹4,400, अधिकतम ₹4,800)\n" * 8,
+}
+
+
+def turn_messages(turn):
+    """(role, en, hi) of one question and its reply; every turn's text is distinct, like a real chat."""
+    return [(role, text["en"].format(turn=turn), text["hi"].format(turn=turn))
+            for role, text in (("user", QUESTION), ("assistant", REPLY))]
+
+
+def render(messages, lang, key):
+    for message in messages:
+        json.dumps({"role": message["role"], "body": message[key] if key else message[lang]}, ensure_ascii=False)
+
+
+def legacy_state(turns):
+    state = {"messages_en": [], "messages_hi": []}
+    for turn in range(turns):
+        for role, en, hi in turn_messages(turn):
+            state["messages_en"].append({"role": role, "content": en})
+            state["messages_hi"].append({"role": role, "content": hi})
+    return state
+
+
+def legacy_rerun(state, lang="hi"):
+    render(state[f"messages_{lang}"], lang, "content")
+
+
+def paged_state(turns, archive):
+    chat = ChatHistory(f"bench-{turns}", archive)
+    for turn in range(turns):
+        for role, en, hi in turn_messages(turn):
+            chat.append(role, en, hi)
+    return chat
+
+
+def paged_rerun(chat, lang="hi"):
+    render(chat.recent(config.CHAT_HISTORY_PAGE), lang, None)
+
+
+def time_reruns(rerun, state, iterations):
+    """Per-rerun latencies in milliseconds."""
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        rerun(state)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ChatArchive(os.path.join(directory, "chat.sqlite"))
+        print(f"{'turns':>7}{'layout':>9}{'p50 ms':>10}{'p99 ms':>10}{'state KB':>10}")
+        for turns in args.turns:
+            legacy = legacy_state(turns)
+            start = time.perf_counter()
+            chat = paged_state(turns, archive)
+            append_ms = (time.perf_counter() - start) * 1000 / (2 * turns)
+            layouts = (
+                ("legacy", legacy_rerun, legacy, legacy),
+                ("paged", paged_rerun, chat, chat._messages),
+            )
+            for name, rerun, state, kept in layouts:
+                latencies = time_reruns(rerun, state, args.iterations)
+                size = len(pickle.dumps(kept)) / 1024
+                print(f"{turns:>7}{name:>9}{np.percentile(latencies, 50):>10.3f}{np.percentile(latencies, 99):>10.3f}{size:>10.1f}")
+            print(f"{'':>7}{'':>9}  append incl. archiving: {append_ms * 1000:.1f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Single-image latency benchmark for the pest detector inference paths.
+
+Compares the original Keras `model.predict` loop against the eager
+`model(x, training=False)` call and the traced `tf.function` fast path.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_inference --iterations 200
+    python -m benchmarks.bench_inference --weights model/saved_model/krishi_multicrop_model.keras
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model.pest_detector import (
+    CLASS_NAMES, IMG_SIZE, INFERENCE_MODES, build_inference_fn, create_model_architecture, warm_up,
+)
+
+
+def time_inference(inference_fn, iterations, batch_size=1):
+    """Returns per-call latencies in milliseconds for `iterations` calls."""
+    batch = np.random.uniform(0, 255, (batch_size, IMG_SIZE, IMG_SIZE, 3)).astype(np.float32)
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        inference_fn(batch)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--weights", default=None, help="Optional trained weights; random weights are used otherwise.")
+    parser.add_argument("--modes", nargs="+", default=list(INFERENCE_MODES), choices=INFERENCE_MODES)
+    args = parser.parse_args()
+
+    model = create_model_architecture(num_classes=len(CLASS_NAMES))
+    if args.weights:
+        model.load_weights(args.weights)
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for mode in args.modes:
+        inference_fn = build_inference_fn(model, mode)
+        warm_up(inference_fn)
+        latencies = time_inference(inference_fn, args.iterations, args.batch_size)
+        print(f"{mode:<10}{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 99):>10.2f}{latencies.mean():>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Parse-time benchmark for the mandi price-table backends over the saved
+commodity pages in benchmarks/fixtures/mandi_*.html.
+
+"original" is the pre-store scraper: BeautifulSoup over the whole page, then
+find_all('tr') / find_all('td') / get_text per cell, prices left as strings.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_price_table --iterations 50
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from benchmarks.stub_server import FIXTURES_DIR
+from services.price_table import TABLE_BACKENDS, backend_available, extract_price_table
+
+
+def original_scraper(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    price_table = soup.find('table')
+    rows = []
+    for row in price_table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        rows.append([cells[0].get_text(strip=True).lower()] + [cells[i].get_text(strip=True) for i in (2, 3, 4)])
+    return rows
+
+
+def load_pages():
+    pages = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith("mandi_") and name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                pages[name] = f.read()
+    return pages
+
+
+def time_parser(parse, pages, iterations):
+    """Returns per-page parse times in milliseconds."""
+    latencies = []
+    for _ in range(iterations):
+        for html in pages.values():
+            start = time.perf_counter()
+            parse(html)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_pages()
+    if not pages:
+        raise SystemExit(f"No mandi_*.html fixtures found in {FIXTURES_DIR}")
+    reference = {name: extract_price_table(html, "bs4") for name, html in pages.items()}
+
+    candidates = {"original": original_scraper}
+    for backend in TABLE_BACKENDS:
+        if backend_available(backend):
+            candidates[backend] = lambda html, backend=backend: extract_price_table(html, backend)
+        else:
+            print(f"({backend} not installed, skipped)")
+
+    print(f"{len(pages)} pages, {sum(len(table) for table in reference.values())} price rows")
+    print(f"{'parser':<12}{'p50 ms':>10}{'p99 ms':>10}{'speedup':>10}  rows match")
+    baseline = None
+    for name, parse in candidates.items():
+        latencies = time_parser(parse, pages, args.iterations)
+        p50 = np.percentile(latencies, 50)
+        baseline = baseline or p50
+        if name == "original":
+            match = "-"
+        else:
+            tables = {page: parse(html) for page, html in pages.items()}
+            match = all(
+                tables[page].markets == reference[page].markets
+                and np.array_equal(tables[page].modal_price, reference[page].modal_price)
+                for page in pages
+            )
+        print(f"{name:<12}{p50:>10.2f}{np.percentile(latencies, 99):>10.2f}{baseline / p50:>9.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
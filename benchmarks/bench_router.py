@@ -0,0 +1,102 @@
+"""
+Routing accuracy and latency of the intent routers over the labelled corpus
+in benchmarks/fixtures/routing_corpus.jsonl ({"text": ..., "intent": ... or null}).
+
+"legacy" is the original route_query logic: a keywords dict rebuilt per call
+and substring scans in fixed price -> weather -> disease order. "compiled" is
+the keyword IntentRouter, "classifier" the n-gram intent classifier alone and
+"hybrid" the classifier with keyword fallback (what route_query uses).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_router --iterations 200
+    python -m benchmarks.bench_router --show-errors
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import config
+from agents.intent_classifier import train_from_file
+from agents.router import create_default_router
+from benchmarks.stub_server import FIXTURES_DIR
+
+CORPUS_PATH = os.path.join(FIXTURES_DIR, "routing_corpus.jsonl")
+
+
+def legacy_route(query):
+    query = query.lower()
+    keywords = {
+        "price": {"en": ["price", "rate", "cost", "mandi"], "hi": ["भाव", "दाम", "कीमत", "मंडी"]},
+        "weather": {"en": ["weather", "forecast", "temperature"], "hi": ["मौसम", "तापमान"]},
+        "disease": {
+            "en": ["disease", "sick", "pest", "leaf", "plant", "infection", "spots", "ill"],
+            "hi": ["बीमारी", "रोग", "पत्ती", "पौधा", "संक्रमण", "धब्बे", "बीमार"]
+        }
+    }
+    if any(word in query for word in keywords["price"]["en"] + keywords["price"]["hi"]):
+        return "price"
+    elif any(word in query for word in keywords["weather"]["en"] + keywords["weather"]["hi"]):
+        return "weather"
+    elif any(word in query for word in keywords["disease"]["en"] + keywords["disease"]["hi"]):
+        return "disease"
+    return None
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(classify, corpus, iterations):
+    """Returns (accuracy, per-query latencies in microseconds, misrouted examples)."""
+    errors = []
+    for example in corpus:
+        predicted = classify(example["text"])
+        if predicted != example["intent"]:
+            errors.append((example["text"], example["intent"], predicted))
+    latencies = []
+    for _ in range(iterations):
+        for example in corpus:
+            start = time.perf_counter()
+            classify(example["text"])
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return 1 - len(errors) / len(corpus), np.array(latencies), errors
+
+
+def routers():
+    """Name -> classify(query) for every router under comparison."""
+    start = time.perf_counter()
+    classifier = train_from_file()
+    print(f"intent classifier trained in {(time.perf_counter() - start) * 1000:.1f} ms")
+    classifier_only = create_default_router(classifier, min_confidence=0.0)
+    return {
+        "legacy": legacy_route,
+        "compiled": create_default_router().classify,
+        "classifier": classifier_only.classify,
+        "hybrid": create_default_router(classifier, config.INTENT_MIN_CONFIDENCE, config.INTENT_MIN_MARGIN).classify,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"{len(corpus)} labelled queries")
+    print(f"{'router':<12}{'accuracy':>10}{'p50 us':>10}{'p99 us':>10}")
+    for name, classify in routers().items():
+        accuracy, latencies, errors = evaluate(classify, corpus, args.iterations)
+        print(f"{name:<12}{accuracy:>10.1%}{np.percentile(latencies, 50):>10.1f}{np.percentile(latencies, 99):>10.1f}")
+        if args.show_errors:
+            for text, expected, predicted in errors:
+                print(f"    {text!r}: expected {expected}, got {predicted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cost of high-accuracy (test-time augmentation) diagnosis against the
+single-view path, on a randomly initialized model and random 480x640 photos.
+
+For each view count, every photo is diagnosed once by one caller (latency)
+and then by `--concurrency` callers at once (throughput through the shared
+micro-batcher). The last table runs the adaptive budget under the same load
+and reports the view counts it settled on.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_tta --photos 64 --concurrency 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.run_all import random_photos
+from model import pest_detector
+from model.pest_detector import CLASS_NAMES, build_inference_fn, create_model_architecture, prepare_image, warm_up
+from model.tta import VIEWS, ViewBudget
+
+
+def diagnose_once(photo, views):
+    """Decode, views and forward pass of one photo, bypassing the diagnosis cache."""
+    if views == 0:
+        return pest_detector._get_batcher().predict(prepare_image(photo))
+    return pest_detector._predict_views(photo)
+
+
+def run(photos, views, concurrency):
+    """(p50 ms with one caller, images/sec with `concurrency` callers)."""
+    pest_detector.view_budget = ViewBudget(1e9, max(1, views))  # fixed view count
+    latencies = []
+    for photo in photos:
+        start = time.perf_counter()
+        diagnose_once(photo, views)
+        latencies.append((time.perf_counter() - start) * 1000)
+    with ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda photo: diagnose_once(photo, views), photos))
+        rate = len(photos) / (time.perf_counter() - start)
+    return np.percentile(latencies, 50), rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photos", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--views", type=int, nargs="+", default=[1, 2, 4, len(VIEWS)])
+    parser.add_argument("--budget-ms", type=float, default=pest_detector.TTA_BUDGET_MS)
+    args = parser.parse_args()
+
+    inference_fn = build_inference_fn(create_model_architecture(len(CLASS_NAMES)))
+    warm_up(inference_fn)
+    pest_detector.pest_model.loader = lambda: inference_fn
+    photos = random_photos(args.photos)
+
+    print(f"{'views':>10}{'p50 ms':>10}{'images/s':>10}")
+    for views in [0] + args.views:
+        p50, rate = run(photos, views, args.concurrency)
+        print(f"{'single' if views == 0 else views:>10}{p50:>10.1f}{rate:>10.1f}")
+
+    budget = pest_detector.view_budget = ViewBudget(args.budget_ms, len(VIEWS))
+    chosen = []
+
+    def adaptive(photo):
+        chosen.append(budget.views())
+        diagnose_once(photo, len(VIEWS))
+
+    for concurrency in (1, args.concurrency):
+        chosen.clear()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(adaptive, photos))
+        stats = budget.stats()
+        print(f"budget {args.budget_ms:.0f} ms, {concurrency} callers: views used {np.bincount(chosen).nonzero()[0].tolist()}, "
+              f"settled at {budget.views()} (fitted {stats['fixed_ms']} ms + {stats['ms_per_view']} ms/view)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Offline benchmark suite over the hot paths of the app and the pest detector,
+written as one JSON report so releases can be compared automatically.
+
+Everything runs locally: OpenWeather and the mandi website are replaced by
+benchmarks/stub_server.py serving the saved fixtures, translation uses the
+offline phrasebook backend, and the pest detector is a randomly initialized
+create_model_architecture() model (its weights saved to and loaded from a
+temporary file, so load_weights is measured too). Caches and histories live
+in a temporary directory.
+
+Measured:
+  cold_start   module imports (each in a fresh interpreter), model build,
+               load_weights, graph warm-up, spaCy load (if installed)
+  diagnose     diagnose_plant_disease latency at batch 1 (cache miss and hit),
+               model throughput at larger batches
+  routing      extract_location, route_query over the labelled corpus
+  market       price-table parsing per fixture page, get_market_price
+  weather      forecast post-processing (analyze), get_weather_forecast
+
+Latencies are {"p50", "p95", "mean", "n"} in the unit named by the key.
+
+Usage (from the repository root):
+    python -m benchmarks.run_all --output bench.json
+    python -m benchmarks.run_all --quick --compare bench.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.stub_server import FIXTURES_DIR, StubServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PATH = os.path.join(FIXTURES_DIR, "routing_corpus.jsonl")
+# Imported one by one in a fresh interpreter for the cold-start numbers
+COLD_IMPORTS = (
+    "config", "services.translation", "model.pest_detector", "agents.location",
+    "agents.market", "agents.weather", "agents.dispatch", "tensorflow",
+)
+MARKET_QUERIES = ("soyabean price in indore", "wheat ka bhav dewas", "कपास का भाव उज्जैन", "cotton rate in khandwa")
+WEATHER_CITIES = ("indore", "bhopal", "ujjain", "dewas")
+# Metrics where a larger value is better; everything else is a latency or duration
+HIGHER_IS_BETTER = ("images_per_s",)
+
+
+def summarize(samples):
+    samples = np.asarray(samples, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(samples, 50)), 4),
+        "p95": round(float(np.percentile(samples, 95)), 4),
+        "mean": round(float(samples.mean()), 4),
+        "n": int(len(samples)),
+    }
+
+
+def time_calls(fn, inputs, scale=1000.0):
+    """Calls fn(x) for every x; per-call durations (ms by default, 1e6 for us)."""
+    durations = []
+    for x in inputs:
+        start = time.perf_counter()
+        fn(x)
+        durations.append((time.perf_counter() - start) * scale)
+    return durations
+
+
+def offline_environment(server_url, workdir):
+    """Settings pointing every upstream at the stub server and every cache at `workdir`."""
+    return {
+        "OPENWEATHER_BASE_URL": server_url,
+        "MANDI_BASE_URL": server_url,
+        "WEATHER_API_KEY": "stub",
+        "TRANSLATION_BACKEND": "offline",
+        "TRANSLATION_CACHE_PATH": os.path.join(workdir, "translations.sqlite"),
+        "MANDI_HISTORY_PATH": os.path.join(workdir, "mandi_prices.sqlite"),
+        "CHAT_HISTORY_PATH": os.path.join(workdir, "chat_history.sqlite"),
+        "PEST_CACHE_PATH": "",
+        "PEST_PREWARM": "0",
+    }
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+# --- Cold start ---
+def bench_imports(modules=COLD_IMPORTS):
+    """Seconds to import each module in a fresh interpreter (this process's environment)."""
+    timings = {}
+    for module in modules:
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            timings[module] = None
+            print(f"[WARN] Importing {module} failed: {completed.stderr.strip().splitlines()[-1:]}")
+            continue
+        timings[module] = round(float(completed.stdout.strip().splitlines()[-1]), 4)
+    return timings
+
+
+def bench_model_load(workdir):
+    """Builds a random model, saves its weights, and times a fresh build + load_weights + warm-up."""
+    from model.pest_detector import CLASS_NAMES, build_inference_fn, create_model_architecture, warm_up
+
+    weights_path = os.path.join(workdir, "random.weights.h5")
+    create_model_architecture(len(CLASS_NAMES)).save_weights(weights_path)
+
+    start = time.perf_counter()
+    model = create_model_architecture(len(CLASS_NAMES))
+    built = time.perf_counter()
+    model.load_weights(weights_path)
+    loaded = time.perf_counter()
+    inference_fn = build_inference_fn(model)
+    warm_up(inference_fn)
+    warmed = time.perf_counter()
+    return inference_fn, {
+        "model_build_s": round(built - start, 4),
+        "load_weights_s": round(loaded - built, 4),
+        "warm_up_s": round(warmed - loaded, 4),
+    }
+
+
+def bench_spacy():
+    if importlib.util.find_spec("spacy") is None:
+        return None
+    from agents.location import nlp_model
+
+    start = time.perf_counter()
+    nlp_model.get()
+    return round(time.perf_counter() - start, 4)
+
+
+# --- Pest detector ---
+def random_photos(count, seed=0):
+    """JPEG-encoded random 480x640 photos, so decode and resize are part of the measurement."""
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+    return [
+        tf.io.encode_jpeg(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)).numpy()
+        for _ in range(count)
+    ]
+
+
+def bench_diagnose(inference_fn, iterations, batch_sizes):
+    from model import pest_detector
+    from model.pest_detector import IMG_SIZE, diagnose_plant_disease, diagnose_prepared
+
+    # Serve the random model through the normal lazy registry
+    pest_detector.pest_model.loader = lambda: inference_fn
+    photos = random_photos(iterations)
+    diagnose_plant_disease(photos[0])
+    results = {
+        "batch1_miss_ms": summarize(time_calls(diagnose_plant_disease, photos[1:])),
+        "batch1_hit_ms": summarize(time_calls(diagnose_plant_disease, [photos[0]] * iterations)),
+        "throughput_images_per_s": {},
+    }
+    rng = np.random.default_rng(1)
+    for batch_size in batch_sizes:
+        batch = rng.uniform(0, 255, (batch_size, IMG_SIZE, IMG_SIZE, 3)).astype(np.float32)
+        diagnose_prepared(batch)
+        repeats = max(3, iterations // batch_size)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            diagnose_prepared(batch)
+        results["throughput_images_per_s"][str(batch_size)] = round(batch_size * repeats / (time.perf_counter() - start), 2)
+    return results
+
+
+# --- Agents ---
+def bench_routing(corpus, repeats):
+    from agents.dispatch import route_query
+    from agents.location import extract_location
+
+    for query in corpus:
+        route_query(query)  # fills the price and weather caches, like a warm server
+    return {
+        "extract_location_us": summarize(time_calls(extract_location, corpus * repeats, scale=1e6)),
+        "route_query_ms": summarize(time_calls(route_query, corpus * repeats)),
+    }
+
+
+def bench_market(iterations):
+    import config
+    from agents.market import get_market_price
+    from services.mandi_client import parse_price_table
+    from services.price_table import resolve_backend
+
+    backend = resolve_backend(config.MANDI_TABLE_PARSER)
+    parse_ms = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith("mandi_") and name.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+                html = f.read()
+            parse_ms[name[len("mandi_"):-len(".html")]] = summarize(
+                time_calls(lambda page: parse_price_table(page, backend), [html] * iterations)
+            )
+    queries = list(MARKET_QUERIES) * iterations
+    get_market_price(MARKET_QUERIES[0])
+    return {
+        "parser": backend,
+        "parse_ms": parse_ms,
+        "get_market_price_ms": summarize(time_calls(lambda query: get_market_price(query, "indore"), queries)),
+    }
+
+
+def bench_weather(iterations):
+    from agents.forecast import analyze
+    from agents.weather import get_weather_forecast
+
+    with open(os.path.join(FIXTURES_DIR, "openweather_forecast.json"), encoding="utf-8") as f:
+        forecast_data = json.load(f)
+    for city in WEATHER_CITIES:
+        get_weather_forecast(city)  # first call fetches; the rest is served from the client cache
+    return {
+        "analyze_ms": summarize(time_calls(analyze, [forecast_data] * iterations)),
+        "get_weather_forecast_ms": summarize(time_calls(get_weather_forecast, list(WEATHER_CITIES) * iterations)),
+    }
+
+
+# --- Report ---
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def flatten(report, prefix=""):
+    """{"a": {"b": {"p50": 1}}} -> {"a.b.p50": 1}, numbers only."""
+    flat = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, previous, tolerance):
+    """Prints p50/throughput/duration changes against an earlier report; returns the regressed metrics."""
+    now, before = flatten(current["results"]), flatten(previous["results"])
+    regressions = []
+    print(f"{'metric':<58}{'before':>12}{'now':>12}{'change':>9}")
+    for name in sorted(now.keys() & before.keys()):
+        if name.endswith((".p95", ".mean", ".n")) or not before[name]:
+            continue
+        change = now[name] / before[name] - 1
+        worse = -change if any(marker in name for marker in HIGHER_IS_BETTER) else change
+        flag = "  <-- regression" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<58}{before[name]:>12.4g}{now[name]:>12.4g}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON report.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and no per-module import timings.")
+    parser.add_argument("--compare", default=None, help="Earlier report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+    iterations = 10 if args.quick else args.iterations
+
+    with tempfile.TemporaryDirectory() as workdir, StubServer() as server:
+        # Set before any app module (and so config) is imported
+        os.environ.update(offline_environment(server.base_url, workdir))
+        results = {"cold_start": {"import_s": {} if args.quick else bench_imports()}}
+        inference_fn, model_timings = bench_model_load(workdir)
+        results["cold_start"].update(model_timings)
+        results["cold_start"]["spacy_load_s"] = bench_spacy()
+        results["diagnose"] = bench_diagnose(inference_fn, iterations, args.batch_sizes)
+        results["routing"] = bench_routing(load_corpus(), repeats=1 if args.quick else 3)
+        results["market"] = bench_market(iterations)
+        results["weather"] = bench_weather(iterations)
+        results["stub_requests"] = dict(server.requests)
+
+    report = {"meta": metadata(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Local stand-in for the upstream HTTP services, serving saved fixtures from
+benchmarks/fixtures/. Used by benchmarks and tests to run fully offline.
+
+    OpenWeather:  GET /weather?q=<city>   GET /forecast?q=<city>
+                  (q=nowhere answers 404 like an unknown city)
+    Mandi prices: GET /commodity/<slug>   (fixtures/mandi_<slug>.html; other slugs 404)
+
+Usage (from the repository root):
+    python -m benchmarks.stub_server --port 8765
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8765 MANDI_BASE_URL=http://127.0.0.1:8765 WEATHER_API_KEY=stub streamlit run app.py
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+UNKNOWN_CITY = "nowhere"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.count_request(self.path)
+        if server.latency:
+            time.sleep(server.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path in ("/weather", "/forecast"):
+            if query.get("q", [""])[0].lower() == UNKNOWN_CITY:
+                return self._send(404, b'{"cod": "404", "message": "city not found"}')
+            fixture = "openweather_current.json" if url.path == "/weather" else "openweather_forecast.json"
+            return self._send(200, server.fixtures[fixture])
+        if url.path.startswith("/commodity/"):
+            fixture = f"mandi_{url.path[len('/commodity/'):]}.html"
+            if fixture in server.fixtures:
+                return self._send(200, server.fixtures[fixture], "text/html; charset=utf-8")
+        return self._send(404, b'{"message": "not found"}')
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded fixture server; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        super().__init__((host, port), StubHandler)
+        self.latency = latency_ms / 1000.0
+        self.fixtures = {name: load_fixture(name) for name in os.listdir(FIXTURES_DIR) if name.endswith((".json", ".html"))}
+        self.requests = {}
+        self._requests_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self, path):
+        with self._requests_lock:
+            endpoint = urlparse(path).path
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Artificial delay per request.")
+    args = parser.parse_args()
+    server = StubServer(args.host, args.port, args.latency_ms)
+    print(f"Serving fixtures on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
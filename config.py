@@ -0,0 +1,129 @@
+"""
+Application settings, read ONCE at startup from the environment (and the
+.env file, if present). Import this module instead of calling load_dotenv()
+or os.getenv() on the request path.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _parse_mapping(value, cast=float):
+    """'price=15,weather=10' -> {'price': 15.0, 'weather': 10.0}"""
+    mapping = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        key, _, number = item.partition('=')
+        mapping[key.strip()] = cast(number)
+    return mapping
+
+
+# --- OpenWeather ---
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
+# Point this at a local stub server (benchmarks/stub_server.py) for offline runs
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5").rstrip('/')
+# Per-location cache lifetimes (seconds) and the refresh-ahead worker for popular cities
+WEATHER_CURRENT_TTL = float(os.getenv("WEATHER_CURRENT_TTL", "600"))
+WEATHER_FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL", "3600"))
+WEATHER_REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", "60"))
+WEATHER_REFRESH_TOP_N = int(os.getenv("WEATHER_REFRESH_TOP_N", "25"))
+
+# --- Mandi prices ---
+# Point this at a local stub server (benchmarks/stub_server.py) for offline runs
+MANDI_BASE_URL = os.getenv("MANDI_BASE_URL", "https://mandibhavindia.in").rstrip('/')
+# Commodity pages are re-fetched at most this often (seconds); prices change a few times a day
+MANDI_PRICE_TTL = float(os.getenv("MANDI_PRICE_TTL", "10800"))
+MANDI_REFRESH_INTERVAL = float(os.getenv("MANDI_REFRESH_INTERVAL", "300"))
+# Every fetched price row is kept here for trend queries; empty disables the history
+MANDI_HISTORY_PATH = os.getenv("MANDI_HISTORY_PATH", ".cache/mandi_prices.sqlite")
+# Price-table parser: auto (fastest installed), selectolax, lxml, stdlib or bs4
+MANDI_TABLE_PARSER = os.getenv("MANDI_TABLE_PARSER", "auto").lower()
+
+# --- Intent routing ---
+# The intent classifier decides when it is at least this sure, and this far ahead
+# of the runner-up intent; the keyword router otherwise
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.7"))
+INTENT_MIN_MARGIN = float(os.getenv("INTENT_MIN_MARGIN", "0.4"))
+
+# --- Agent execution ---
+# Agent calls (price, weather, translate, ...) run on one shared pool; each agent
+# gets a timeout (seconds) and optionally a cap on concurrent calls across sessions
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "16"))
+AGENT_DEFAULT_TIMEOUT = float(os.getenv("AGENT_DEFAULT_TIMEOUT", "20"))
+AGENT_TIMEOUTS = _parse_mapping(os.getenv("AGENT_TIMEOUTS", "price=15,weather=15,translate=10,diagnose=30"))
+AGENT_CONCURRENCY = _parse_mapping(os.getenv("AGENT_CONCURRENCY", "price=4,weather=8,translate=4,diagnose=16"), int)
+# How often a session with pending agent calls checks for results (seconds)
+AGENT_POLL_INTERVAL = float(os.getenv("AGENT_POLL_INTERVAL", "0.5"))
+
+# --- Chat history ---
+# Each session keeps its newest messages in memory and moves older ones to SQLite;
+# the chat renders one page of messages and loads earlier pages on request
+CHAT_HISTORY_PATH = os.getenv("CHAT_HISTORY_PATH", ".cache/chat_history.sqlite")
+CHAT_HISTORY_IN_MEMORY = int(os.getenv("CHAT_HISTORY_IN_MEMORY", "40"))
+CHAT_HISTORY_PAGE = int(os.getenv("CHAT_HISTORY_PAGE", "20"))
+CHAT_HISTORY_RETENTION = float(os.getenv("CHAT_HISTORY_RETENTION", str(7 * 24 * 3600)))
+
+# --- HTTP inference API (api.py) ---
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Worker processes; each loads its own copy of the models
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+# Requests a worker handles at once; beyond this it answers 503 instead of queueing
+API_MAX_INFLIGHT = int(os.getenv("API_MAX_INFLIGHT", "64"))
+API_MAX_UPLOAD_BYTES = int(os.getenv("API_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# When set, app.py sends queries and photos to this API instead of running the agents itself
+INFERENCE_API_URL = os.getenv("INFERENCE_API_URL", "").rstrip('/')
+INFERENCE_API_TIMEOUT = float(os.getenv("INFERENCE_API_TIMEOUT", "30"))
+
+# --- Pest detector ---
+# Concurrent diagnoses are grouped into one forward pass once either limit is hit
+PEST_MAX_BATCH_SIZE = int(os.getenv("PEST_MAX_BATCH_SIZE", "16"))
+PEST_MAX_BATCH_WAIT_MS = float(os.getenv("PEST_MAX_BATCH_WAIT_MS", "5"))
+# How batches are pushed through the network: "function" (traced graph, default),
+# "call" (eager model(x, training=False)) or "predict" (original Keras predict loop)
+PEST_INFERENCE_MODE = os.getenv("PEST_INFERENCE_MODE", "function").lower()
+# Runtime backend: "keras" (float32 EfficientNetB0) or "tflite" (quantized export, see model/export_tflite.py)
+PEST_BACKEND = os.getenv("PEST_BACKEND", "keras").lower()
+PEST_TFLITE_MODEL_PATH = os.getenv("PEST_TFLITE_MODEL_PATH", "model/saved_model/krishi_multicrop_model_int8.tflite")
+PEST_TFLITE_NUM_THREADS = int(os.getenv("PEST_TFLITE_NUM_THREADS", str(os.cpu_count() or 1)))
+# Repeat uploads of the same photo are answered from this cache (PEST_CACHE_PATH="" keeps it in memory only)
+PEST_CACHE_SIZE = int(os.getenv("PEST_CACHE_SIZE", "1024"))
+PEST_CACHE_PATH = os.getenv("PEST_CACHE_PATH", "")
+# Post-processing: how many candidate classes to report, the softmax temperature
+# (fitted on a labelled set by model/check_tflite_parity.py --data-dir) and the calibrated
+# confidence below which the farmer is asked to retake the photo
+PEST_TOP_K = int(os.getenv("PEST_TOP_K", "3"))
+PEST_TEMPERATURE = float(os.getenv("PEST_TEMPERATURE", "1.0"))
+PEST_UNCERTAINTY_THRESHOLD = float(os.getenv("PEST_UNCERTAINTY_THRESHOLD", "0.4"))
+# High-accuracy mode (test-time augmentation): up to PEST_TTA_VIEWS crops/flips
+# of each photo run in one batched forward pass and their softmax outputs are
+# averaged; fewer views run whenever a diagnosis would exceed PEST_TTA_BUDGET_MS.
+# PEST_HIGH_ACCURACY makes it the default; callers can also ask for it per photo.
+PEST_HIGH_ACCURACY = os.getenv("PEST_HIGH_ACCURACY", "0") == "1"
+PEST_TTA_VIEWS = int(os.getenv("PEST_TTA_VIEWS", "8"))
+PEST_TTA_BUDGET_MS = float(os.getenv("PEST_TTA_BUDGET_MS", "300"))
+# Start loading the model in the background as soon as the app starts
+PEST_PREWARM = os.getenv("PEST_PREWARM", "1") == "1"
+
+# --- Translation ---
+# "googletrans" (online) or "offline" (phrasebook, for tests and benchmarks)
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "googletrans").lower()
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", ".cache/translations.sqlite")
+TRANSLATION_MEMORY_SIZE = int(os.getenv("TRANSLATION_MEMORY_SIZE", "4096"))
+
+# --- Tracing ---
+# Timed spans around every stage of a chat turn (off by default): written to a
+# JSON-lines log and, if a port is set, served as Prometheus text on /metrics
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", ".cache/traces.jsonl")
+TRACE_METRICS_PORT = int(os.getenv("TRACE_METRICS_PORT", "0"))
+# Recent spans per stage kept for the p50/p95 summary
+TRACE_WINDOW = int(os.getenv("TRACE_WINDOW", "1024"))
+
+# --- Outbound HTTP ---
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "8"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.3"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
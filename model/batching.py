@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# --- Micro-batching queue for concurrent inference requests ---
+class MicroBatcher:
+    """
+    Collects inference requests coming from many threads (e.g. several
+    Streamlit sessions uploading at once) and runs them through the model as
+    ONE batched call. A batch is flushed as soon as it holds `max_batch_size`
+    samples or the oldest request has waited `max_wait_ms`. A multi-sample
+    request always runs whole, in one call; one that does not fit in the
+    current batch starts the next, so no batch exceeds `max_batch_size`.
+
+    The model runs on the batcher's worker thread, so callers that trace or
+    time their requests read it off the returned Future: once it is done,
+    `future.batch_size` is the number of rows in the forward pass the request
+    ran in and `future.run_seconds` how long that pass took.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        # A multi-sample request that did not fit in the previous batch
+        self._carried = None
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="pest-detector-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, sample):
+        """Queues one preprocessed sample and returns a Future for its prediction row."""
+        return self._enqueue(sample[np.newaxis], single=True)
+
+    def submit_many(self, samples):
+        """
+        Queues a stack of at most `max_batch_size` samples (e.g. the augmented
+        views of one photo) that always run in the same forward pass; the
+        Future gets their (N, C) rows.
+        """
+        samples = np.asarray(samples)
+        if len(samples) > self.max_batch_size:
+            raise ValueError(f"{len(samples)} samples do not fit in one batch of {self.max_batch_size}.")
+        return self._enqueue(samples, single=False)
+
+    def _enqueue(self, samples, single):
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+        future = Future()
+        self._queue.put((samples, future, single))
+        return future
+
+    def predict(self, sample, timeout=None):
+        """Blocking helper: submit one sample and wait for its own prediction row."""
+        return self.submit(sample).result(timeout=timeout)
+
+    def predict_many(self, samples, timeout=None):
+        """Blocking helper for submit_many."""
+        return self.submit_many(samples).result(timeout=timeout)
+
+    def close(self):
+        """Stops the worker thread once the already queued requests are served."""
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first):
+        batch = [first]
+        rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the shutdown marker so the run loop sees it after this batch
+                self._queue.put(None)
+                break
+            if rows + len(item[0]) > self.max_batch_size:
+                self._carried = item
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first, self._carried = self._carried or self._queue.get(), None
+            if first is None:
+                return
+            batch = self._collect(first)
+            # Skip requests whose caller already gave up
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            samples = np.concatenate([samples for samples, _, _ in batch])
+            started = time.perf_counter()
+            try:
+                predictions = self.predict_fn(samples)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            run_seconds = time.perf_counter() - started
+            start = 0
+            for samples, future, single in batch:
+                future.batch_size, future.run_seconds = len(predictions), run_seconds
+                rows = predictions[start:start + len(samples)]
+                start += len(samples)
+                future.set_result(rows[0] if single else rows)
@@ -0,0 +1,302 @@
+"""
+Offline bulk diagnosis for field surveys: runs every leaf photo in a folder
+(or a .zip / .tar archive) through the pest detector and writes one row per
+image with its top-k classes to CSV or Parquet.
+
+Images are streamed, never listed up front. A thread pool decodes and resizes
+the next batches while the model runs on the current one, and results are
+appended to the output after every batch, so memory stays flat however large
+the survey is (only the ids of finished images are kept, to skip them).
+Re-running with the same output resumes where the last run stopped.
+
+Usage (from the repository root):
+    python -m model.bulk_survey data/survey_aug/ --output survey_aug.csv
+    python -m model.bulk_survey survey_aug.zip --output survey_aug/ --format parquet --batch-size 64
+"""
+import argparse
+import collections
+import csv
+import importlib.util
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from model.pest_detector import (
+    CLASS_NAMES, IMAGE_ERROR, TOP_K, DiagnosisResult, diagnose_prepared, pest_model, prepare_image,
+)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+OUTPUT_FORMATS = ("csv", "parquet")
+# Rows per Parquet part file; CSV rows are appended after every batch
+PARQUET_PART_ROWS = 4096
+
+
+def _is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+# --- Sources: (image id, path or encoded bytes), lazily ---
+def iter_directory(directory, root=None):
+    """Every image under `directory`, ids relative to it; read by the decode workers."""
+    root = root or directory
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_directory(entry.path, root)
+            elif entry.is_file() and _is_image(entry.name):
+                yield os.path.relpath(entry.path, root).replace(os.sep, "/"), entry.path
+
+
+def iter_zip(path):
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _is_image(info.filename):
+                yield info.filename, archive.read(info)
+
+
+def iter_tar(path):
+    # Stream mode: members are read in archive order, without seeking or an index
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and _is_image(member.name):
+                yield member.name, archive.extractfile(member).read()
+
+
+def iter_images(source):
+    if os.path.isdir(source):
+        return iter_directory(source)
+    if source.lower().endswith(".zip"):
+        return iter_zip(source)
+    if source.lower().endswith(ARCHIVE_EXTENSIONS):
+        return iter_tar(source)
+    raise ValueError(f"'{source}' is not a directory or a {'/'.join(ARCHIVE_EXTENSIONS)} archive.")
+
+
+# --- Decode pipeline ---
+def decoded_batches(items, batch_size, workers, prefetch):
+    """
+    Yields (ids, samples, failed) for consecutive batches of `items`, where
+    `failed` lists (id, reason) for images that could not be decoded. Decoding
+    runs on `workers` threads (TensorFlow's decode and resize release the GIL)
+    and stays up to `prefetch` batches ahead of the consumer.
+    """
+    items = iter(items)
+    window = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as pool:
+        def fill():
+            while len(window) < batch_size * (prefetch + 1):
+                item = next(items, None)
+                if item is None:
+                    return
+                image_id, payload = item
+                window.append((image_id, pool.submit(prepare_image, payload)))
+
+        fill()
+        while window:
+            batch = [window.popleft() for _ in range(min(batch_size, len(window)))]
+            fill()
+            ids, samples, failed = [], [], []
+            for image_id, future in batch:
+                try:
+                    samples.append(future.result())
+                    ids.append(image_id)
+                except Exception as e:
+                    failed.append((image_id, str(e).splitlines()[0] if str(e) else type(e).__name__))
+            yield ids, samples, failed
+
+
+def diagnose_fixed_batch(samples, batch_size, top_k):
+    """Runs the model on `samples`, zero-padded to `batch_size` so every call has the same input shape."""
+    batch = np.stack(samples)
+    if len(batch) < batch_size:
+        # The TFLite interpreter reallocates its tensors on every shape change
+        padding = np.zeros((batch_size - len(batch),) + batch.shape[1:], dtype=batch.dtype)
+        batch = np.concatenate([batch, padding])
+    return diagnose_prepared(batch, top_k)[:len(samples)]
+
+
+# --- Output ---
+def result_columns(top_k):
+    columns = ["image", "class_name", "confidence", "crop", "is_healthy", "disease_probability", "uncertain"]
+    for rank in range(1, top_k + 1):
+        columns += [f"top{rank}_class", f"top{rank}_probability"]
+    return columns + ["error"]
+
+
+def result_row(image_id, result, top_k, reason=None):
+    row = {
+        "image": image_id,
+        "class_name": result.class_name,
+        "confidence": result.confidence if not result.error else None,
+        "crop": result.crop,
+        "is_healthy": result.is_healthy,
+        "disease_probability": result.disease_probability if not result.error else None,
+        "uncertain": result.uncertain,
+        "error": f"{result.error}: {reason}" if reason else result.error,
+    }
+    for rank in range(1, top_k + 1):
+        name, probability = result.top_k[rank - 1] if rank <= len(result.top_k) else (None, None)
+        row[f"top{rank}_class"] = name
+        row[f"top{rank}_probability"] = probability
+    return row
+
+
+def _truncate_partial_line(path):
+    """Drops a last row left half-written by an interrupted run."""
+    with open(path, "rb+") as f:
+        position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(position - step + newline + 1)
+                return
+            position -= step
+        f.truncate(0)
+
+
+class CsvResultWriter:
+    """Appends rows to a CSV file, flushed after every batch; `done` holds the ids already in it."""
+
+    def __init__(self, path, columns):
+        self.done = set()
+        if os.path.exists(path) and os.path.getsize(path):
+            _truncate_partial_line(path)
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames and reader.fieldnames != columns:
+                    raise ValueError(f"{path} was written with other columns (a different --top-k?); use a new output.")
+                self.done.update(row["image"] for row in reader)
+        new_file = not os.path.exists(path) or not os.path.getsize(path)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, columns)
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """
+    Writes rows as numbered part files in a directory (a Parquet dataset that
+    pandas, pyarrow or DuckDB read as one table). Each part is written to a
+    temporary name and renamed, so an interrupted run never leaves a torn file.
+    """
+
+    def __init__(self, directory, columns, part_rows=PARQUET_PART_ROWS):
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow); use --format csv otherwise.")
+        import pandas as pd
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.columns = columns
+        self.part_rows = part_rows
+        self._buffer = []
+        parts = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+        self._next_part = len(parts)
+        self.done = set()
+        for name in parts:
+            self.done.update(pd.read_parquet(os.path.join(directory, name), columns=["image"])["image"])
+
+    def write(self, rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.part_rows:
+            self._flush()
+
+    def _flush(self):
+        import pandas as pd
+
+        if not self._buffer:
+            return
+        path = os.path.join(self.directory, f"part-{self._next_part:05d}.parquet")
+        pd.DataFrame(self._buffer, columns=self.columns).to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        self._next_part += 1
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+
+
+def default_format(output):
+    """Parquet for a directory (existing, or given with a trailing slash) or a .parquet path; CSV otherwise."""
+    if os.path.isdir(output) or output.endswith(("/", os.sep)) or output.lower().endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def open_writer(output, output_format, columns):
+    if output_format == "parquet":
+        return ParquetResultWriter(output, columns)
+    return CsvResultWriter(output, columns)
+
+
+# --- Job ---
+def run_survey(source, writer, batch_size=32, workers=None, prefetch=2, top_k=TOP_K, report_every=10.0):
+    """Diagnoses every image of `source` not yet in `writer`; returns (images, errors, seconds)."""
+    workers = workers or os.cpu_count() or 1
+    pending = (item for item in iter_images(source) if item[0] not in writer.done)
+    processed = errors = 0
+    start = last_report = time.perf_counter()
+    for ids, samples, failed in decoded_batches(pending, batch_size, workers, prefetch):
+        rows = [result_row(image_id, DiagnosisResult.from_error(IMAGE_ERROR), top_k, reason) for image_id, reason in failed]
+        if samples:
+            results = diagnose_fixed_batch(samples, batch_size, top_k)
+            rows += [result_row(image_id, result, top_k) for image_id, result in zip(ids, results)]
+        writer.write(rows)
+        processed += len(rows)
+        errors += len(failed)
+
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            print(f"{processed} images, {processed / (now - start):.1f} images/sec")
+            last_report = now
+    return processed, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of images, or a .zip/.tar(.gz/.bz2/.xz) archive.")
+    parser.add_argument("--output", required=True, help="CSV file, or directory of Parquet parts.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None, help="Default: parquet if the output is a directory or ends in .parquet, else csv.")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None, help="Decode threads (default: CPU count).")
+    parser.add_argument("--prefetch", type=int, default=2, help="Batches decoded ahead of the model.")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between throughput reports.")
+    args = parser.parse_args()
+
+    output_format = args.format or default_format(args.output)
+    if pest_model.get() is None or not CLASS_NAMES:
+        raise SystemExit("[ERROR] The pest detector could not be loaded; nothing was diagnosed.")
+
+    try:
+        writer = open_writer(args.output, output_format, result_columns(args.top_k))
+    except (ImportError, ValueError) as e:
+        raise SystemExit(f"[ERROR] {e}")
+    if writer.done:
+        print(f"Resuming: {len(writer.done)} images already in {args.output}")
+    try:
+        processed, errors, seconds = run_survey(
+            args.source, writer, args.batch_size, args.workers, args.prefetch, args.top_k, args.report_every,
+        )
+    finally:
+        writer.close()
+    rate = processed / seconds if seconds else 0.0
+    print(f"✅ {processed} images diagnosed ({errors} unreadable) in {seconds:.1f}s: {rate:.1f} images/sec")
+
+
+if __name__ == "__main__":
+    main()
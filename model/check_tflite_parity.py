@@ -0,0 +1,102 @@
+"""
+Accuracy-parity check between the Keras backend and an exported TFLite model.
+
+With --data-dir pointing at a labeled folder (one sub-folder per class name in
+class_names.json) it reports per-class accuracy for both backends over all
+classes, plus the softmax temperature that calibrates each backend's confidence
+(set it as PEST_TEMPERATURE). Without it, random inputs are used and only top-1
+agreement is checked.
+
+Usage (from the repository root):
+    python -m model.check_tflite_parity --tflite model/saved_model/krishi_multicrop_model_int8.tflite \\
+        --data-dir data/plantdoc/test
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from model.export_tflite import find_images
+from model.postprocessing import fit_temperature
+from model.pest_detector import (
+    CLASS_NAMES, IMG_SIZE, MODEL_PATH, TFLITE_NUM_THREADS, TFLiteClassifier, prepare_image,
+    build_inference_fn, create_model_architecture,
+)
+
+
+def load_labeled_samples(data_dir, limit_per_class=None):
+    """Returns (paths, labels) for every image in a class-named sub-folder."""
+    paths, labels = [], []
+    for label, class_name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            print(f"[WARN] No folder for class '{class_name}', skipping.")
+            continue
+        class_paths = find_images(class_dir)[:limit_per_class]
+        paths.extend(class_paths)
+        labels.extend([label] * len(class_paths))
+    return paths, np.array(labels, dtype=np.int64)
+
+
+def run_backend(inference_fn, samples, batch_size):
+    """Returns stacked softmax outputs for `samples`, `batch_size` at a time."""
+    outputs = [inference_fn(samples[start:start + batch_size]) for start in range(0, len(samples), batch_size)]
+    return np.concatenate(outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--tflite", required=True)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--limit-per-class", type=int, default=None)
+    parser.add_argument("--num-random", type=int, default=64, help="Random inputs used when --data-dir is not given.")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--num-threads", type=int, default=TFLITE_NUM_THREADS)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    keras_model = create_model_architecture(num_classes=len(CLASS_NAMES))
+    keras_model.load_weights(args.weights)
+    keras_fn = build_inference_fn(keras_model, "function")
+    tflite_fn = TFLiteClassifier(args.tflite, args.num_threads)
+
+    if args.data_dir:
+        paths, labels = load_labeled_samples(args.data_dir, args.limit_per_class)
+        samples = np.stack([prepare_image(path) for path in paths])
+    else:
+        labels = None
+        samples = np.random.default_rng(0).uniform(0, 255, (args.num_random, IMG_SIZE, IMG_SIZE, 3)).astype(np.float32)
+    if len(samples) == 0:
+        sys.exit("No samples to evaluate.")
+
+    keras_probs = run_backend(keras_fn, samples, args.batch_size)
+    tflite_probs = run_backend(tflite_fn, samples, args.batch_size)
+    keras_top1 = keras_probs.argmax(axis=1)
+    tflite_top1 = tflite_probs.argmax(axis=1)
+
+    agreement = np.mean(keras_top1 == tflite_top1)
+    print(f"Samples: {len(samples)}")
+    print(f"Top-1 agreement: {agreement:.2%}")
+    print(f"Max |Δ probability|: {np.abs(keras_probs - tflite_probs).max():.4f}")
+
+    if labels is not None:
+        print(f"\n{'class':<32}{'n':>5}{'keras':>9}{'tflite':>9}")
+        for label, class_name in enumerate(CLASS_NAMES):
+            mask = labels == label
+            if not mask.any():
+                continue
+            keras_acc = np.mean(keras_top1[mask] == label)
+            tflite_acc = np.mean(tflite_top1[mask] == label)
+            print(f"{class_name:<32}{mask.sum():>5}{keras_acc:>9.1%}{tflite_acc:>9.1%}")
+        print(f"{'overall':<32}{len(labels):>5}{np.mean(keras_top1 == labels):>9.1%}{np.mean(tflite_top1 == labels):>9.1%}")
+        print(f"{'temperature':<32}{'':>5}{fit_temperature(keras_probs, labels):>9.2f}{fit_temperature(tflite_probs, labels):>9.2f}")
+
+    if agreement < args.min_agreement:
+        sys.exit(f"❌ Parity check failed: agreement {agreement:.2%} < {args.min_agreement:.0%}")
+    print("✅ Parity check passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# --- Content-addressed cache of diagnoses ---
+def content_key(data):
+    """SHA-256 hex digest of raw image bytes or of a decoded image array."""
+    if isinstance(data, np.ndarray):
+        digest = hashlib.sha256(str(data.shape).encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+        return digest.hexdigest()
+    return hashlib.sha256(bytes(data)).hexdigest()
+
+
+class DiagnosisCache:
+    """
+    LRU cache of diagnoses keyed by image content, so a photo that is uploaded
+    again (or forwarded to many accounts) skips the forward pass. Each entry
+    keeps the predicted class index and the full confidence vector, from which
+    the structured result (and its rendering in any language) is rebuilt.
+
+    If `persist_path` is set, entries are written through to a small SQLite
+    file and the most recent ones are reloaded on startup.
+    """
+
+    def __init__(self, max_entries=1024, persist_path=None):
+        self.max_entries = max(1, int(max_entries))
+        self.persist_path = persist_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if persist_path:
+            self._open_db(persist_path)
+
+    # --- Persistence ---
+    def _open_db(self, path):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS diagnoses (key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            rows = self._db.execute(
+                "SELECT key, payload FROM diagnoses ORDER BY updated_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            # Oldest first, so the most recently used entry ends up at the MRU end
+            for key, payload in reversed(rows):
+                self._entries[key] = json.loads(payload)
+            self._db.execute(
+                "DELETE FROM diagnoses WHERE key NOT IN (SELECT key FROM diagnoses ORDER BY updated_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"[WARN] Diagnosis cache persistence disabled: {e}")
+            self._db = None
+
+    def _write(self, key, entry):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO diagnoses (key, payload, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry), time.time()),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not persist diagnosis cache entry: {e}")
+
+    def _delete(self, key):
+        if self._db is None:
+            return
+        try:
+            self._db.execute("DELETE FROM diagnoses WHERE key = ?", (key,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not delete diagnosis cache entry: {e}")
+
+    # --- Cache API ---
+    def get(self, key):
+        """Returns the cached entry for `key` (and marks it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, class_index, probabilities):
+        """Stores a fresh diagnosis."""
+        entry = {
+            "class_index": int(class_index),
+            "probabilities": [float(p) for p in probabilities],
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._write(key, entry)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._delete(evicted_key)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is None:
+                return
+            try:
+                self._db.execute("DELETE FROM diagnoses")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not clear the persisted diagnosis cache: {e}")
+
+    def stats(self):
+        """Hit-rate counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
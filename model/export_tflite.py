@@ -0,0 +1,93 @@
+"""
+Exports the trained KrishiMitra classifier to TFLite.
+
+Two variants are produced:
+  * dynamic - dynamic-range quantization (int8 weights, float activations)
+  * int8    - full integer quantization, calibrated on a representative dataset
+
+Usage (from the repository root):
+    python -m model.export_tflite --calibration-dir data/plantdoc/train
+"""
+import argparse
+import os
+import random
+
+import numpy as np
+import tensorflow as tf
+
+from model.pest_detector import CLASS_NAMES, IMG_SIZE, MODEL_PATH, prepare_image, create_model_architecture
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+EXPORT_MODES = ("dynamic", "int8")
+
+
+def find_images(directory):
+    """Recursively lists image files under `directory`."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(paths)
+
+
+def representative_dataset(calibration_dir=None, num_samples=200, seed=0):
+    """
+    Builds the calibration generator the int8 converter uses to pick activation
+    ranges. Real field photos should be used; random noise is only a fallback
+    so the pipeline can be smoke-tested without the dataset.
+    """
+    paths = find_images(calibration_dir) if calibration_dir else []
+    if paths:
+        random.Random(seed).shuffle(paths)
+        paths = paths[:num_samples]
+    else:
+        print("[WARN] No calibration images found, calibrating on random noise. Accuracy will suffer.")
+
+    def generator():
+        if paths:
+            for path in paths:
+                yield [np.expand_dims(prepare_image(path), axis=0)]
+        else:
+            rng = np.random.default_rng(seed)
+            for _ in range(num_samples):
+                yield [rng.uniform(0, 255, (1, IMG_SIZE, IMG_SIZE, 3)).astype(np.float32)]
+    return generator
+
+
+def convert(keras_model, mode, calibration_dir=None, num_samples=200):
+    """Returns the serialized TFLite flatbuffer for the requested quantization mode."""
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "int8":
+        converter.representative_dataset = representative_dataset(calibration_dir, num_samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif mode != "dynamic":
+        raise ValueError(f"Unknown export mode '{mode}'. Expected one of {EXPORT_MODES}.")
+    return converter.convert()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--output-dir", default=os.path.dirname(MODEL_PATH))
+    parser.add_argument("--calibration-dir", default=None, help="Folder of leaf photos used for int8 calibration.")
+    parser.add_argument("--num-calibration", type=int, default=200)
+    parser.add_argument("--modes", nargs="+", default=list(EXPORT_MODES), choices=EXPORT_MODES)
+    args = parser.parse_args()
+
+    keras_model = create_model_architecture(num_classes=len(CLASS_NAMES))
+    keras_model.load_weights(args.weights)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    base_name = os.path.splitext(os.path.basename(args.weights))[0]
+    for mode in args.modes:
+        flatbuffer = convert(keras_model, mode, args.calibration_dir, args.num_calibration)
+        output_path = os.path.join(args.output_dir, f"{base_name}_{mode}.tflite")
+        with open(output_path, 'wb') as f:
+            f.write(flatbuffer)
+        print(f"✅ Wrote {mode} model to {output_path} ({len(flatbuffer) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
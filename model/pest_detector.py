@@ -1,18 +1,41 @@
-import tensorflow as tf
 import numpy as np
 import json
-import os
-from keras.utils import load_img, img_to_array
-from keras.applications.efficientnet import preprocess_input
-# --- Add imports needed to rebuild the model ---
-from keras.applications import EfficientNetB0
-from keras.models import Model
-from keras.layers import GlobalAveragePooling2D, Dense, Dropout, Input
+import threading
+import time
+
+import config
+from model.batching import MicroBatcher
+from model.diagnosis_cache import DiagnosisCache, content_key
+from model.postprocessing import ClassIndex, DiagnosisResult, postprocess
+from services.rendering import AgentResponse, localized, register_templates
+from model.registry import register
+from model.tta import VIEWS, ViewBudget, make_views
+from services.tracing import current_span, span, traced
+# NOTE: TensorFlow/Keras are imported inside the functions that need them, so
+# importing this module (e.g. from app.py) stays cheap and the chat UI comes up
+# before the model is loaded.
 
 # --- Constants ---
 MODEL_PATH = 'model/saved_model/krishi_multicrop_model.keras'
 CLASS_NAMES_PATH = 'model/class_names.json'
 IMG_SIZE = 224
+INFERENCE_MODES = ("function", "call", "predict")
+# Settings (PEST_* in config.py)
+MAX_BATCH_SIZE = config.PEST_MAX_BATCH_SIZE
+MAX_BATCH_WAIT_MS = config.PEST_MAX_BATCH_WAIT_MS
+INFERENCE_MODE = config.PEST_INFERENCE_MODE
+BACKEND = config.PEST_BACKEND
+TFLITE_MODEL_PATH = config.PEST_TFLITE_MODEL_PATH
+TFLITE_NUM_THREADS = config.PEST_TFLITE_NUM_THREADS
+CACHE_SIZE = config.PEST_CACHE_SIZE
+CACHE_PATH = config.PEST_CACHE_PATH
+TOP_K = config.PEST_TOP_K
+TEMPERATURE = config.PEST_TEMPERATURE
+UNCERTAINTY_THRESHOLD = config.PEST_UNCERTAINTY_THRESHOLD
+HIGH_ACCURACY = config.PEST_HIGH_ACCURACY
+TTA_VIEWS = min(config.PEST_TTA_VIEWS, len(VIEWS))
+TTA_BUDGET_MS = config.PEST_TTA_BUDGET_MS
+PREWARM = config.PEST_PREWARM
 
 # --- Load Class Names ---
 try:
@@ -28,6 +51,10 @@ def create_model_architecture(num_classes):
     This must be IDENTICAL to the architecture in your training script,
     minus the data augmentation layers.
     """
+    from keras.applications import EfficientNetB0
+    from keras.models import Model
+    from keras.layers import GlobalAveragePooling2D, Dense, Dropout, Input
+
     # Define the input layer
     inputs = Input(shape=(IMG_SIZE, IMG_SIZE, 3))
     
@@ -45,16 +72,110 @@ def create_model_architecture(num_classes):
     model = Model(inputs=inputs, outputs=outputs)
     return model
 
+# --- Inference fast path ---
+def build_inference_fn(keras_model, mode=INFERENCE_MODE):
+    """
+    Returns a callable mapping a float32 (N, IMG_SIZE, IMG_SIZE, 3) batch to a
+    numpy array of softmax rows. "function" traces the forward pass once with a
+    fixed input signature, so single-image calls skip the Keras predict()
+    data-adapter and callback machinery entirely.
+    """
+    import tensorflow as tf
+
+    if mode == "predict":
+        return lambda batch: keras_model.predict(batch, batch_size=len(batch), verbose=0)
+    if mode == "call":
+        return lambda batch: keras_model(batch, training=False).numpy()
+    if mode == "function":
+        @tf.function(input_signature=[tf.TensorSpec(shape=(None, IMG_SIZE, IMG_SIZE, 3), dtype=tf.float32)])
+        def serve(batch):
+            return keras_model(batch, training=False)
+        return lambda batch: serve(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()
+    raise ValueError(f"Unknown inference mode '{mode}'. Expected one of {INFERENCE_MODES}.")
+
+# --- TFLite runtime backend ---
+def _tflite_interpreter_class():
+    """Prefers the lightweight LiteRT/tflite-runtime packages, falling back to TensorFlow's bundled interpreter."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class TFLiteClassifier:
+    """
+    Runs the exported (optionally int8-quantized) classifier through the TFLite
+    interpreter. Behaves like the callables from build_inference_fn: float32
+    preprocessed batch in, float32 softmax rows out.
+    """
+
+    def __init__(self, model_path, num_threads=TFLITE_NUM_THREADS):
+        self.interpreter = _tflite_interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input_detail['shape'][0])
+        # The interpreter is not thread-safe; the batcher and bulk jobs may share it
+        self._lock = threading.Lock()
+
+    def _quantize(self, batch):
+        scale, zero_point = self.input_detail['quantization']
+        dtype = self.input_detail['dtype']
+        if dtype == np.float32 or scale == 0:
+            return batch.astype(dtype)
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, output):
+        scale, zero_point = self.output_detail['quantization']
+        if output.dtype == np.float32 or scale == 0:
+            return output.astype(np.float32)
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self.interpreter.resize_tensor_input(self.input_detail['index'], list(batch.shape))
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(batch)
+            self.interpreter.set_tensor(self.input_detail['index'], self._quantize(batch))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self.output_detail['index']))
+
+def warm_up(inference_fn):
+    """Runs one dummy batch so graph tracing/allocation is not paid by the first farmer."""
+    inference_fn(np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+
 # --- Load Model using the Robust Load Weights Method ---
-try:
-    # 1. Create the empty architecture
-    model = create_model_architecture(num_classes=len(CLASS_NAMES))
-    # 2. Load your trained weights into that architecture
-    model.load_weights(MODEL_PATH)
-    print("✅ Model loaded successfully using the robust load_weights method.")
-except Exception as e:
-    print(f"CRITICAL ERROR: Failed to build architecture or load weights: {e}")
-    model = None
+def _load_inference_fn():
+    """Builds the configured backend and warms it up. Runs once per process, on first use."""
+    if BACKEND == "tflite":
+        # The quantized export replaces the float32 Keras graph entirely
+        inference_fn = TFLiteClassifier(TFLITE_MODEL_PATH, TFLITE_NUM_THREADS)
+        print(f"✅ TFLite model loaded from {TFLITE_MODEL_PATH} ({TFLITE_NUM_THREADS} threads).")
+    else:
+        # 1. Create the empty architecture
+        model = create_model_architecture(num_classes=len(CLASS_NAMES))
+        # 2. Load your trained weights into that architecture
+        model.load_weights(MODEL_PATH)
+        print("✅ Model loaded successfully using the robust load_weights method.")
+        # 3. Compile the selected inference path
+        inference_fn = build_inference_fn(model, INFERENCE_MODE)
+    warm_up(inference_fn)
+    return inference_fn
+
+# Shared by every session in the process; nothing is built until the first diagnosis or prewarm()
+pest_model = register("pest_detector", _load_inference_fn)
+
+def prewarm():
+    """Loads the classifier in a background thread if PEST_PREWARM is enabled."""
+    if PREWARM:
+        pest_model.prewarm()
 
 # --- Knowledge Base for Remedies (Tailored to PlantDoc classes) ---
 REMEDY_KNOWLEDGE_BASE = {
@@ -85,55 +206,360 @@ REMEDY_KNOWLEDGE_BASE = {
 }
 DEFAULT_REMEDY = "Consult a local agricultural expert for specific treatment options."
 
-def diagnose_plant_disease(image_path):
+# --- Precomputed Hindi translation tables (no network translation on the hot path) ---
+CLASS_NAMES_HI = {
+    "Apple Scab Leaf": "सेब की पत्ती - स्कैब रोग",
+    "Apple leaf": "सेब की पत्ती",
+    "Apple rust leaf": "सेब की पत्ती - रस्ट (गेरुआ) रोग",
+    "Bell_pepper leaf": "शिमला मिर्च की पत्ती",
+    "Bell_pepper leaf spot": "शिमला मिर्च की पत्ती - पत्ती धब्बा रोग",
+    "Blueberry leaf": "ब्लूबेरी की पत्ती",
+    "Cherry leaf": "चेरी की पत्ती",
+    "Corn Gray leaf spot": "मक्का - ग्रे लीफ स्पॉट (धूसर पत्ती धब्बा)",
+    "Corn leaf blight": "मक्का की पत्ती - झुलसा रोग",
+    "Corn rust leaf": "मक्का की पत्ती - रस्ट (गेरुआ) रोग",
+    "Peach leaf": "आड़ू की पत्ती",
+    "Potato leaf early blight": "आलू की पत्ती - अगेती झुलसा",
+    "Potato leaf late blight": "आलू की पत्ती - पछेती झुलसा",
+    "Raspberry leaf": "रास्पबेरी की पत्ती",
+    "Soyabean leaf": "सोयाबीन की पत्ती",
+    "Squash Powdery mildew leaf": "स्क्वैश (कद्दू) की पत्ती - चूर्णिल आसिता (पाउडरी मिल्ड्यू)",
+    "Strawberry leaf": "स्ट्रॉबेरी की पत्ती",
+    "Tomato Early blight leaf": "टमाटर की पत्ती - अगेती झुलसा",
+    "Tomato Septoria leaf spot": "टमाटर - सेप्टोरिया पत्ती धब्बा",
+    "Tomato leaf": "टमाटर की पत्ती",
+    "Tomato leaf bacterial spot": "टमाटर की पत्ती - जीवाणु धब्बा रोग",
+    "Tomato leaf late blight": "टमाटर की पत्ती - पछेती झुलसा",
+    "Tomato leaf mosaic virus": "टमाटर की पत्ती - मोज़ेक वायरस",
+    "Tomato leaf yellow virus": "टमाटर की पत्ती - पीला पत्ती मरोड़ वायरस",
+    "Tomato mold leaf": "टमाटर की पत्ती - फफूंद (लीफ मोल्ड)",
+    "grape leaf": "अंगूर की पत्ती",
+    "grape leaf black rot": "अंगूर की पत्ती - काला सड़न (ब्लैक रॉट)",
+}
+
+REMEDY_KNOWLEDGE_BASE_HI = {
+    "Apple Scab Leaf": "मायक्लोब्यूटानिल या कैप्टान युक्त फफूंदनाशक का छिड़काव करें। संक्रमित हिस्सों की छंटाई करें और हवा का अच्छा संचार सुनिश्चित करें।",
+    "Apple leaf": "आपका सेब का पौधा स्वस्थ दिखता है। कीटों पर नज़र रखते रहें और सही सिंचाई सुनिश्चित करें।",
+    "Bell_pepper leaf spot": "ऊपर से पानी देने से बचें। बचाव के लिए तांबा-आधारित जीवाणुनाशक का छिड़काव करें।",
+    "Bell_pepper leaf": "आपका शिमला मिर्च का पौधा स्वस्थ दिखता है! सुनिश्चित करें कि उसे भरपूर धूप मिले।",
+    "Blueberry leaf": "आपका ब्लूबेरी का पौधा स्वस्थ दिखता है। अच्छे परिणाम के लिए मिट्टी को अम्लीय बनाए रखें।",
+    "Cherry leaf": "आपका चेरी का पौधा स्वस्थ दिखता है। माहू (एफिड) जैसे आम कीटों पर नज़र रखें।",
+    "Corn Gray leaf spot": "रोग-प्रतिरोधी संकर किस्में लगाएं और फसल चक्र अपनाएं। गंभीर स्थिति में फफूंदनाशक की आवश्यकता हो सकती है।",
+    "Corn leaf blight": "कटाई के बाद संक्रमित पौधों के अवशेष हटा दें। रोग-प्रतिरोधी मक्का किस्में लगाएं।",
+    "Corn rust leaf": "रोग-प्रतिरोधी संकर किस्में लगाएं। संक्रमण जल्दी दिखे तो उपयुक्त फफूंदनाशक का छिड़काव करें।",
+    "Peach leaf": "आपका आड़ू का पौधा स्वस्थ दिखता है। सुप्त मौसम में सही छंटाई सुनिश्चित करें।",
+    "Potato leaf early blight": "नीचे की पत्तियों की छंटाई करें, मल्च बिछाएं, और मैनकोज़ेब या क्लोरोथैलोनिल युक्त फफूंदनाशक का उपयोग करें।",
+    "Potato leaf late blight": "प्रभावित पत्तियों को तुरंत हटाकर नष्ट करें। तांबा-आधारित फफूंदनाशक का छिड़काव करें। ऊपर से पानी देने से बचें।",
+    "Raspberry leaf": "आपका रास्पबेरी का पौधा स्वस्थ दिखता है। अच्छे सहारे और हवा के संचार का ध्यान रखें।",
+    "Soyabean leaf": "आपकी सोयाबीन की फसल स्वस्थ दिखती है। सोयाबीन माहू जैसे आम कीटों पर नज़र रखें।",
+    "Squash Powdery mildew leaf": "नीम का तेल या सल्फर-आधारित फफूंदनाशक का छिड़काव करें। हवा का संचार बढ़ाएं।",
+    "Strawberry leaf": "आपका स्ट्रॉबेरी का पौधा स्वस्थ दिखता है। फलों को मिट्टी से दूर रखने के लिए पुआल की मल्च बिछाएं।",
+    "Tomato leaf": "आपका टमाटर का पौधा स्वस्थ दिखता है! हॉर्नवर्म (सुंडी) पर नज़र रखें।",
+    "Tomato leaf bacterial spot": "ऊपर से पानी देने और गीले पौधों पर काम करने से बचें। तांबा-आधारित छिड़काव करें।",
+    "Tomato leaf late blight": "इसे नियंत्रित करना कठिन है। संक्रमित पौधों को तुरंत हटाकर नष्ट करें। बचाव के लिए फफूंदनाशकों का उपयोग करें।",
+    "Tomato leaf mosaic virus": "इसका कोई इलाज नहीं है। फैलाव रोकने के लिए संक्रमित पौधों को हटाकर नष्ट करें। वायरस फैलाने वाले कीटों को नियंत्रित करें।",
+    "Tomato Septoria leaf spot": "संक्रमित पत्तियां हटा दें। हवा का संचार बेहतर करें। क्लोरोथैलोनिल युक्त फफूंदनाशक का उपयोग करें।",
+    "grape leaf": "आपकी अंगूर की बेल स्वस्थ दिखती है। अच्छी पैदावार के लिए सही छंटाई ज़रूरी है।",
+    "grape leaf black rot": "पौधे के संक्रमित हिस्सों की छंटाई करके नष्ट करें। बढ़वार के मौसम में फफूंदनाशकों का छिड़काव करें।"
+}
+DEFAULT_REMEDY_HI = "विशिष्ट उपचार के लिए किसी स्थानीय कृषि विशेषज्ञ से सलाह लें।"
+
+# --- Localized response templates ---
+DIAGNOSIS_TEMPLATES = {
+    "diagnosis_healthy": {
+        "en": "Looks like good news!\n"
+              "- **Plant:** {plant}\n"
+              "- **Status:** Healthy\n"
+              "- **Recommendation:** {remedy}\n"
+              "*(Confidence: {confidence})*",
+        "hi": "अच्छी खबर है!\n"
+              "- **पौधा:** {plant}\n"
+              "- **स्थिति:** स्वस्थ\n"
+              "- **सलाह:** {remedy}\n"
+              "*(विश्वास स्तर: {confidence})*",
+    },
+    "diagnosis_disease": {
+        "en": "Okay, I've analyzed the image. Here's what I found:\n"
+              "- **Diagnosis:** {plant}\n"
+              "- **Suggested Remedy:** {remedy}\n"
+              "*(Model Confidence: {confidence})*\n\n"
+              "**Disclaimer:** This is an AI-generated suggestion. Please consult with a local agricultural expert before applying any treatment.",
+        "hi": "मैंने तस्वीर का विश्लेषण कर लिया है। यह मिला:\n"
+              "- **निदान:** {plant}\n"
+              "- **सुझाया गया उपचार:** {remedy}\n"
+              "*(मॉडल विश्वास स्तर: {confidence})*\n\n"
+              "**अस्वीकरण:** यह AI द्वारा दिया गया सुझाव है। कोई भी उपचार करने से पहले किसी स्थानीय कृषि विशेषज्ञ से सलाह अवश्य लें।",
+    },
+    "diagnosis_uncertain": {
+        "en": "I'm not confident enough about this photo to give a diagnosis.\n"
+              "- **Most likely:**\n{candidates}\n"
+              "- **Please retake the photo:** one leaf, in daylight, filling most of the frame.\n\n"
+              "If the problem is spreading, please contact a local agricultural expert.",
+        "hi": "इस तस्वीर से मैं पूरे भरोसे के साथ निदान नहीं कर पा रहा हूँ।\n"
+              "- **सबसे संभावित:**\n{candidates}\n"
+              "- **कृपया दोबारा फ़ोटो लें:** दिन की रोशनी में, एक पत्ती, जो फ्रेम का अधिकांश हिस्सा भरे।\n\n"
+              "अगर समस्या फैल रही है, तो कृपया किसी स्थानीय कृषि विशेषज्ञ से संपर्क करें।",
+    },
+    "diagnosis_model_not_loaded": {
+        "en": "Error: Model or class names are not loaded. Please check server logs.",
+        "hi": "त्रुटि: मॉडल या क्लास नाम लोड नहीं हुए हैं। कृपया सर्वर लॉग जांचें।",
+    },
+    "diagnosis_image_unreadable": {
+        "en": "Could not process the image. Please try another one.",
+        "hi": "तस्वीर प्रोसेस नहीं हो सकी। कृपया कोई दूसरी तस्वीर आज़माएं।",
+    },
+}
+register_templates(DIAGNOSIS_TEMPLATES)
+
+# --- Preprocessing ---
+def _read_image_bytes(image):
+    """Returns the encoded bytes of an upload buffer, file-like object or file path."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image)
+    if hasattr(image, 'getvalue'):
+        # Streamlit UploadedFile / io.BytesIO: no disk round-trip
+        return image.getvalue()
+    if hasattr(image, 'read'):
+        return image.read()
+    with open(image, 'rb') as f:
+        return f.read()
+
+def _decode_full(image):
+    """Decodes any input accepted by decode_image to a float32 (H, W, 3) tensor at its own resolution."""
+    import tensorflow as tf
+
+    if isinstance(image, np.ndarray):
+        return tf.convert_to_tensor(image, dtype=tf.float32)
+    img = tf.io.decode_image(_read_image_bytes(image), channels=3, expand_animations=False)
+    return tf.cast(img, tf.float32)
+
+def decode_image(image):
+    """
+    Decodes and resizes an image fully in memory. Accepts encoded bytes/buffers
+    (JPEG, PNG, BMP, GIF), file-like objects, file paths or an RGB ndarray of any
+    size, and returns a float32 (IMG_SIZE, IMG_SIZE, 3) array with 0-255 values.
+    """
+    import tensorflow as tf
+
+    img = _decode_full(image)
+    if img.shape[:2] != (IMG_SIZE, IMG_SIZE):
+        img = tf.image.resize(img, (IMG_SIZE, IMG_SIZE))
+    return img.numpy()
+
+def prepare_image(image):
+    """Turns any input accepted by decode_image into one preprocessed sample ready for batching."""
+    from keras.applications.efficientnet import preprocess_input
+
+    with span("image.decode"):
+        return preprocess_input(decode_image(image))
+
+def prepare_views(image, count):
+    """The first `count` test-time augmentation views of an image, preprocessed: (count, IMG_SIZE, IMG_SIZE, 3)."""
+    from keras.applications.efficientnet import preprocess_input
+
+    with span("image.decode", views=count):
+        return preprocess_input(make_views(_decode_full(image), count, IMG_SIZE))
+
+def load_image_source(image):
+    """
+    Reads an input once and returns (cache_key, data). Encoded images are keyed by
+    their raw bytes, so a repeat upload is recognised before decoding; arrays are
+    keyed by the decoded, resized tensor.
+    """
+    if isinstance(image, np.ndarray):
+        data = decode_image(image)
+    else:
+        data = _read_image_bytes(image)
+    return content_key(data), data
+
+# --- Batched Inference ---
+def _forward(batch):
+    """One forward pass over a stacked (N, IMG_SIZE, IMG_SIZE, 3) batch."""
+    return pest_model.get()(batch)
+
+def _predict_batch(batch):
+    """Runs one forward pass over a batch on the calling thread."""
+    with span("model.predict", batch_size=len(batch), backend=BACKEND):
+        return _forward(batch)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def _get_batcher():
+    """Starts the shared micro-batching worker on first use."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(_forward, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS)
+    return _batcher
+
+def _predict_queued(samples, many=False):
+    """
+    Predicts one sample (or, with `many`, a group of samples that run together)
+    through the shared micro-batcher. The span is opened on the caller's thread,
+    so it joins the caller's trace; it covers the wait for a batch plus the
+    forward pass, whose batch size and duration the batcher reports back.
+    """
+    batcher = _get_batcher()
+    with span("model.predict", backend=BACKEND, queued=True) as trace:
+        future = batcher.submit_many(samples) if many else batcher.submit(samples)
+        predictions = future.result()
+        trace.set(batch_size=future.batch_size, forward_ms=round(future.run_seconds * 1000, 3))
+    return predictions
+
+# Shared by every high-accuracy diagnosis in the process
+# (all views of a photo must fit in one micro-batch)
+view_budget = ViewBudget(TTA_BUDGET_MS, min(TTA_VIEWS, MAX_BATCH_SIZE))
+
+def _predict_views(image):
+    """Averaged softmax row over as many views of `image` as the latency budget allows."""
+    views = view_budget.views()
+    start = time.perf_counter()
+    predictions = _predict_queued(prepare_views(image, views), many=True)
+    view_budget.record(views, time.perf_counter() - start)
+    current_span().set(views=views)
+    return predictions.mean(axis=0)
+
+# --- Post-processing ---
+# Per-class healthy/disease mask and crop grouping, computed once
+CLASS_INDEX = ClassIndex(CLASS_NAMES, REMEDY_KNOWLEDGE_BASE, DEFAULT_REMEDY)
+
+# Error codes carried by DiagnosisResult.error
+MODEL_ERROR = "model_not_loaded"
+IMAGE_ERROR = "image_unreadable"
+
+def _postprocess(predictions):
+    """Vectorized scoring of an (N, C) prediction batch into DiagnosisResult objects."""
+    return postprocess(predictions, CLASS_INDEX, TOP_K, TEMPERATURE, UNCERTAINTY_THRESHOLD)
+
+def _class_label(class_name):
+    return localized(class_name.replace('_', ' '), CLASS_NAMES_HI.get(class_name))
+
+def diagnosis_response(result):
+    """Maps a DiagnosisResult onto its localized template; renders in any language without translation."""
+    if result.error or result.uncertain:
+        candidates = [
+            localized(f"  - {label['en']} ({prob:.1%})", f"  - {label['hi']} ({prob:.1%})")
+            for label, prob in ((_class_label(name), prob) for name, prob in result.top_k)
+        ]
+        return AgentResponse(result.template_id, {"candidates": candidates})
+    return AgentResponse(result.template_id, {
+        "plant": _class_label(result.class_name),
+        "remedy": localized(result.remedy, REMEDY_KNOWLEDGE_BASE_HI.get(result.class_name, DEFAULT_REMEDY_HI)),
+        "confidence": f"{result.confidence:.1%}",
+    })
+
+# --- Diagnosis Cache ---
+diagnosis_cache = DiagnosisCache(CACHE_SIZE, CACHE_PATH or None)
+
+def _from_cache(entry):
+    """Rebuilds the structured result from the cached raw confidence vector."""
+    return _postprocess(np.array(entry["probabilities"]))[0]
+
+def _cache_results(keys, predictions):
+    """Post-processes a batch of fresh predictions and stores each under its image's content key."""
+    results = _postprocess(predictions)
+    for key, row, result in zip(keys, predictions, results):
+        diagnosis_cache.put(key, result.class_index, row)
+    return results
+
+@traced("diagnose")
+def diagnose_plant_disease(image, high_accuracy=None):
     """
     Diagnoses a plant disease with the correct logic for the PlantDoc dataset's
     class name format (e.g., 'Squash Powdery mildew leaf').
+    `image` may be the uploaded bytes/buffer, a file-like object, a path or an
+    RGB array; it is decoded in memory. Concurrent callers are transparently
+    micro-batched into one forward pass, and repeat photos are served from
+    `diagnosis_cache`.
+
+    With `high_accuracy` (default: PEST_HIGH_ACCURACY) several
+    augmented views of the photo are averaged instead; see model/tta.py.
+
+    Returns a DiagnosisResult (top-k classes, calibrated confidence, per-crop
+    scores, uncertainty flag); render it with diagnosis_response().
     """
-    if model is None or not CLASS_NAMES:
-        return "Error: Model or class names are not loaded. Please check server logs."
-    
+    if not CLASS_NAMES:
+        return DiagnosisResult.from_error(MODEL_ERROR)
+    if high_accuracy is None:
+        high_accuracy = HIGH_ACCURACY
+
     try:
-        # 1. Prediction (This part is working perfectly)
-        img = load_img(image_path, target_size=(IMG_SIZE, IMG_SIZE))
-        img_array = img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        processed_image = preprocess_input(img_array)
-        predictions = model.predict(processed_image)
-        
-        prediction_confidence = np.max(predictions[0])
-        predicted_class_index = np.argmax(predictions[0])
-        predicted_class_name = CLASS_NAMES[predicted_class_index]
-        
-        # --- CORRECTED FORMATTING LOGIC ---
-        # The predicted name is the full diagnosis.
-        full_diagnosis_name = predicted_class_name.replace('_', ' ')
-        remedy = REMEDY_KNOWLEDGE_BASE.get(predicted_class_name, DEFAULT_REMEDY)
-
-        # A simple check to see if the label indicates a healthy plant
-        disease_keywords = ['scab', 'rot', 'rust', 'blight', 'spot', 'virus', 'mold', 'mildew']
-        is_healthy = not any(keyword in full_diagnosis_name.lower() for keyword in disease_keywords)
-
-        # 2. Format the friendly response
-        if is_healthy:
-            response = f"""
-            Looks like good news!
-            - **Plant:** {full_diagnosis_name}
-            - **Status:** Healthy
-            - **Recommendation:** {remedy}
-            *(Confidence: {prediction_confidence:.1%})*
-            """
+        key, data = load_image_source(image)
+        if high_accuracy:
+            # Averaged views are cached apart from single-view results
+            key += ":tta"
+        cached = diagnosis_cache.get(key)
+        current_span().set(cache="hit" if cached is not None else "miss")
+        if cached is not None:
+            # Served without waiting for the model to load
+            return _from_cache(cached)
+        if pest_model.get() is None:
+            return DiagnosisResult.from_error(MODEL_ERROR)
+
+        # 1. Prediction (queued and batched with other concurrent uploads)
+        if high_accuracy:
+            # Arrays are cropped at their own resolution, not the resized copy used for the key
+            predictions = _predict_views(image if isinstance(image, np.ndarray) else data)
         else:
-            response = f"""
-            Okay, I've analyzed the image. Here's what I found:
-            - **Diagnosis:** {full_diagnosis_name}
-            - **Suggested Remedy:** {remedy}
-            *(Model Confidence: {prediction_confidence:.1%})*
-            
-            **Disclaimer:** This is an AI-generated suggestion. Please consult with a local agricultural expert before applying any treatment.
-            """
-        return response.strip()
+            predictions = _predict_queued(prepare_image(data))
+        return _cache_results([key], predictions[np.newaxis])[0]
 
     except Exception as e:
         print(f"Error during prediction: {e}")
-        return "Could not process the image. Please try another one."
\ No newline at end of file
+        return DiagnosisResult.from_error(IMAGE_ERROR)
+
+def diagnose_prepared(samples, top_k=TOP_K):
+    """
+    Offline API for pipelines that decode on their own (see model/bulk_survey.py):
+    one forward pass over an already preprocessed (N, IMG_SIZE, IMG_SIZE, 3)
+    batch, bypassing the micro-batcher and the diagnosis cache. Returns N
+    DiagnosisResults.
+    """
+    if pest_model.get() is None or not CLASS_NAMES:
+        return [DiagnosisResult.from_error(MODEL_ERROR) for _ in range(len(samples))]
+    return postprocess(_predict_batch(samples), CLASS_INDEX, top_k, TEMPERATURE, UNCERTAINTY_THRESHOLD)
+
+def diagnose_batch(paths_or_arrays, batch_size=MAX_BATCH_SIZE):
+    """
+    Bulk/offline API: diagnoses many images (paths, encoded bytes or RGB arrays) with
+    one forward pass per `batch_size` chunk. Returns one DiagnosisResult per input,
+    in order; unreadable images get an error result instead of failing the job.
+    """
+    if not CLASS_NAMES:
+        return [DiagnosisResult.from_error(MODEL_ERROR) for _ in paths_or_arrays]
+
+    results = [None] * len(paths_or_arrays)
+    for start in range(0, len(paths_or_arrays), batch_size):
+        indices, keys, samples = [], [], []
+        for i in range(start, min(start + batch_size, len(paths_or_arrays))):
+            try:
+                key, data = load_image_source(paths_or_arrays[i])
+                cached = diagnosis_cache.get(key)
+                if cached is not None:
+                    results[i] = _from_cache(cached)
+                    continue
+                samples.append(prepare_image(data))
+                indices.append(i)
+                keys.append(key)
+            except Exception as e:
+                print(f"Error loading image #{i}: {e}")
+                results[i] = DiagnosisResult.from_error(IMAGE_ERROR)
+        if not samples:
+            continue
+        # Only loaded once some image is not in the cache
+        if pest_model.get() is None:
+            for i in indices:
+                results[i] = DiagnosisResult.from_error(MODEL_ERROR)
+            continue
+        try:
+            predictions = _predict_batch(np.stack(samples))
+        except Exception as e:
+            print(f"Error during batch prediction: {e}")
+            for i in indices:
+                results[i] = DiagnosisResult.from_error(IMAGE_ERROR)
+            continue
+        for i, result in zip(indices, _cache_results(keys, predictions)):
+            results[i] = result
+    return results
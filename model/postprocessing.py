@@ -0,0 +1,143 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# Substrings in a PlantDoc class name that mark a diseased leaf
+DISEASE_KEYWORDS = ('scab', 'rot', 'rust', 'blight', 'spot', 'virus', 'mold', 'mildew')
+
+
+# --- Per-class lookup tables, built once at load ---
+class ClassIndex:
+    """
+    Precomputed arrays over CLASS_NAMES so post-processing is a handful of
+    vectorized numpy operations instead of per-call string checks:
+      * is_disease  - (C,) float mask, 1.0 for diseased classes
+      * crop_matrix - (C, n_crops) one-hot crop membership
+    """
+
+    def __init__(self, class_names, remedies, default_remedy):
+        self.class_names = list(class_names)
+        self.display_names = [name.replace('_', ' ') for name in self.class_names]
+        self.remedies = [remedies.get(name, default_remedy) for name in self.class_names]
+        self.is_disease = np.array(
+            [any(keyword in name.lower() for keyword in DISEASE_KEYWORDS) for name in self.display_names],
+            dtype=np.float32,
+        )
+        # "Bell_pepper leaf spot" -> "Bell Pepper", "grape leaf black rot" -> "Grape"
+        crop_of_class = [name.split(' ')[0].replace('_', ' ').title() for name in self.class_names]
+        self.crops = sorted(set(crop_of_class))
+        self.crop_of_class = np.array([self.crops.index(crop) for crop in crop_of_class], dtype=np.int64)
+        self.crop_matrix = np.zeros((len(self.class_names), len(self.crops)), dtype=np.float32)
+        self.crop_matrix[np.arange(len(self.class_names)), self.crop_of_class] = 1.0
+
+
+# --- Calibration ---
+def calibrate(probabilities, temperature=1.0):
+    """
+    Temperature-scales softmax outputs row-wise. The model ends in a softmax, so
+    log-probabilities stand in for logits (they differ only by a per-row constant).
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if temperature == 1.0:
+        return probabilities
+    logits = np.log(np.clip(probabilities, 1e-12, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    scaled = np.exp(logits)
+    return scaled / scaled.sum(axis=1, keepdims=True)
+
+def fit_temperature(probabilities, labels, candidates=np.linspace(0.5, 5.0, 46)):
+    """Picks the temperature minimising negative log-likelihood on a labelled validation set."""
+    labels = np.asarray(labels)
+    rows = np.arange(len(labels))
+    nll = [-np.mean(np.log(np.clip(calibrate(probabilities, t)[rows, labels], 1e-12, 1.0))) for t in candidates]
+    return float(candidates[int(np.argmin(nll))])
+
+
+# --- Structured result ---
+@dataclass
+class DiagnosisResult:
+    """
+    Structured diagnosis for one image. `error` holds an error code
+    ("model_not_loaded", "image_unreadable") when no prediction could be made.
+    """
+    class_index: int = None
+    class_name: str = None
+    display_name: str = None
+    confidence: float = 0.0
+    is_healthy: bool = None
+    disease_probability: float = 0.0
+    remedy: str = None
+    crop: str = None
+    top_k: list = field(default_factory=list)
+    crop_scores: dict = field(default_factory=dict)
+    uncertain: bool = False
+    probabilities: np.ndarray = field(default=None, repr=False, compare=False)
+    error: str = None
+
+    @classmethod
+    def from_error(cls, code):
+        return cls(error=code)
+
+    @property
+    def template_id(self):
+        """Localized template used to render this result (see pest_detector.DIAGNOSIS_TEMPLATES)."""
+        if self.error:
+            return f"diagnosis_{self.error}"
+        if self.uncertain:
+            return "diagnosis_uncertain"
+        return "diagnosis_healthy" if self.is_healthy else "diagnosis_disease"
+
+    def to_dict(self):
+        return {
+            "class_index": self.class_index,
+            "class_name": self.class_name,
+            "confidence": self.confidence,
+            "is_healthy": self.is_healthy,
+            "disease_probability": self.disease_probability,
+            "remedy": self.remedy,
+            "crop": self.crop,
+            "top_k": [{"class_name": name, "probability": prob} for name, prob in self.top_k],
+            "crop_scores": self.crop_scores,
+            "uncertain": self.uncertain,
+            "template_id": self.template_id,
+            "error": self.error,
+        }
+
+
+# --- Vectorized post-processing ---
+def postprocess(probabilities, class_index, top_k=3, temperature=1.0, uncertainty_threshold=0.0):
+    """
+    Turns an (N, C) batch of softmax rows into N DiagnosisResult objects. All
+    scoring (calibration, top-k, disease probability, per-crop aggregation,
+    uncertainty) is done for the whole batch at once.
+    """
+    probs = calibrate(np.atleast_2d(probabilities), temperature)
+    k = min(top_k, probs.shape[1])
+    # Stable, so tied classes keep their class order
+    top_indices = np.argsort(-probs, axis=1, kind="stable")[:, :k]
+    top_probs = np.take_along_axis(probs, top_indices, axis=1)
+    best = top_indices[:, 0]
+    confidence = top_probs[:, 0]
+    disease_probability = probs @ class_index.is_disease
+    crop_scores = probs @ class_index.crop_matrix
+    uncertain = confidence < uncertainty_threshold
+
+    results = []
+    for row in range(len(probs)):
+        index = int(best[row])
+        results.append(DiagnosisResult(
+            class_index=index,
+            class_name=class_index.class_names[index],
+            display_name=class_index.display_names[index],
+            confidence=float(confidence[row]),
+            is_healthy=not class_index.is_disease[index],
+            disease_probability=float(disease_probability[row]),
+            remedy=class_index.remedies[index],
+            crop=class_index.crops[class_index.crop_of_class[index]],
+            top_k=[(class_index.class_names[i], float(p)) for i, p in zip(top_indices[row], top_probs[row])],
+            crop_scores=dict(zip(class_index.crops, crop_scores[row].tolist())),
+            uncertain=bool(uncertain[row]),
+            probabilities=probs[row],
+        ))
+    return results
@@ -0,0 +1,87 @@
+import threading
+import time
+
+
+# --- Process-wide registry of lazily loaded models ---
+class LazyModel:
+    """
+    Holds one expensive resource (the pest classifier, the spaCy pipeline, ...)
+    that is built on first use and then shared by every session and thread in
+    the process. Streamlit re-runs app.py on every interaction, but imported
+    modules stay cached, so the registry survives reruns.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._value = None
+        self._loaded = False
+        self._error = None
+        self._load_seconds = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        # Separate lock so prewarm() never blocks behind a load in progress
+        self._prewarm_lock = threading.Lock()
+        self._prewarm_thread = None
+
+    def get(self):
+        """Returns the loaded resource, loading it on the first call. Returns None if loading failed."""
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    self._value = self.loader()
+                except Exception as e:
+                    print(f"CRITICAL ERROR: Failed to load '{self.name}': {e}")
+                    self._error = str(e)
+                self._load_seconds = time.perf_counter() - start
+                self._loaded_at = time.time()
+                self._loaded = True
+                if self._error is None:
+                    print(f"✅ '{self.name}' loaded in {self._load_seconds:.2f}s.")
+        return self._value
+
+    def prewarm(self):
+        """Starts loading in a background thread (once) so the first real request does not pay for it."""
+        with self._prewarm_lock:
+            if self._loaded or self._prewarm_thread is not None:
+                return self._prewarm_thread
+            self._prewarm_thread = threading.Thread(target=self.get, name=f"prewarm-{self.name}", daemon=True)
+        self._prewarm_thread.start()
+        return self._prewarm_thread
+
+    @property
+    def is_loaded(self):
+        return self._loaded and self._error is None
+
+    def metrics(self):
+        """Load-time metrics for status pages and logs."""
+        if not self._loaded:
+            status = "loading" if self._prewarm_thread is not None else "not_loaded"
+        else:
+            status = "error" if self._error else "ready"
+        return {
+            "name": self.name,
+            "status": status,
+            "load_seconds": self._load_seconds,
+            "loaded_at": self._loaded_at,
+            "error": self._error,
+        }
+
+
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def register(name, loader):
+    """Returns the process-wide LazyModel for `name`, creating it on first registration."""
+    with _REGISTRY_LOCK:
+        if name not in _REGISTRY:
+            _REGISTRY[name] = LazyModel(name, loader)
+        return _REGISTRY[name]
+
+def get_load_metrics():
+    """Load-time metrics for every registered model."""
+    with _REGISTRY_LOCK:
+        return [lazy_model.metrics() for lazy_model in _REGISTRY.values()]
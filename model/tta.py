@@ -0,0 +1,119 @@
+import threading
+
+
+# --- Test-time augmentation: several views of one photo in one forward pass ---
+# Views in priority order (a tight latency budget runs only the first few).
+# Square crops keep the photo's native aspect ratio, "full" is the plain
+# aspect-distorting resize of single-view diagnosis, "_flip" mirrors a view.
+VIEWS = (
+    "center", "full", "center_flip", "full_flip",
+    "top_left", "top_right", "bottom_left", "bottom_right",
+)
+# Side of a corner crop as a fraction of the photo's shorter side
+CORNER_FRACTION = 0.875
+
+
+def view_box(name, height, width):
+    """Normalized [y1, x1, y2, x2] box of a view (flips share the box of the view they mirror)."""
+    name = name.removesuffix("_flip")
+    if name == "full":
+        return [0.0, 0.0, 1.0, 1.0]
+    side = min(height, width) * (1.0 if name == "center" else CORNER_FRACTION)
+    h, w = side / height, side / width
+    if name == "center":
+        y1, x1 = (1 - h) / 2, (1 - w) / 2
+    else:
+        y1 = 0.0 if name.startswith("top") else 1 - h
+        x1 = 0.0 if name.endswith("left") else 1 - w
+    return [y1, x1, y1 + h, x1 + w]
+
+
+def make_views(image, count, size):
+    """
+    Cuts the first `count` VIEWS out of a decoded (H, W, 3) image at its full
+    resolution and returns them as one float32 (count, size, size, 3) batch.
+    All crops are resized in a single crop_and_resize op.
+    """
+    import tensorflow as tf
+
+    names = VIEWS[:max(1, min(count, len(VIEWS)))]
+    height, width = int(image.shape[0]), int(image.shape[1])
+    boxes = [view_box(name, height, width) for name in names]
+    crops = tf.image.crop_and_resize(
+        tf.convert_to_tensor(image, dtype=tf.float32)[tf.newaxis], boxes, tf.zeros(len(boxes), tf.int32), (size, size),
+    ).numpy()
+    flipped = [i for i, name in enumerate(names) if name.endswith("_flip")]
+    crops[flipped] = crops[flipped, :, ::-1]
+    return crops
+
+
+# --- Adaptive view count ---
+class ViewBudget:
+    """
+    Picks how many views the next diagnosis runs so it stays within
+    `budget_ms`. A diagnosis costs a fixed part (decode, queueing behind other
+    diagnoses, per-call overhead) plus a part per view; both are fitted by
+    exponentially weighted least squares over recent (views, milliseconds)
+    observations, and the largest view count whose predicted latency fits the
+    budget is chosen, between 1 and `max_views`. Under load the fixed part
+    grows, so the count drops; it climbs back as latency recovers.
+
+    Until two different view counts have been seen the split is unknown, and
+    the prediction is the worst case for non-negative costs: the observed
+    latency for fewer views, scaled up in proportion for more.
+    """
+
+    def __init__(self, budget_ms, max_views=len(VIEWS), smoothing=0.2):
+        self.budget_ms = budget_ms
+        self.max_views = max(1, min(max_views, len(VIEWS)))
+        self.smoothing = smoothing
+        # Weighted sums of 1, views, ms, views^2 and views*ms
+        self._sums = None
+        self._lock = threading.Lock()
+
+    def _fit(self):
+        """(fixed ms, ms per view, mean views, mean ms); the first two are None without two distinct view counts."""
+        weight, views, ms, views_sq, views_ms = self._sums
+        mean_views, mean_ms = views / weight, ms / weight
+        variance = views_sq / weight - mean_views ** 2
+        if variance < 1e-3:
+            return None, None, mean_views, mean_ms
+        per_view = max(0.0, (views_ms / weight - mean_views * mean_ms) / variance)
+        return max(0.0, mean_ms - per_view * mean_views), per_view, mean_views, mean_ms
+
+    def predict_ms(self, views):
+        """Expected latency of a diagnosis with `views` views, or None before the first observation."""
+        with self._lock:
+            if self._sums is None:
+                return None
+            fixed, per_view, mean_views, mean_ms = self._fit()
+        if per_view is None:
+            return mean_ms * max(1.0, views / mean_views)
+        return fixed + per_view * views
+
+    def views(self):
+        best = 1
+        for views in range(1, self.max_views + 1):
+            predicted = self.predict_ms(views)
+            if predicted is None:
+                return self.max_views
+            if predicted <= self.budget_ms:
+                best = views
+        return best
+
+    def record(self, views, seconds):
+        """Feeds back how long a diagnosis with `views` views took."""
+        ms = seconds * 1000
+        point = (1.0, views, ms, views * views, views * ms)
+        with self._lock:
+            if self._sums is None:
+                self._sums = point
+            else:
+                self._sums = tuple(total + self.smoothing * (value - total) for total, value in zip(self._sums, point))
+
+    def stats(self):
+        with self._lock:
+            fit = self._fit() if self._sums is not None else (None, None, None, None)
+        fixed, per_view = (None if value is None else round(value, 3) for value in fit[:2])
+        return {"budget_ms": self.budget_ms, "max_views": self.max_views,
+                "fixed_ms": fixed, "ms_per_view": per_view, "views": self.views()}
@@ -0,0 +1,71 @@
+import threading
+
+import config
+from services.http import create_session
+from services.tracing import span
+
+
+class InferenceUnavailable(Exception):
+    """The inference API could not be reached or did not answer with a result."""
+
+
+class InferenceClient:
+    """
+    Client for the HTTP API in api.py, so the chat UI can run on its own nodes
+    while diagnosis and the agents run (and scale) on inference nodes. Calls go
+    over one pooled keep-alive session; GETs are retried with backoff, including
+    on a 503 from a busy worker. Every method returns the decoded JSON body,
+    whose "rendered" field holds the reply in every language.
+    """
+
+    def __init__(self, base_url=config.INFERENCE_API_URL, timeout=config.INFERENCE_API_TIMEOUT, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (config.HTTP_CONNECT_TIMEOUT, timeout)
+        self.session = session or create_session()
+
+    def _call(self, method, endpoint, **kwargs):
+        with span("api_client.call", endpoint=endpoint) as trace:
+            try:
+                response = self.session.request(method, f"{self.base_url}/{endpoint}", timeout=self.timeout, **kwargs)
+            except Exception as e:
+                raise InferenceUnavailable(f"/{endpoint}: {e}") from e
+            trace.set(status=response.status_code)
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error", "")
+            except ValueError:
+                message = response.text[:200]
+            raise InferenceUnavailable(f"/{endpoint} returned HTTP {response.status_code}: {message}")
+        return response.json()
+
+    def health(self):
+        return self._call("GET", "health")
+
+    def route(self, query):
+        return self._call("GET", "route", params={"query": query})
+
+    def price(self, query, location=None):
+        return self._call("GET", "price", params={"query": query, "location": location})
+
+    def weather(self, location):
+        return self._call("GET", "weather", params={"location": location})
+
+    def diagnose(self, image_bytes, high_accuracy=None):
+        params = {} if high_accuracy is None else {"high_accuracy": int(high_accuracy)}
+        return self._call("POST", "diagnose", params=params, data=image_bytes,
+                          headers={"Content-Type": "application/octet-stream"})
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_inference_client():
+    """Process-wide client for INFERENCE_API_URL, or None when the app runs the agents in-process."""
+    global _default_client
+    if not config.INFERENCE_API_URL:
+        return None
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = InferenceClient()
+    return _default_client
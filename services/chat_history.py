@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+
+# --- On-disk archive of old turns ---
+class ChatArchive:
+    """
+    SQLite store for the messages a session no longer keeps in memory, one
+    row per message keyed by (session, seq). Shared by every session of the
+    process; archives older than `retention` seconds are pruned on open.
+    """
+
+    def __init__(self, path, retention=config.CHAT_HISTORY_RETENTION):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL,"
+            " en TEXT NOT NULL, hi TEXT NOT NULL, saved_at REAL NOT NULL,"
+            " PRIMARY KEY (session, seq)) WITHOUT ROWID;"
+        )
+        self._lock = threading.Lock()
+        self.prune(retention)
+
+    def save(self, session, first_seq, messages):
+        rows = [
+            (session, first_seq + i, message["role"], message["en"], message["hi"], time.time())
+            for i, message in enumerate(messages)
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO messages (session, seq, role, en, hi, saved_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+
+    def load(self, session, start, stop):
+        """Messages with start <= seq < stop, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, en, hi FROM messages WHERE session = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session, start, stop),
+            ).fetchall()
+        return [{"role": role, "en": en, "hi": hi} for role, en, hi in rows]
+
+    def clear(self, session):
+        with self._lock:
+            self._db.execute("DELETE FROM messages WHERE session = ?", (session,))
+            self._db.commit()
+
+    def prune(self, max_age):
+        """Drops every message saved more than `max_age` seconds ago."""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM messages WHERE saved_at < ?", (time.time() - max_age,)).rowcount
+            self._db.commit()
+        return removed
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+def get_chat_archive():
+    """Process-wide chat archive at CHAT_HISTORY_PATH; None if it cannot be opened."""
+    global _default_archive
+    if _default_archive is None:
+        with _default_archive_lock:
+            if _default_archive is None:
+                try:
+                    _default_archive = ChatArchive(config.CHAT_HISTORY_PATH)
+                except sqlite3.Error as e:
+                    print(f"[WARN] Chat archive disabled, could not open {config.CHAT_HISTORY_PATH}: {e}")
+                    _default_archive = False
+    return _default_archive or None
+
+
+# --- Per-session history ---
+class ChatHistory:
+    """
+    One session's chat. Each message is a single record holding both
+    languages ({"role", "en", "hi"}, plus "task" while an agent is still
+    answering), so switching language needs no second list.
+
+    At most `keep_in_memory` messages stay in session state; older, settled
+    ones move to the `archive` and are read back a page at a time
+    with `page()`. Without an archive the history is simply capped.
+    Messages are numbered from 0 (`seq`) across both places.
+    """
+
+    def __init__(self, session_id, archive=None, keep_in_memory=config.CHAT_HISTORY_IN_MEMORY):
+        self.session_id = session_id
+        self.archive = archive
+        self.keep_in_memory = keep_in_memory
+        self._messages = []
+        self._first_seq = 0     # seq of self._messages[0]
+
+    def __len__(self):
+        return self._first_seq + len(self._messages)
+
+    def append(self, role, en, hi=None, task=None):
+        """Adds a message (the same text in both languages if `hi` is None) and returns it."""
+        message = {"role": role, "en": en, "hi": en if hi is None else hi}
+        if task is not None:
+            message["task"] = task
+        self._messages.append(message)
+        self._offload()
+        return message
+
+    def settle(self, task, contents):
+        """
+        Marks the message waiting on `task` as answered, replacing its text
+        with `contents[lang]` for each language given.
+        """
+        for message in reversed(self._messages):
+            if message.get("task") == task:
+                message.update(contents)
+                del message["task"]
+                return message
+        return None
+
+    def last(self):
+        return self._messages[-1] if self._messages else None
+
+    def _offload(self):
+        if len(self._messages) <= self.keep_in_memory:
+            return
+        # Archived in batches (down to half the limit) rather than a commit per
+        # message; pending messages must stay in memory to be settled
+        count = 0
+        excess = len(self._messages) - self.keep_in_memory // 2
+        while count < excess and "task" not in self._messages[count]:
+            count += 1
+        if not count:
+            return
+        if self.archive is not None:
+            self.archive.save(self.session_id, self._first_seq, self._messages[:count])
+        del self._messages[:count]
+        self._first_seq += count
+
+    # --- Paging ---
+    @property
+    def oldest_available(self):
+        """seq of the oldest message that can still be shown."""
+        return 0 if self.archive is not None else self._first_seq
+
+    def page(self, start, stop):
+        """Messages with start <= seq < stop, oldest first, from memory and the archive."""
+        start = max(start, self.oldest_available)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        messages = []
+        if start < self._first_seq:
+            messages = self.archive.load(self.session_id, start, min(stop, self._first_seq))
+        if stop > self._first_seq:
+            messages += self._messages[max(start - self._first_seq, 0):stop - self._first_seq]
+        return messages
+
+    def recent(self, count):
+        """The newest `count` messages, oldest first."""
+        return self.page(len(self) - count, len(self))
+
+    def clear(self):
+        if self.archive is not None:
+            self.archive.clear(self.session_id)
+        self._messages = []
+        self._first_seq = 0
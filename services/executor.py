@@ -0,0 +1,157 @@
+import collections
+import contextvars
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import config
+
+
+class AgentBusy(Exception):
+    """The agent's concurrency limit stayed full for the whole timeout, so the call never started."""
+
+
+# --- Submitted agent call ---
+class AgentTask:
+    """
+    Handle to one agent call running on the shared pool. Threads cannot be
+    cancelled, so a timed-out call keeps running in the background; the task
+    just stops waiting for it and reports "timeout".
+    """
+
+    def __init__(self, agent, future, timeout):
+        self.id = uuid.uuid4().hex
+        self.agent = agent
+        self.future = future
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+
+    def done(self):
+        return self.future.done()
+
+    def expired(self):
+        return not self.future.done() and time.monotonic() - self.started_at > self.timeout
+
+    def status(self):
+        """One of "pending", "done", "error" or "timeout"."""
+        if self.future.done():
+            return "error" if self.future.exception() is not None else "done"
+        return "timeout" if self.expired() else "pending"
+
+    def result(self):
+        """The call's return value; raises its exception (or TimeoutError once expired)."""
+        remaining = max(0.0, self.timeout - (time.monotonic() - self.started_at))
+        return self.future.result(timeout=remaining)
+
+
+# --- Shared agent pool ---
+class AgentExecutor:
+    """
+    One thread pool per process for agent calls (scraping, weather, translation,
+    ...), so the Streamlit script submits work and returns instead of holding
+    its session while an upstream responds.
+
+    Each agent name gets its own timeout and, optionally, a concurrency limit:
+    at most `limits[agent]` of its calls run at once across all sessions.
+    Calls over the limit wait in a per-agent queue, not on a pool thread, and
+    are handed to the pool as the agent's running calls finish; so a slow
+    upstream holds at most its limit of threads and cannot take over the pool.
+    A queued call still waiting when its timeout runs out fails with AgentBusy.
+    """
+
+    def __init__(self, max_workers=config.AGENT_WORKERS, timeouts=None, limits=None,
+                 default_timeout=config.AGENT_DEFAULT_TIMEOUT):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self._limits = {agent: int(limit) for agent, limit in (limits or {}).items()}
+        self._running = collections.Counter()
+        self._waiting = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.timed_out = 0
+
+    def timeout_for(self, agent):
+        return self.timeouts.get(agent, self.default_timeout)
+
+    def submit(self, agent, fn, *args, **kwargs):
+        """Runs `fn(*args, **kwargs)` on the pool under `agent`'s limit; returns an AgentTask."""
+        task = AgentTask(agent, Future(), self.timeout_for(agent))
+        # Run in a copy of the caller's context, so spans inside the call join the caller's trace
+        call = (task, contextvars.copy_context(), fn, args, kwargs)
+        with self._lock:
+            self.submitted += 1
+            limit = self._limits.get(agent)
+            if limit is not None:
+                if self._running[agent] >= limit:
+                    self._waiting[agent].append(call)
+                    return task
+                self._running[agent] += 1
+        self._dispatch(call)
+        return task
+
+    def _dispatch(self, call):
+        task, context, fn, args, kwargs = call
+        try:
+            pool_future = self._pool.submit(context.run, fn, *args, **kwargs)
+        except RuntimeError as e:
+            # The pool was shut down
+            self._finished(task, None, e)
+            return
+        pool_future.add_done_callback(lambda done: self._finished(task, done))
+
+    def _finished(self, task, pool_future, error=None):
+        """Passes a call's outcome to its task, then starts the agent's next queued call, if any."""
+        if pool_future is not None:
+            error = pool_future.exception()
+        if not task.future.cancelled():
+            if error is not None:
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(pool_future.result())
+        if task.agent not in self._limits:
+            return
+        expired, next_call = [], None
+        with self._lock:
+            waiting = self._waiting[task.agent]
+            while waiting and next_call is None:
+                call = waiting.popleft()
+                if call[0].future.cancelled():
+                    continue
+                if call[0].expired():
+                    expired.append(call[0])
+                else:
+                    next_call = call
+            if next_call is None:
+                self._running[task.agent] -= 1
+        for waited in expired:
+            waited.future.set_exception(AgentBusy(f"Agent '{waited.agent}' is at its concurrency limit."))
+        if next_call is not None:
+            self._dispatch(next_call)
+
+    def record_timeout(self, task):
+        with self._lock:
+            self.timed_out += 1
+        print(f"[WARN] Agent '{task.agent}' did not answer within {task.timeout:.0f}s.")
+
+    def stats(self):
+        with self._lock:
+            return {"submitted": self.submitted, "timed_out": self.timed_out,
+                    "queued": {agent: len(calls) for agent, calls in self._waiting.items() if calls}}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+def get_executor():
+    """Process-wide agent executor, configured from AGENT_* settings."""
+    global _default_executor
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = AgentExecutor(timeouts=config.AGENT_TIMEOUTS, limits=config.AGENT_CONCURRENCY)
+    return _default_executor
@@ -0,0 +1,35 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+
+# Retried on idempotent GETs only; 429 honours the upstream's Retry-After header
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_TIMEOUT = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+
+def create_session(pool_size=config.HTTP_POOL_SIZE, retries=config.HTTP_RETRIES,
+                   backoff=config.HTTP_BACKOFF_SECONDS, headers=None):
+    """
+    Returns a requests.Session with a keep-alive connection pool and retry with
+    exponential backoff. Sessions are meant to be created once and shared: the
+    pool is thread-safe and reusing connections saves a TCP/TLS handshake per call.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
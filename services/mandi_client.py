@@ -0,0 +1,149 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import config
+from services.http import DEFAULT_TIMEOUT, create_session
+from services.price_table import extract_price_table, resolve_backend
+from services.tracing import span
+from services.ttl_cache import BackgroundRefresher, TTLCache
+
+BROWSER_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+
+class MandiUnavailable(Exception):
+    """The commodity page could not be fetched or has no price table."""
+
+
+@dataclass(frozen=True)
+class MarketPrice:
+    """One market's row from a commodity page, in ₹ per quintal."""
+    market: str
+    min_price: float
+    max_price: float
+    modal_price: float
+
+
+def index_price_table(table):
+    """
+    Indexes a PriceTable as {market name (lowercase): MarketPrice}.
+    A market listed with several varieties keeps its first row.
+    """
+    index = {}
+    for row in range(len(table)):
+        market = table.markets[row]
+        index.setdefault(market.lower(), MarketPrice(
+            market, float(table.min_price[row]), float(table.max_price[row]), float(table.modal_price[row]),
+        ))
+    return index
+
+
+def parse_price_table(html, backend="stdlib"):
+    """Indexes the first table of a commodity page (see index_price_table)."""
+    table = extract_price_table(html, backend)
+    if table is None:
+        raise MandiUnavailable("Price table not found on the page.")
+    return index_price_table(table)
+
+
+def _log_prefetch_error(slug, future):
+    error = future.exception()
+    if error is not None:
+        print(f"[WARN] Prefetch of mandi prices for '{slug}' failed: {error}")
+    return error
+
+
+class MandiPriceStore:
+    """
+    In-memory store of mandi prices. Each commodity page is fetched over one
+    pooled session and parsed at most once per `ttl` seconds; every location
+    query for that commodity is then answered from the parsed index.
+
+    `prefetch()` loads all `slugs` concurrently, after which the background
+    refresher reloads them before they expire. With a `history`
+    (services.price_history.PriceHistory), every fetched row is also recorded
+    for trend queries.
+    """
+
+    def __init__(self, slugs=(), base_url=config.MANDI_BASE_URL, timeout=DEFAULT_TIMEOUT, session=None,
+                 max_workers=config.HTTP_POOL_SIZE, ttl=config.MANDI_PRICE_TTL,
+                 refresh_interval=config.MANDI_REFRESH_INTERVAL, table_parser=config.MANDI_TABLE_PARSER,
+                 history=None):
+        self.slugs = list(dict.fromkeys(slugs))
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.table_parser = resolve_backend(table_parser)
+        self.history = history
+        self.session = session or create_session(headers=BROWSER_HEADERS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mandi")
+        self.cache = TTLCache(self.load, ttl, name="mandi-prices")
+        self.refresher = BackgroundRefresher([self.cache], lambda: self.slugs,
+                                             interval=refresh_interval, name="mandi-refresher")
+
+    def commodity_url(self, slug):
+        return f"{self.base_url}/commodity/{slug}"
+
+    def fetch_page(self, slug):
+        response = self.session.get(self.commodity_url(slug), timeout=self.timeout)
+        if response.status_code != 200:
+            raise MandiUnavailable(f"/commodity/{slug} returned HTTP {response.status_code}")
+        return response.text
+
+    def load(self, slug):
+        # Only runs on a cache miss (or a background refresh)
+        with span("mandi.fetch", slug=slug):
+            html = self.fetch_page(slug)
+        with span("mandi.parse", slug=slug, parser=self.table_parser) as trace:
+            table = extract_price_table(html, self.table_parser)
+            trace.set(rows=len(table) if table is not None else 0)
+        if table is None:
+            raise MandiUnavailable("Price table not found on the page.")
+        if self.history is not None:
+            try:
+                self.history.record(slug, table)
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not record mandi price history for '{slug}': {e}")
+        return index_price_table(table)
+
+    def prices(self, slug):
+        """{market: MarketPrice} for a commodity, from cache or fetched once."""
+        self.refresher.start()
+        return self.cache.get(slug)
+
+    def lookup(self, slug, location):
+        """The MarketPrice of the first market whose name contains `location`, or None."""
+        index = self.prices(slug)
+        location = location.strip().lower()
+        if location in index:
+            return index[location]
+        for market, price in index.items():
+            if location in market:
+                return price
+        return None
+
+    def prefetch(self, slugs=None, wait=True):
+        """
+        Loads every commodity concurrently. With `wait`, returns {slug: error}
+        for the pages that failed; otherwise returns the futures immediately
+        and failures are only logged.
+        """
+        self.refresher.start()
+        futures = {slug: self._executor.submit(self.cache.get, slug) for slug in (slugs or self.slugs)}
+        if not wait:
+            for slug, future in futures.items():
+                future.add_done_callback(lambda future, slug=slug: _log_prefetch_error(slug, future))
+            return futures
+        errors = {}
+        for slug, future in futures.items():
+            error = _log_prefetch_error(slug, future)
+            if error is not None:
+                errors[slug] = error
+        return errors
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def close(self):
+        self.refresher.stop()
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+
+import pandas as pd
+
+# Days of history used by the trend queries
+MOVING_AVERAGE_DAYS = 7
+WEEK = pd.Timedelta(days=7)
+
+
+# --- Persistent price time series ---
+class PriceHistory:
+    """
+    SQLite time series of every scraped mandi price row, one row per
+    (commodity, market, variety, date). Re-scraping the same day's page
+    overwrites instead of duplicating, so the store stays compact.
+
+    The query methods load only the rows they need and do the arithmetic
+    with pandas, so "should I sell now or wait" is answered without a round
+    trip to the website.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " commodity TEXT NOT NULL, market TEXT NOT NULL, variety TEXT NOT NULL, date TEXT NOT NULL,"
+            " min_price REAL, max_price REAL, modal_price REAL,"
+            " PRIMARY KEY (commodity, market, variety, date)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS prices_by_date ON prices (commodity, date);"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def record(self, commodity, table, default_date=None):
+        """Stores every row of a PriceTable; rows without a date get `default_date` (today)."""
+        default_date = default_date or date.today().isoformat()
+        rows = [
+            (commodity, table.markets[i], table.varieties[i], table.dates[i] or default_date,
+             float(table.min_price[i]), float(table.max_price[i]), float(table.modal_price[i]))
+            for i in range(len(table))
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO prices (commodity, market, variety, date, min_price, max_price, modal_price) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+        return len(rows)
+
+    def frame(self, commodity, market=None, since=None):
+        """Daily modal/min/max per market (varieties averaged), indexed by (market, date)."""
+        query = "SELECT market, date, min_price, max_price, modal_price FROM prices WHERE commodity = ?"
+        params = [commodity]
+        if market is not None:
+            query += " AND market = ?"
+            params.append(market)
+        if since is not None:
+            query += " AND date >= ?"
+            params.append(since.isoformat() if hasattr(since, "isoformat") else since)
+        with self._lock:
+            frame = pd.read_sql_query(query, self._db, params=params, parse_dates=["date"])
+        return frame.groupby(["market", "date"]).mean().sort_index()
+
+    # --- Trend queries ---
+    def moving_average(self, commodity, market, days=MOVING_AVERAGE_DAYS):
+        """Modal price and its trailing `days`-day mean, one row per recorded date."""
+        series = self.frame(commodity, market)["modal_price"].droplevel("market")
+        return pd.DataFrame({
+            "modal_price": series,
+            "moving_average": series.rolling(f"{days}D").mean(),
+        })
+
+    def week_over_week(self, commodity, market):
+        """
+        (latest modal price, modal price a week earlier, % change), comparing
+        with the last date on or before 7 days ago; None without a week of history.
+        """
+        series = self.frame(commodity, market)["modal_price"].droplevel("market")
+        if series.empty:
+            return None
+        latest_date = series.index[-1]
+        previous = series[series.index <= latest_date - WEEK]
+        if previous.empty:
+            return None
+        latest, before = float(series.iloc[-1]), float(previous.iloc[-1])
+        return latest, before, (latest - before) / before * 100
+
+    def best_market(self, commodity, region=None, days=3, exclude=None):
+        """
+        The market with the highest modal price over the last `days` recorded
+        days, optionally limited to markets whose name contains `region`
+        (e.g. the state). Returns (market, modal_price) or None.
+        """
+        frame = self.frame(commodity).reset_index()
+        if frame.empty:
+            return None
+        frame = frame[frame["date"] > frame["date"].max() - pd.Timedelta(days=days)]
+        if region:
+            frame = frame[frame["market"].str.contains(region, case=False, regex=False)]
+        if exclude:
+            frame = frame[frame["market"] != exclude]
+        if frame.empty:
+            return None
+        latest = frame.sort_values("date").groupby("market")["modal_price"].last()
+        return latest.idxmax(), float(latest.max())
+
+    def stats(self):
+        with self._lock:
+            rows, commodities, markets, first, last = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT commodity), COUNT(DISTINCT market), MIN(date), MAX(date) FROM prices"
+            ).fetchone()
+        return {"rows": rows, "commodities": commodities, "markets": markets, "first_date": first, "last_date": last}
+
+
+def open_price_history(path):
+    """PriceHistory at `path`, or None if `path` is empty or the file cannot be opened."""
+    if not path:
+        return None
+    try:
+        return PriceHistory(path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"[WARN] Mandi price history disabled: {e}")
+        return None
@@ -0,0 +1,186 @@
+"""
+Extraction of the price table from a mandi commodity page.
+
+Only the first <table> of the page is read. Several parser backends can do
+this; all return the same PriceTable with numeric price columns:
+
+  * selectolax - C (lexbor) parser, fastest, optional dependency
+  * lxml       - C (libxml2) parser, optional dependency
+  * stdlib     - streaming html.parser that stops at the end of the table
+  * bs4        - BeautifulSoup over the whole page (the original implementation)
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from html.parser import HTMLParser
+
+import numpy as np
+
+# Cells per row: market, variety, min, max, modal (and optionally the date)
+PRICE_COLUMNS = slice(2, 5)
+MIN_CELLS = 5
+DATE_FORMAT = "%d-%b-%Y"   # 05-Aug-2026
+STREAM_CHUNK_SIZE = 16384
+
+
+@dataclass
+class PriceTable:
+    """Rows of a commodity page's price table, prices in ₹ per quintal, dates ISO (or None)."""
+    markets: list
+    varieties: list
+    dates: list
+    min_price: np.ndarray
+    max_price: np.ndarray
+    modal_price: np.ndarray
+
+    def __len__(self):
+        return len(self.markets)
+
+
+def parse_price(text):
+    """'₹4,525' -> 4525.0"""
+    return float(text.replace('₹', '').replace(',', '').strip())
+
+
+def parse_date(text):
+    """'05-Aug-2026' -> '2026-08-05'; None if the cell is not a date."""
+    try:
+        return datetime.strptime(text, DATE_FORMAT).date().isoformat()
+    except ValueError:
+        return None
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+def to_price_table(rows):
+    """Builds a PriceTable from rows of cell strings, skipping rows without valid prices."""
+    markets, varieties, dates, prices = [], [], [], []
+    for cells in rows:
+        if len(cells) < MIN_CELLS:
+            continue
+        try:
+            prices.append([parse_price(cell) for cell in cells[PRICE_COLUMNS]])
+        except ValueError:
+            continue
+        markets.append(cells[0])
+        varieties.append(cells[1])
+        dates.append(parse_date(cells[MIN_CELLS]) if len(cells) > MIN_CELLS else None)
+    prices = np.array(prices, dtype=np.float64).reshape(-1, 3)
+    return PriceTable(markets, varieties, dates, prices[:, 0], prices[:, 1], prices[:, 2])
+
+
+# --- Backends: each returns the <td> texts of every row of the first table, or None ---
+def _rows_selectolax(html):
+    from selectolax.parser import HTMLParser as LexborParser
+    table = LexborParser(html).css_first('table')
+    if table is None:
+        return None
+    return [[_clean(cell.text()) for cell in row.css('td')] for row in table.css('tr')]
+
+
+def _rows_lxml(html):
+    import lxml.html
+    # iter() includes the root itself, which is the table when `html` is a bare fragment
+    table = next(lxml.html.fromstring(html).iter('table'), None)
+    if table is None:
+        return None
+    return [[_clean(cell.text_content()) for cell in row.iter('td')] for row in table.iter('tr')]
+
+
+def _rows_bs4(html):
+    from bs4 import BeautifulSoup
+    table = BeautifulSoup(html, 'html.parser').find('table')
+    if table is None:
+        return None
+    return [[cell.get_text(' ', strip=True) for cell in row.find_all('td')] for row in table.find_all('tr')]
+
+
+class _TableStreamParser(HTMLParser):
+    """Collects <td> texts of the first table and flags `done` at its closing tag."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = None
+        self.done = False
+        self._depth = 0
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'table':
+            self._depth += 1
+            if self.rows is None:
+                self.rows = []
+        elif self._depth == 1 and tag == 'tr':
+            self.rows.append([])
+        elif self._depth == 1 and tag == 'td' and self.rows:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self.done or not self._depth:
+            return
+        if tag == 'td' and self._cell is not None:
+            self.rows[-1].append(_clean("".join(self._cell)))
+            self._cell = None
+        elif tag == 'table':
+            self._depth -= 1
+            self.done = self._depth == 0
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def _rows_stdlib(html):
+    parser = _TableStreamParser()
+    for start in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[start:start + STREAM_CHUNK_SIZE])
+        if parser.done:
+            break
+    return parser.rows
+
+
+TABLE_BACKENDS = {
+    "selectolax": _rows_selectolax,
+    "lxml": _rows_lxml,
+    "stdlib": _rows_stdlib,
+    "bs4": _rows_bs4,
+}
+# Order in which "auto" picks a backend
+PREFERRED_BACKENDS = ("selectolax", "lxml", "stdlib")
+
+
+def backend_available(name):
+    module = {"selectolax": "selectolax.parser", "lxml": "lxml.html", "bs4": "bs4"}.get(name)
+    if module is None:
+        return name in TABLE_BACKENDS
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_backend(name="auto"):
+    """
+    Returns the backend name to use; "auto" picks the fastest installed one,
+    as does a named backend whose package is not installed.
+    """
+    if name != "auto" and name not in TABLE_BACKENDS:
+        raise ValueError(f"Unknown table parser '{name}'. Expected 'auto' or one of {list(TABLE_BACKENDS)}.")
+    if name != "auto" and backend_available(name):
+        return name
+    fallback = next(backend for backend in PREFERRED_BACKENDS if backend_available(backend))
+    if name != "auto":
+        print(f"[WARN] Table parser '{name}' is not installed; using '{fallback}'.")
+    return fallback
+
+
+def extract_price_table(html, backend="stdlib"):
+    """Parses the first table of `html` with the named backend; None if the page has no table."""
+    rows = TABLE_BACKENDS[backend](html)
+    if rows is None:
+        return None
+    return to_price_table(rows)
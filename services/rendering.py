@@ -0,0 +1,66 @@
+import string
+from dataclasses import dataclass, field
+
+LANGUAGES = ("en", "hi")
+
+
+# --- Structured agent output ---
+@dataclass
+class AgentResponse:
+    """
+    What an agent returns instead of a finished string: the id of a localized
+    template plus the data to fill it with. The same response renders in every
+    language without a translation call.
+    """
+    template_id: str
+    data: dict = field(default_factory=dict)
+
+    def render(self, lang='en'):
+        return render(self, lang)
+
+
+def localized(en, hi=None):
+    """A slot value with a hand-written (or precomputed) Hindi variant; falls back to English."""
+    return {"en": en, "hi": hi if hi is not None else en}
+
+
+# --- Template registry ---
+_TEMPLATES = {}
+_FORMATTER = string.Formatter()
+
+def register_templates(templates):
+    """
+    Registers {template_id: {"en": ..., "hi": ...}} format-string templates.
+    Templates are parsed once here, so a malformed one fails at startup
+    instead of in the middle of a farmer's conversation.
+    """
+    for template_id, variants in templates.items():
+        for lang in LANGUAGES:
+            if lang not in variants:
+                raise ValueError(f"Template '{template_id}' has no '{lang}' variant.")
+            list(_FORMATTER.parse(variants[lang]))
+        _TEMPLATES[template_id] = {lang: variants[lang] for lang in LANGUAGES}
+
+def has_template(template_id):
+    return template_id in _TEMPLATES
+
+
+# --- Rendering ---
+def _slot_value(value, lang):
+    if isinstance(value, dict) and lang in value:
+        return value[lang]
+    if isinstance(value, AgentResponse):
+        return render(value, lang)
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(_slot_value(item, lang)) for item in value)
+    return value
+
+def render(response, lang='en'):
+    """Fills the response's template in `lang`; localized slot values pick their own language."""
+    template = _TEMPLATES[response.template_id][lang]
+    data = {key: _slot_value(value, lang) for key, value in response.data.items()}
+    return template.format_map(data)
+
+def render_all(response):
+    """Renders a response in every supported language: {"en": ..., "hi": ...}."""
+    return {lang: render(response, lang) for lang in LANGUAGES}
@@ -0,0 +1,275 @@
+"""
+Lightweight tracing for the request path: nested, timed spans with
+attributes, written to a JSON-lines log and aggregated per stage for a
+p50/p95 summary and an optional Prometheus text endpoint.
+
+    with span("translate", dest="hi") as s:
+        ...
+        s.set(cache="hit")
+
+    @traced("extract_location")
+    def extract_location(text): ...
+
+Spans opened while another is active become its children and share its
+trace id, so one chat turn (including work handed to the agent pool, which
+copies the caller's context, and micro-batched model calls, whose span is
+opened on the caller's side) is one trace. With TRACING_ENABLED=0 (the
+default) `span()` returns a shared no-op object and `traced` functions call
+straight through.
+
+Summarize a log offline (from the repository root):
+    python -m services.tracing .cache/traces.jsonl
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+QUANTILES = (0.5, 0.95)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# --- Spans ---
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "attributes", "start", "_wall", "_token")
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self._wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer.record(self, duration)
+        return False
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off: every operation does nothing."""
+    __slots__ = ()
+
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# --- Per-stage statistics ---
+class StageStats:
+    """Count and total of every span of one name, plus a window of recent durations for quantiles."""
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class Tracer:
+    """
+    Records finished spans: appends them to `log_path` (one JSON object per
+    line, flushed when a root span ends) and keeps StageStats per span name.
+    """
+
+    def __init__(self, enabled=config.TRACING_ENABLED, log_path=config.TRACE_LOG_PATH, window=config.TRACE_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._stats = defaultdict(lambda: StageStats(self.window))
+        self._lock = threading.Lock()
+        self._log = None
+        if enabled and log_path:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                self._log = open(log_path, "a", encoding="utf-8")
+            except OSError as e:
+                print(f"[WARN] Trace log disabled, could not open {log_path}: {e}")
+
+    def span(self, name, **attributes):
+        return Span(self, name, attributes) if self.enabled else NOOP_SPAN
+
+    def record(self, span, duration):
+        line = None
+        if self._log is not None:
+            line = json.dumps({
+                "trace": span.trace_id, "span": span.span_id, "parent": span.parent_id, "name": span.name,
+                "start": round(span._wall, 6), "duration_ms": round(duration * 1000, 3), "attributes": span.attributes,
+            }, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stats[span.name].add(duration)
+            if line is not None:
+                self._log.write(line + "\n")
+                if span.parent_id is None:
+                    self._log.flush()
+
+    def summary(self):
+        """{stage: {"count", "p50_ms", "p95_ms", "mean_ms"}}, stages sorted by name."""
+        with self._lock:
+            stats = dict(self._stats)
+            return {
+                name: {
+                    "count": stage.count,
+                    "p50_ms": round(stage.quantile(0.5) * 1000, 3),
+                    "p95_ms": round(stage.quantile(0.95) * 1000, 3),
+                    "mean_ms": round(stage.total / stage.count * 1000, 3),
+                }
+                for name, stage in sorted(stats.items())
+            }
+
+    def prometheus_text(self):
+        """The per-stage statistics in the Prometheus text exposition format (a summary metric)."""
+        metric = "krishimitra_stage_duration_seconds"
+        lines = [f"# HELP {metric} Duration of traced stages.", f"# TYPE {metric} summary"]
+        with self._lock:
+            for name, stage in sorted(self._stats.items()):
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{stage="{name}",quantile="{q}"}} {stage.quantile(q):.6f}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {stage.total:.6f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {stage.count}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+tracer = Tracer()
+
+
+def span(name, **attributes):
+    """Context manager timing one stage under the process-wide tracer."""
+    return tracer.span(name, **attributes) if tracer.enabled else NOOP_SPAN
+
+
+def current_span():
+    """The innermost active span (a no-op while tracing is off), to attach attributes from inside a stage."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name):
+    """Decorator: runs the function inside span(name)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Prometheus endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = tracer.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+def start_metrics_server(port=config.TRACE_METRICS_PORT, host="127.0.0.1"):
+    """Serves GET /metrics on a daemon thread, once per process; a no-op if tracing is off or port is 0."""
+    global _metrics_server
+    if not tracer.enabled or not port:
+        return None
+    with _metrics_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                print(f"[WARN] Metrics endpoint disabled, could not bind {host}:{port}: {e}")
+                return None
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name="trace-metrics", daemon=True).start()
+    return _metrics_server
+
+
+# --- Offline summary ---
+def summarize_log(path):
+    """{stage: {"count", "p50_ms", "p95_ms", "mean_ms"}} over every span in a JSON-lines trace log."""
+    durations = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                durations[record["name"]].append(record["duration_ms"])
+    for values in durations.values():
+        values.sort()
+    return {
+        name: {
+            "count": len(values),
+            "p50_ms": values[min(len(values) - 1, int(0.5 * len(values)))],
+            "p95_ms": values[min(len(values) - 1, int(0.95 * len(values)))],
+            "mean_ms": round(sum(values) / len(values), 3),
+        }
+        for name, values in sorted(durations.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage p50/p95 of a trace log.")
+    parser.add_argument("log", nargs="?", default=config.TRACE_LOG_PATH)
+    args = parser.parse_args()
+    print(f"{'stage':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for name, stage in summarize_log(args.log).items():
+        print(f"{name:<28}{stage['count']:>8}{stage['p50_ms']:>10.2f}{stage['p95_ms']:>10.2f}{stage['mean_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import config
+from services.tracing import span
+
+# --- Constants ---
+TRANSLATION_BACKEND = config.TRANSLATION_BACKEND
+TRANSLATION_CACHE_PATH = config.TRANSLATION_CACHE_PATH
+TRANSLATION_MEMORY_SIZE = config.TRANSLATION_MEMORY_SIZE
+# A whole batch goes out as ONE request, each segment prefixed with a numbered
+# marker ("[[3]] ...") that translation leaves intact; \d also matches the
+# Devanagari digits the marker may come back with
+SEGMENT_MARKER = "[[{}]] "
+SEGMENT_PATTERN = re.compile(r"\s*\[\[(\d+)\]\]\s*")
+
+
+# --- Backends ---
+class GoogleTransBackend:
+    """Translates through googletrans, reusing a single client for the whole process."""
+
+    def __init__(self):
+        self._translator = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        # Only construction is locked; requests from different threads run concurrently
+        if self._translator is None:
+            with self._lock:
+                if self._translator is None:
+                    from googletrans import Translator
+                    self._translator = Translator()
+        return self._translator
+
+    def _translate_one(self, text, dest):
+        # The key fix is adding raise_exception=True (works around a googletrans bug)
+        return self._client().translate(text, dest=dest, raise_exception=True).text
+
+    def translate_batch(self, texts, dest):
+        if len(texts) == 1 or any(SEGMENT_PATTERN.search(text) for text in texts):
+            return [self._translate_one(text, dest) for text in texts]
+        joined = "\n".join(SEGMENT_MARKER.format(i) + text for i, text in enumerate(texts))
+        parts = SEGMENT_PATTERN.split(self._translate_one(joined, dest))
+        # [text before the first marker, index 0, segment 0, index 1, segment 1, ...]
+        if parts[0].strip() or [int(index) for index in parts[1::2]] != list(range(len(texts))):
+            # A marker was lost, altered or reordered; fall back to one request per segment
+            return [self._translate_one(text, dest) for text in texts]
+        return [segment.strip() for segment in parts[2::2]]
+
+
+class OfflineBackend:
+    """
+    Local stand-in for tests, benchmarks and offline deployments: looks segments
+    up in a phrasebook ({dest: {source: translation}}) and returns anything
+    unknown unchanged. Counts requests so callers can check batching.
+    """
+
+    def __init__(self, phrasebook=None):
+        self.phrasebook = phrasebook or {}
+        self.requests = 0
+
+    def translate_batch(self, texts, dest):
+        self.requests += 1
+        table = self.phrasebook.get(dest, {})
+        return [table.get(text, text) for text in texts]
+
+
+BACKENDS = {"googletrans": GoogleTransBackend, "offline": OfflineBackend}
+
+
+# --- Persistent cache ---
+class TranslationCache:
+    """SQLite store of translations keyed by (source text, target language)."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations (source TEXT NOT NULL, dest TEXT NOT NULL, "
+            "translated TEXT NOT NULL, PRIMARY KEY (source, dest))"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, texts, dest):
+        if not texts:
+            return {}
+        found = {}
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(texts), 500):
+                chunk = texts[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT source, translated FROM translations WHERE dest = ? AND source IN ({placeholders})",
+                    [dest, *chunk],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, pairs, dest):
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations (source, dest, translated) VALUES (?, ?, ?)",
+                [(source, dest, translated) for source, translated in pairs],
+            )
+            self._db.commit()
+
+
+# --- Translation service ---
+class TranslationService:
+    """
+    Cached translation layer: an in-memory LRU in front of the persistent SQLite
+    cache, in front of the backend. Only segments missing from both caches are
+    sent, and they are sent together in one backend request.
+    """
+
+    def __init__(self, backend, cache_path=None, memory_size=TRANSLATION_MEMORY_SIZE):
+        self.backend = backend
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = TranslationCache(cache_path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"[WARN] Translation cache persistence disabled: {e}")
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def translate_batch(self, texts, dest='hi'):
+        """Translates a list of segments, returning them in order. Failed segments come back unchanged."""
+        with span("translate", dest=dest, segments=len(texts)) as trace:
+            results = {text: text for text in texts if not text.strip()}
+            unique = [text for text in dict.fromkeys(texts) if text.strip()]
+            pending = []
+            for text in unique:
+                with self._lock:
+                    cached = self._memory.get((text, dest))
+                    if cached is not None:
+                        self._memory.move_to_end((text, dest))
+                if cached is not None:
+                    results[text] = cached
+                else:
+                    pending.append(text)
+
+            if pending and self.cache is not None:
+                for text, translated in self.cache.get_many(pending, dest).items():
+                    results[text] = translated
+                    self._remember((text, dest), translated)
+                pending = [text for text in pending if text not in results]
+
+            self.hits += len(unique) - len(pending)
+            self.misses += len(pending)
+            trace.set(cache_hits=len(unique) - len(pending), cache_misses=len(pending))
+            if pending:
+                try:
+                    translated = self.backend.translate_batch(pending, dest)
+                    for text, value in zip(pending, translated):
+                        results[text] = value
+                        self._remember((text, dest), value)
+                    if self.cache is not None:
+                        self.cache.put_many(zip(pending, translated), dest)
+                except Exception as e:
+                    print(f"Translation Error: {e}")
+                    # Fallback to returning the original text if translation fails
+                    for text in pending:
+                        results[text] = text
+            return [results[text] for text in texts]
+
+    def translate(self, text, dest='hi'):
+        """
+        Translates a (possibly multi-line) message. Lines are translated as
+        separate segments, so templated lines that repeat across responses are
+        served from the cache while the rest go out in one request.
+        """
+        lines = text.split("\n")
+        translated = self.translate_batch([line.strip() for line in lines], dest)
+        # Keep the original indentation of each line
+        return "\n".join(line[:len(line) - len(line.lstrip())] + value for line, value in zip(lines, translated))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "persistent": self.cache is not None,
+        }
+
+
+def create_translation_service(backend=TRANSLATION_BACKEND, cache_path=TRANSLATION_CACHE_PATH):
+    """Builds the service from configuration; `backend` may be a name or a backend instance."""
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown translation backend '{backend}'. Expected one of {list(BACKENDS)}.")
+        backend = BACKENDS[backend]()
+    return TranslationService(backend, cache_path or None)
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+def get_translation_service():
+    """Process-wide translation service (one client and one cache shared by every session)."""
+    global _default_service
+    if _default_service is None:
+        with _default_service_lock:
+            if _default_service is None:
+                _default_service = create_translation_service()
+    return _default_service
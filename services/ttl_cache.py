@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+
+
+# --- Time-based cache with request coalescing ---
+class TTLCache:
+    """
+    Caches `loader(key)` results for `ttl` seconds.
+
+    * Concurrent misses for the same key are coalesced: one caller runs the
+      loader, the others wait for its result (one upstream call, not N).
+    * If a reload fails and an expired value younger than `stale_ttl` exists,
+      the stale value is served instead of the error.
+    * `refresh(key)` reloads ahead of expiry; see BackgroundRefresher.
+
+    Request counts for `most_requested()` are kept for at most `max_tracked`
+    keys (default 4 x max_entries): past that, every count is halved and keys
+    that reach zero are forgotten, so memory stays bounded and popularity
+    favours recent demand.
+    """
+
+    def __init__(self, loader, ttl, stale_ttl=None, max_entries=1024, name="cache", max_tracked=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl if stale_ttl is not None else ttl * 6
+        self.max_entries = max_entries
+        self.max_tracked = max_tracked or max_entries * 4
+        self.name = name
+        self._entries = OrderedDict()  # key -> (value, loaded_at)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.refreshes = 0
+
+    def _count_request(self, key):
+        # Called with the lock held
+        self.requests[key] += 1
+        if len(self.requests) > self.max_tracked:
+            while len(self.requests) > self.max_tracked // 2:
+                self.requests = Counter({k: count // 2 for k, count in self.requests.items() if count // 2})
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key):
+        """Runs the loader once per key at a time; concurrent callers share the in-flight Future."""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            value = self.loader(key)
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._count_request(key)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        try:
+            return self._load(key)
+        except Exception as e:
+            if entry is not None and now - entry[1] < self.stale_ttl:
+                print(f"[WARN] {self.name}: serving stale data for '{key}' after error: {e}")
+                with self._lock:
+                    self.stale_served += 1
+                return entry[0]
+            raise
+
+    def refresh(self, key):
+        """Reloads `key` now; errors are logged and the current value is kept."""
+        try:
+            self._load(key)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            print(f"[WARN] {self.name}: background refresh of '{key}' failed: {e}")
+
+    def expires_in(self, key):
+        """Seconds until `key` expires (negative if expired), or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return self.ttl - (time.monotonic() - entry[1])
+
+    def most_requested(self, n=None):
+        with self._lock:
+            return [key for key, _ in self.requests.most_common(n)]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+                "refreshes": self.refreshes,
+            }
+
+
+# --- Refresh-ahead worker ---
+class BackgroundRefresher:
+    """
+    Daemon thread that, every `interval` seconds, reloads the keys returned by
+    `keys_fn()` in each cache once they are within `ahead` (a fraction of the
+    cache's TTL) of expiring, so popular keys never expire on a user request.
+    """
+
+    def __init__(self, caches, keys_fn, interval=60.0, ahead=0.2, name="cache-refresher"):
+        self.caches = caches
+        self.keys_fn = keys_fn
+        self.interval = interval
+        self.ahead = ahead
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Starts the worker once; later calls are no-ops."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        for key in self.keys_fn():
+            for cache in self.caches:
+                remaining = cache.expires_in(key)
+                if remaining is not None and remaining < cache.ttl * self.ahead:
+                    cache.refresh(key)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[WARN] {self.name}: refresh cycle failed: {e}")
@@ -0,0 +1,75 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from services.http import DEFAULT_TIMEOUT, create_session
+from services.tracing import span
+from services.ttl_cache import BackgroundRefresher, TTLCache
+
+
+class WeatherUnavailable(Exception):
+    """OpenWeather answered, but not with usable data (unknown city, bad key, ...)."""
+
+
+class OpenWeatherClient:
+    """
+    Fetches current conditions and the 5-day forecast for a location. Both
+    calls are fired concurrently over one pooled keep-alive session, with
+    strict timeouts and retry/backoff, so a weather turn costs one round trip
+    and a slow upstream can never hang a Streamlit worker.
+
+    Results are cached per location (current conditions for `current_ttl`,
+    the forecast for `forecast_ttl` seconds). Concurrent misses for one city
+    share a single upstream call, stale data is served if OpenWeather errors,
+    and the cities returned by `popular_locations()` are refreshed in the
+    background before they expire.
+    """
+
+    def __init__(self, api_key=config.WEATHER_API_KEY, base_url=config.OPENWEATHER_BASE_URL,
+                 timeout=DEFAULT_TIMEOUT, session=None, max_workers=config.HTTP_POOL_SIZE,
+                 current_ttl=config.WEATHER_CURRENT_TTL, forecast_ttl=config.WEATHER_FORECAST_TTL,
+                 popular_locations=None, refresh_interval=config.WEATHER_REFRESH_INTERVAL):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = session or create_session()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="openweather")
+        self.current_cache = TTLCache(self.fetch_current, current_ttl, name="weather-current")
+        self.forecast_cache = TTLCache(self.fetch_forecast, forecast_ttl, name="weather-forecast")
+        self.refresher = BackgroundRefresher(
+            [self.current_cache, self.forecast_cache], popular_locations or (lambda: []),
+            interval=refresh_interval, name="weather-refresher",
+        )
+
+    def _get(self, endpoint, location):
+        params = {"q": location, "appid": self.api_key, "units": "metric"}
+        # Only runs on a cache miss (or a background refresh)
+        with span("openweather.fetch", endpoint=endpoint) as trace:
+            response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=self.timeout)
+            trace.set(status=response.status_code)
+        if response.status_code != 200:
+            raise WeatherUnavailable(f"/{endpoint} returned HTTP {response.status_code}")
+        return response.json()
+
+    def fetch_current(self, location):
+        return self._get("weather", location)
+
+    def fetch_forecast(self, location):
+        return self._get("forecast", location)
+
+    def fetch(self, location):
+        """Returns (current_data, forecast_data) for a location, from cache or fetched concurrently."""
+        self.refresher.start()
+        key = location.strip().lower()
+        # Each call runs in a copy of the caller's context, so its spans join the caller's trace
+        current = self._executor.submit(contextvars.copy_context().run, self.current_cache.get, key)
+        forecast = self._executor.submit(contextvars.copy_context().run, self.forecast_cache.get, key)
+        return current.result(), forecast.result()
+
+    def cache_stats(self):
+        return [self.current_cache.stats(), self.forecast_cache.stats()]
+
+    def close(self):
+        self.refresher.stop()
+        self._executor.shutdown(wait=False)
+        self.session.close()
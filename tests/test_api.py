@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+import api
+import config
+
+
+def call(method, path, body=b"", chunk_size=None, query=b""):
+    """Runs one request through the ASGI app; returns (status, decoded JSON body)."""
+    chunk_size = chunk_size or max(1, len(body))
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query}
+    asyncio.run(api.app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_unknown_path_is_404():
+    status, body = call("GET", "/nowhere")
+    assert status == 404
+    assert body == {"error": "Not found."}
+
+
+def test_wrong_method_is_405():
+    status, _ = call("GET", "/diagnose")
+    assert status == 405
+
+
+def test_missing_parameter_is_400():
+    status, body = call("GET", "/weather")
+    assert status == 400
+    assert "location" in body["error"]
+
+
+def test_oversized_upload_is_413(monkeypatch):
+    monkeypatch.setattr(config, "API_MAX_UPLOAD_BYTES", 1024)
+    status, body = call("POST", "/diagnose", body=b"x" * 4096, chunk_size=512)
+    assert status == 413
+    assert "1024" in body["error"]
+
+
+def test_empty_upload_is_400():
+    status, _ = call("POST", "/diagnose")
+    assert status == 400
+
+
+def test_worker_at_its_inflight_limit_is_503(monkeypatch):
+    monkeypatch.setattr(config, "API_MAX_INFLIGHT", 2)
+    monkeypatch.setattr(api, "_inflight", 2)
+    status, _ = call("GET", "/weather", query=b"location=Pune")
+    assert status == 503
+    assert api._inflight == 2
+
+
+def test_busy_agent_is_503(monkeypatch):
+    async def busy(agent, fn, *args):
+        raise api.HTTPError(503, f"Agent '{agent}' is at its concurrency limit.")
+
+    monkeypatch.setattr(api, "call_agent", busy)
+    status, _ = call("GET", "/weather", query=b"location=Pune")
+    assert status == 503
+    assert api._inflight == 0
+
+
+def test_health_lists_every_registered_model():
+    status, body = call("GET", "/health")
+    assert status == 200
+    assert {"pest_detector", "spacy_en_core_web_sm_ner"} <= {model["name"] for model in body["models"]}
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+
+from model.batching import MicroBatcher
+
+
+class RecordingModel:
+    """predict_fn stand-in: returns each sample's sum as its row and records batch sizes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.batch_sizes.append(len(batch))
+        return batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def model():
+    return RecordingModel()
+
+
+def test_predict_returns_the_sample_row(model):
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=1)
+    try:
+        np.testing.assert_array_equal(batcher.predict(np.full(3, 2.0), timeout=5), [6.0])
+    finally:
+        batcher.close()
+
+
+def test_concurrent_requests_share_one_call(model):
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(np.full(2, float(i))) for i in range(8)]
+        rows = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+    assert [row[0] for row in rows] == [2.0 * i for i in range(8)]
+    assert model.batch_sizes == [8]
+
+
+def test_groups_run_whole_and_never_exceed_the_batch_size(model):
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=200)
+    try:
+        futures = [batcher.submit_many(np.ones((count, 1)) * count) for count in (3, 3, 2, 2)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+    assert [len(rows) for rows in results] == [3, 3, 2, 2]
+    assert all(np.all(rows == count) for rows, count in zip(results, (3, 3, 2, 2)))
+    assert max(model.batch_sizes) <= 4
+    assert sum(model.batch_sizes) == 10
+
+
+def test_submit_many_rejects_groups_larger_than_a_batch(model):
+    batcher = MicroBatcher(model, max_batch_size=2)
+    try:
+        with pytest.raises(ValueError):
+            batcher.submit_many(np.ones((3, 1)))
+    finally:
+        batcher.close()
+
+
+def test_model_errors_reach_every_caller():
+    def failing(batch):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(np.ones(1)) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_submit_after_close_fails(model):
+    batcher = MicroBatcher(model)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.ones(1))
@@ -0,0 +1,76 @@
+import pytest
+
+from services.chat_history import ChatArchive, ChatHistory
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ChatArchive(str(tmp_path / "chat.sqlite"))
+
+
+def fill(history, count):
+    for i in range(count):
+        history.append("user" if i % 2 == 0 else "assistant", f"message {i}", f"संदेश {i}")
+
+
+def texts(messages):
+    return [message["en"] for message in messages]
+
+
+def test_history_past_the_memory_limit_pages_back_from_the_archive(archive):
+    history = ChatHistory("session", archive, keep_in_memory=10)
+    fill(history, 35)
+    assert len(history) == 35
+    assert len(history._messages) <= 10
+    assert texts(history.recent(5)) == [f"message {i}" for i in range(30, 35)]
+    # Paging back, one page at a time, down to the first message
+    pages, stop = [], len(history)
+    while stop > history.oldest_available:
+        pages.insert(0, history.page(stop - 8, stop))
+        stop -= 8
+    assert texts(message for page in pages for message in page) == [f"message {i}" for i in range(35)]
+    assert history.page(0, 1) == [{"role": "user", "en": "message 0", "hi": "संदेश 0"}]
+
+
+def test_a_page_spanning_archive_and_memory(archive):
+    history = ChatHistory("session", archive, keep_in_memory=10)
+    fill(history, 20)
+    first_in_memory = history._first_seq
+    page = history.page(first_in_memory - 3, first_in_memory + 3)
+    assert texts(page) == [f"message {i}" for i in range(first_in_memory - 3, first_in_memory + 3)]
+
+
+def test_without_an_archive_the_history_is_capped():
+    history = ChatHistory("session", keep_in_memory=10)
+    fill(history, 25)
+    assert history.oldest_available == history._first_seq > 0
+    assert history.page(0, 5) == []
+    assert texts(history.recent(100))[-1] == "message 24"
+
+
+def test_pending_messages_stay_in_memory_until_settled(archive):
+    history = ChatHistory("session", archive, keep_in_memory=4)
+    history.append("assistant", "thinking...", task="t1")
+    fill(history, 10)
+    assert history._first_seq == 0
+    assert history.settle("t1", {"en": "Done", "hi": "हो गया"})["en"] == "Done"
+    history.append("user", "next")
+    assert history._first_seq > 0
+    assert history.page(0, 1) == [{"role": "assistant", "en": "Done", "hi": "हो गया"}]
+
+
+def test_sessions_are_kept_apart_and_cleared(archive):
+    first, second = ChatHistory("first", archive, keep_in_memory=4), ChatHistory("second", archive, keep_in_memory=4)
+    fill(first, 10)
+    fill(second, 10)
+    first.clear()
+    assert len(first) == 0 and first.page(0, 10) == []
+    assert texts(second.page(0, 2)) == ["message 0", "message 1"]
+
+
+def test_archive_survives_reopening_and_prunes_old_messages(tmp_path):
+    path = str(tmp_path / "chat.sqlite")
+    history = ChatHistory("session", ChatArchive(path), keep_in_memory=4)
+    fill(history, 10)
+    assert texts(ChatArchive(path).load("session", 0, 2)) == ["message 0", "message 1"]
+    assert ChatArchive(path, retention=-1).load("session", 0, 10) == []
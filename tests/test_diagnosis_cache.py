@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+import pytest
+
+from model import pest_detector
+from model.diagnosis_cache import DiagnosisCache, content_key
+from model.pest_detector import CLASS_NAMES, MODEL_ERROR
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = DiagnosisCache(max_entries=2)
+    cache.put("a", 0, [1.0, 0.0])
+    cache.put("b", 1, [0.0, 1.0])
+    cache.get("a")
+    cache.put("c", 0, [1.0, 0.0])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_survive_reopening_the_database(tmp_path):
+    path = str(tmp_path / "diagnoses.sqlite")
+    cache = DiagnosisCache(max_entries=8, persist_path=path)
+    for i, key in enumerate(["old", "middle", "new"]):
+        cache.put(key, i, [0.25, 0.75])
+        time.sleep(0.01)
+    cache.get("old")  # reads do not touch the database
+
+    reopened = DiagnosisCache(max_entries=2, persist_path=path)
+    assert reopened.stats()["persistent"]
+    assert reopened.get("old") is None
+    assert reopened.get("new") == {"class_index": 2, "probabilities": [0.25, 0.75]}
+    assert reopened.get("middle") is not None
+
+
+def test_clear_empties_the_database(tmp_path):
+    path = str(tmp_path / "diagnoses.sqlite")
+    cache = DiagnosisCache(persist_path=path)
+    cache.put("a", 0, [1.0])
+    cache.clear()
+    assert DiagnosisCache(persist_path=path).get("a") is None
+
+
+def test_content_key_depends_on_shape_and_bytes():
+    image = np.zeros((2, 3), dtype=np.uint8)
+    assert content_key(image) != content_key(image.reshape(3, 2))
+    assert content_key(b"photo") == content_key(bytearray(b"photo"))
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    """pest_detector with an empty cache and a model that must not be loaded."""
+    monkeypatch.setattr(pest_detector, "diagnosis_cache", DiagnosisCache())
+    loads = []
+    monkeypatch.setattr(pest_detector.pest_model, "get", lambda: loads.append(1))
+    return loads
+
+
+def test_cache_hit_does_not_load_the_model(detector):
+    photo = b"not even a decodable image"
+    probabilities = np.eye(len(CLASS_NAMES))[3]
+    pest_detector.diagnosis_cache.put(content_key(photo), 3, probabilities)
+
+    result = pest_detector.diagnose_plant_disease(photo, high_accuracy=False)
+    assert result.error is None
+    assert result.class_name == CLASS_NAMES[3]
+    assert detector == []
+
+
+def test_high_accuracy_results_are_cached_apart(detector):
+    photo = b"photo"
+    pest_detector.diagnosis_cache.put(content_key(photo), 3, np.eye(len(CLASS_NAMES))[3])
+
+    # The single-view entry does not answer a high-accuracy request; the model is needed
+    result = pest_detector.diagnose_plant_disease(photo, high_accuracy=True)
+    assert result.error == MODEL_ERROR
+    assert detector == [1]
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from services.executor import AgentBusy, AgentExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = AgentExecutor(max_workers=4, timeouts={"price": 5, "weather": 5}, limits={"price": 1})
+    yield executor
+    executor.shutdown()
+
+
+def test_limited_agent_does_not_block_other_agents(executor):
+    release = threading.Event()
+    prices = [executor.submit("price", release.wait, 5) for _ in range(4)]
+    try:
+        start = time.monotonic()
+        assert executor.submit("weather", lambda: "sunny").result() == "sunny"
+        assert time.monotonic() - start < 1
+        # One price call runs, the rest wait in the queue rather than on pool threads
+        assert executor.stats()["queued"] == {"price": 3}
+    finally:
+        release.set()
+    assert [task.result() for task in prices] == [True] * 4
+
+
+def test_limit_caps_concurrent_calls(executor):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    tasks = [executor.submit("price", call) for _ in range(5)]
+    for task in tasks:
+        task.result()
+    assert peak[0] == 1
+
+
+def test_queued_call_past_its_timeout_fails_with_agent_busy():
+    executor = AgentExecutor(max_workers=2, timeouts={"price": 0.05}, limits={"price": 1})
+    try:
+        first = executor.submit("price", time.sleep, 0.2)
+        queued = executor.submit("price", lambda: "never")
+        first.future.result(timeout=5)
+        with pytest.raises(AgentBusy):
+            queued.future.result(timeout=5)
+    finally:
+        executor.shutdown()
+
+
+def test_errors_and_timeouts_are_reported(executor):
+    def fail():
+        raise RuntimeError("scrape failed")
+
+    failed = executor.submit("weather", fail)
+    with pytest.raises(RuntimeError):
+        failed.result()
+    assert failed.status() == "error"
+
+    slow = AgentExecutor(max_workers=1, default_timeout=0.01)
+    try:
+        task = slow.submit("translate", time.sleep, 0.2)
+        with pytest.raises(TimeoutError):
+            task.result()
+        assert task.status() == "timeout"
+    finally:
+        slow.shutdown()
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import config
+from agents import forecast, weather
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def payload():
+    return load_fixture("openweather_forecast.json")
+
+
+def slot(hour, temp=25.0, wind=2.0, pop=0.0, rain=0.0, day=6):
+    """One synthetic 3-hour slot at `hour` UTC on 2026-08-`day`."""
+    return {
+        "dt": int(pd.Timestamp(f"2026-08-{day:02d} {hour:02d}:00", tz="UTC").timestamp()),
+        "main": {"temp": temp, "temp_min": temp - 1, "temp_max": temp + 1, "humidity": 60},
+        "wind": {"speed": wind},
+        "pop": pop,
+        "rain": {"3h": rain} if rain else {},
+    }
+
+
+def test_slots_are_grouped_by_local_day(payload):
+    frame = forecast.forecast_frame(payload)
+    # Indore is UTC+5:30, so the first slot starts at 05:30 local time
+    assert frame.index[0] == pd.Timestamp("2026-08-06 05:30")
+    daily = forecast.daily_summary(frame)
+    # 40 slots: a partial first day, four full days and one slot of the last day
+    assert daily["slots"].tolist() == [7, 8, 8, 8, 8, 1]
+    assert daily["slots"].sum() == len(payload["list"])
+
+
+def test_daily_aggregates_match_the_slots(payload):
+    frame = forecast.forecast_frame(payload)
+    daily = forecast.daily_summary(frame)
+    first_day = frame[frame["date"] == daily.index[0]]
+    row = daily.iloc[0]
+    assert row["temp_min"] == first_day["temp_min"].min()
+    assert row["temp_max"] == first_day["temp_max"].max()
+    assert row["rain_mm"] == pytest.approx(first_day["rain_mm"].sum())
+    assert row["rain_probability"] == first_day["pop"].max()
+    assert row["gdd"] == pytest.approx((row["temp_min"] + row["temp_max"]) / 2 - forecast.GDD_BASE_TEMP)
+
+
+def test_gdd_is_never_negative():
+    frame = forecast.forecast_frame({"list": [slot(6, temp=2.0)]})
+    assert forecast.daily_summary(frame)["gdd"].tolist() == [0.0]
+
+
+def test_next_hours_covers_the_first_eight_slots(payload):
+    frame = forecast.forecast_frame(payload)
+    upcoming = forecast.next_hours(frame)
+    assert upcoming["temp_max"] == frame["temp_max"].iloc[:8].max()
+    assert upcoming["rain_mm"] == pytest.approx(frame["rain_mm"].iloc[:8].sum())
+
+
+def test_spray_windows_are_dry_calm_daytime_runs():
+    slots = [
+        slot(3),                           # night
+        slot(6), slot(9),                  # suitable run 06:00-12:00
+        slot(12, wind=6.0),                # too windy
+        slot(15),                          # suitable 15:00-18:00
+        slot(18),                          # evening
+        slot(9, pop=0.8, day=7),           # rain likely
+    ]
+    windows = forecast.spray_windows(forecast.forecast_frame({"list": slots}))
+    assert windows == [
+        (pd.Timestamp("2026-08-06 06:00"), pd.Timestamp("2026-08-06 12:00")),
+        (pd.Timestamp("2026-08-06 15:00"), pd.Timestamp("2026-08-06 18:00")),
+    ]
+
+
+def test_advisories_flag_heavy_rain_and_heat():
+    slots = [slot(6, rain=12.0), slot(9, rain=12.0), slot(12, temp=39.0, day=7)]
+    lines = forecast.advisories(forecast.daily_summary(forecast.forecast_frame({"list": slots})))
+    assert len(lines) == 2
+    assert "heavy rain (24 mm)" in lines[0]["en"]
+    assert "heat stress" in lines[1]["en"]
+
+
+def test_analyze_fills_every_template_slot(payload):
+    fields = forecast.analyze(payload)
+    assert set(fields) >= {"temp_min", "temp_max", "rain_probability", "rain_mm", "daily_outlook", "gdd_total", "spray_windows", "advisory"}
+    assert fields["gdd_total"] == pytest.approx(forecast.daily_summary(forecast.forecast_frame(payload))["gdd"].sum())
+
+
+@pytest.fixture
+def current():
+    return load_fixture("openweather_current.json")
+
+
+def serve(monkeypatch, current, forecast_data):
+    """Answers weather_client.fetch with the given payloads instead of calling OpenWeather."""
+    monkeypatch.setattr(config, "WEATHER_API_KEY", "test")
+    monkeypatch.setattr(weather.weather_client, "fetch", lambda location: (current, forecast_data))
+
+
+def test_empty_forecast_is_reported_as_unavailable(monkeypatch, current):
+    serve(monkeypatch, current, {"list": []})
+    assert weather.get_weather_forecast("Indore").template_id == "weather_unavailable"
+
+
+def test_wind_is_reported_in_km_per_hour(monkeypatch, current, payload):
+    serve(monkeypatch, current, payload)
+    response = weather.get_weather_forecast("Indore")
+    assert response.template_id == "weather_report"
+    assert response.data["wind_speed"] == round(current["wind"]["speed"] * 3.6, 1)
+    assert "nan" not in response.render("en")
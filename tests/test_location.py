@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from agents.location import CITIES_HI_PATH, CITY_ALIASES_PATH, LOCATION_INDEX, LocationIndex, build_location_index, extract_location
+
+
+@pytest.mark.parametrize("query, city", [
+    ("soyabean price in indore", "Indore"),
+    ("price in dilli", "Delhi"),
+    ("bombay weather", "Mumbai"),
+    ("banglore rain", "Bangalore"),
+    ("puskhkar mela", "Pushkar"),
+    ("इंदौर में सोयाबीन का भाव", "Indore"),
+    ("इन्दौर मंडी", "Indore"),
+    ("दिल्ली का मौसम", "Delhi"),
+    ("नई दिल्ली का मौसम", "New Delhi"),
+    ("weather in new delhi", "New Delhi"),
+    ("NEW   DELHI, tomorrow?", "New Delhi"),
+])
+def test_city_names_and_aliases_resolve(query, city):
+    assert LOCATION_INDEX.find(query) == city
+
+
+def test_every_hindi_name_resolves_to_its_city():
+    with open(CITIES_HI_PATH, encoding="utf-8") as f:
+        hindi = json.load(f)
+    assert isinstance(hindi, dict) and hindi
+    for canonical, name in hindi.items():
+        assert LOCATION_INDEX.find(name) == canonical, name
+
+
+def test_every_alias_resolves_to_its_city():
+    with open(CITY_ALIASES_PATH, encoding="utf-8") as f:
+        aliases = json.load(f)
+    for canonical, names in aliases.items():
+        for name in names:
+            assert LOCATION_INDEX.find(name) == canonical, name
+
+
+def test_names_match_whole_words_only():
+    assert LOCATION_INDEX.find("indoreans and puneites") is None
+    assert LOCATION_INDEX.find("what should I grow") is None
+
+
+def test_longest_name_wins_and_order_is_kept():
+    index = LocationIndex()
+    index.add("Delhi", "Delhi")
+    index.add("New Delhi", "New Delhi")
+    index.add("Indore", "Indore")
+    assert index.find_all("from new delhi to indore via delhi") == ["New Delhi", "Indore", "Delhi"]
+    assert index.find_all("new york") == []
+
+
+def test_build_merges_hindi_names_and_aliases(tmp_path):
+    cities, hindi, aliases = tmp_path / "data.json", tmp_path / "hi.json", tmp_path / "aliases.json"
+    cities.write_text(json.dumps(["Indore", "Pune"]), encoding="utf-8")
+    hindi.write_text(json.dumps({"Indore": "इंदौर"}), encoding="utf-8")
+    aliases.write_text(json.dumps({"Indore": ["indor"], "Kota": ["कोटा"]}), encoding="utf-8")
+    index = build_location_index(str(cities), str(hindi), str(aliases))
+    assert [index.find(name) for name in ("indore", "इंदौर", "indor", "pune", "कोटा")] == ["Indore", "Indore", "Indore", "Pune", "Kota"]
+    assert len(index) == 3
+
+
+def test_extract_location_uses_the_index_first(monkeypatch):
+    from agents import location
+
+    monkeypatch.setattr(location.nlp_model, "get", lambda: pytest.fail("NER must not run for a known city"))
+    assert extract_location("mandi bhav bombay") == "Mumbai"
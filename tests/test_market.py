@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from agents import market
+from benchmarks.stub_server import load_fixture
+from services.mandi_client import MandiPriceStore, MandiUnavailable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FixtureSession:
+    """requests.Session stand-in serving benchmarks/fixtures/mandi_<slug>.html; counts requests per slug."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        slug = url.rsplit("/", 1)[-1]
+        self.requests.append(slug)
+        try:
+            return SimpleNamespace(status_code=200, text=load_fixture(f"mandi_{slug}.html").decode("utf-8"))
+        except FileNotFoundError:
+            return SimpleNamespace(status_code=404, text="")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def store():
+    store = MandiPriceStore(["wheat", "soyabean-soyabean", "cotton-kapas"], base_url="http://mandi.test",
+                            session=FixtureSession(), refresh_interval=3600, table_parser="stdlib")
+    yield store
+    store.close()
+
+
+def test_lookup_by_market_name(store):
+    price = store.lookup("wheat", "Indore")
+    assert price.market == "Indore (Madhya Pradesh)"
+    assert (price.min_price, price.max_price, price.modal_price) == (2701.0, 2856.0, 2775.0)
+    assert store.lookup("wheat", "indore (madhya pradesh)") == price
+    assert store.lookup("wheat", "atlantis") is None
+
+
+def test_each_commodity_page_is_fetched_once(store):
+    for location in ("indore", "ujjain", "dewas"):
+        store.lookup("wheat", location)
+    store.lookup("cotton-kapas", "indore")
+    assert store.session.requests == ["wheat", "cotton-kapas"]
+
+
+def test_prefetch_loads_every_commodity(store):
+    assert store.prefetch() == {}
+    assert sorted(store.session.requests) == ["cotton-kapas", "soyabean-soyabean", "wheat"]
+    errors = store.prefetch(["rice"])
+    assert isinstance(errors["rice"], MandiUnavailable)
+
+
+def test_import_does_not_open_the_store(tmp_path):
+    history = tmp_path / "prices.sqlite"
+    script = ("import threading, agents.market as market; "
+              "assert market._market_store is None; "
+              "assert not any(thread.name.startswith('mandi') for thread in threading.enumerate())")
+    env = dict(os.environ, MANDI_HISTORY_PATH=str(history), PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+    assert not history.exists()
+
+
+@pytest.fixture
+def market_store(monkeypatch, store):
+    monkeypatch.setattr(market, "_market_store", store)
+    return store
+
+
+def test_reply_title_cases_the_location(market_store):
+    response = market.get_market_price("wheat price", "indore")
+    assert response.template_id == "market_price"
+    assert response.data["location"] == "Indore"
+    assert response.data["modal_price"] == 2775.0
+
+    missing = market.get_market_price("gehu ka bhav", "navi mumbai")
+    assert missing.template_id == "market_not_found"
+    assert missing.data["location"] == "Navi Mumbai"
+
+
+def test_unknown_crop_links_the_commodity_list(market_store):
+    response = market.get_market_price("price of saffron", "indore")
+    assert response.template_id == "market_unknown_crop"
+    assert market_store.session.requests == []
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from model.postprocessing import ClassIndex, DiagnosisResult, calibrate, fit_temperature, postprocess
+
+CLASSES = ["Tomato leaf", "Tomato leaf late blight", "Potato leaf early blight", "Potato leaf"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ClassIndex(CLASSES, {"Tomato leaf late blight": "Spray copper."}, "No remedy.")
+
+
+def test_class_index_tables(index):
+    np.testing.assert_array_equal(index.is_disease, [0, 1, 1, 0])
+    assert index.crops == ["Potato", "Tomato"]
+
+
+def test_top_k_is_ordered_by_probability(index):
+    result, = postprocess([[0.1, 0.6, 0.05, 0.25]], index, top_k=3)
+    assert [name for name, _ in result.top_k] == ["Tomato leaf late blight", "Potato leaf", "Tomato leaf"]
+    assert result.class_name == "Tomato leaf late blight"
+    assert result.confidence == pytest.approx(0.6)
+    assert not result.is_healthy
+    assert result.remedy == "Spray copper."
+    assert result.disease_probability == pytest.approx(0.65)
+    assert result.crop_scores == pytest.approx({"Potato": 0.3, "Tomato": 0.7})
+
+
+def test_ties_keep_class_order(index):
+    result, = postprocess([[0.1, 0.3, 0.3, 0.3]], index, top_k=4)
+    assert [name for name, _ in result.top_k] == CLASSES[1:] + CLASSES[:1]
+    assert result.class_index == 1
+
+
+def test_batch_rows_are_independent(index):
+    results = postprocess(np.eye(4), index, top_k=2)
+    assert [result.class_index for result in results] == [0, 1, 2, 3]
+    assert [result.is_healthy for result in results] == [True, False, False, True]
+
+
+def test_low_confidence_is_uncertain(index):
+    result, = postprocess([[0.3, 0.3, 0.2, 0.2]], index, uncertainty_threshold=0.4)
+    assert result.uncertain
+    assert result.template_id == "diagnosis_uncertain"
+    assert DiagnosisResult.from_error("image_unreadable").template_id == "diagnosis_image_unreadable"
+
+
+def test_calibration_softens_and_keeps_the_argmax():
+    probabilities = np.array([[0.9, 0.08, 0.02]])
+    softened = calibrate(probabilities, 2.0)
+    assert softened.sum() == pytest.approx(1.0)
+    assert softened.argmax() == 0
+    assert softened[0, 0] < 0.9
+
+
+def test_fit_temperature_recovers_an_overconfident_model():
+    rng = np.random.default_rng(0)
+    logits = rng.normal(size=(2000, 4)) * 2
+    true = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+    labels = np.array([rng.choice(4, p=row) for row in true])
+    overconfident = calibrate(true, 0.5)
+    assert fit_temperature(overconfident, labels) == pytest.approx(2.0, abs=0.3)
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agents import market
+from services.mandi_client import MarketPrice
+from services.price_history import PriceHistory
+from services.price_table import to_price_table
+
+INDORE = "Indore (Madhya Pradesh)"
+UJJAIN = "Ujjain (Madhya Pradesh)"
+
+
+def table(*rows):
+    """PriceTable from (market, variety, modal price, date) rows; min/max are modal -/+ 100."""
+    return to_price_table([
+        [market, variety, str(modal - 100), str(modal + 100), str(modal), day]
+        for market, variety, modal, day in rows
+    ])
+
+
+def daily(history, prices, market=INDORE, start=1):
+    """Records one modal price per day from 2026-08-`start`."""
+    for offset, modal in enumerate(prices):
+        history.record("wheat", table((market, "Lokwan", modal, f"{start + offset:02d}-Aug-2026")))
+
+
+@pytest.fixture
+def history():
+    return PriceHistory(":memory:")
+
+
+def test_empty_history(history):
+    assert history.week_over_week("wheat", INDORE) is None
+    assert history.moving_average("wheat", INDORE).empty
+    assert history.best_market("wheat") is None
+    assert history.stats()["rows"] == 0
+
+
+def test_single_point(history):
+    daily(history, [2500])
+    assert history.week_over_week("wheat", INDORE) is None
+    averages = history.moving_average("wheat", INDORE)
+    assert averages["moving_average"].tolist() == [2500.0]
+
+
+def test_same_day_is_recorded_once(history):
+    history.record("wheat", table((INDORE, "Lokwan", 2500, "05-Aug-2026")))
+    history.record("wheat", table((INDORE, "Lokwan", 2600, "05-Aug-2026")))
+    assert history.stats()["rows"] == 1
+    assert history.frame("wheat", INDORE)["modal_price"].tolist() == [2600.0]
+
+
+def test_undated_rows_use_the_default_date(history):
+    history.record("wheat", to_price_table([[INDORE, "Lokwan", "2400", "2600", "2500"]]), default_date="2026-08-05")
+    assert history.stats()["first_date"] == "2026-08-05"
+
+
+def test_varieties_are_averaged_per_day(history):
+    history.record("wheat", table((INDORE, "Lokwan", 2400, "05-Aug-2026"), (INDORE, "Sharbati", 3000, "05-Aug-2026")))
+    assert history.frame("wheat", INDORE)["modal_price"].tolist() == [2700.0]
+
+
+def test_week_over_week_and_moving_average(history):
+    daily(history, [2000, 2000, 2000, 2000, 2000, 2000, 2000, 2200])
+    latest, week_ago, pct = history.week_over_week("wheat", INDORE)
+    assert (latest, week_ago, pct) == (2200.0, 2000.0, pytest.approx(10.0))
+    # Trailing 7 days: six days at 2000 and one at 2200
+    assert history.moving_average("wheat", INDORE)["moving_average"].iloc[-1] == pytest.approx(2000 + 200 / 7)
+
+
+def test_best_market_in_region(history):
+    daily(history, [2500, 2550], market=INDORE)
+    daily(history, [2700, 2650], market=UJJAIN)
+    daily(history, [3000, 3000], market="Kota (Rajasthan)")
+    assert history.best_market("wheat", region="Madhya Pradesh") == (UJJAIN, 2650.0)
+    assert history.best_market("wheat", region="Madhya Pradesh", exclude=UJJAIN) == (INDORE, 2550.0)
+
+
+@pytest.fixture
+def trend(monkeypatch, history):
+    monkeypatch.setattr(market, "_market_store", SimpleNamespace(history=history))
+    return lambda modal: [line["en"] for line in market.price_trend("wheat", MarketPrice(INDORE, modal - 100, modal + 100, modal))]
+
+
+def test_trend_without_a_week_of_history(history, trend):
+    daily(history, [2500])
+    assert trend(2500) == [market.NO_HISTORY["en"]]
+
+
+def test_rising_trend_and_a_better_market(history, trend):
+    daily(history, [2000] * 7 + [2200])
+    daily(history, [2400], market=UJJAIN, start=8)
+    lines = trend(2200)
+    assert "+10.0%" in lines[0]
+    assert lines[1].startswith("📈")
+    assert UJJAIN in lines[2]
+
+
+def test_falling_and_steady_trends(history, trend):
+    daily(history, [2000] * 7 + [1900])
+    assert trend(1900)[1].startswith("📉")
+    # 21 Aug at 1910 against 13 Aug at 1905
+    history.record("wheat", table((INDORE, "Lokwan", 1905, "13-Aug-2026")))
+    daily(history, [1910], start=21)
+    assert trend(1910)[1].startswith("➖")
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from benchmarks.stub_server import load_fixture
+from services import price_table
+from services.price_table import TABLE_BACKENDS, backend_available, extract_price_table, parse_date, parse_price, resolve_backend
+
+FIXTURES = ["mandi_wheat.html", "mandi_soyabean-soyabean.html", "mandi_cotton-kapas.html"]
+AVAILABLE = [name for name in TABLE_BACKENDS if backend_available(name)]
+
+
+@pytest.fixture(scope="module", params=FIXTURES)
+def page(request):
+    return load_fixture(request.param).decode("utf-8")
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_backends_parse_the_same_rows(page, backend):
+    expected = extract_price_table(page, "stdlib")
+    table = extract_price_table(page, backend)
+    assert len(table) == len(expected) > 0
+    assert table.markets == expected.markets
+    assert table.varieties == expected.varieties
+    assert table.dates == expected.dates
+    for column in ("min_price", "max_price", "modal_price"):
+        np.testing.assert_array_equal(getattr(table, column), getattr(expected, column))
+
+
+def test_wheat_fixture_rows():
+    table = extract_price_table(load_fixture("mandi_wheat.html").decode("utf-8"))
+    assert table.markets[0] == "Indore (Madhya Pradesh)"
+    assert (table.min_price[0], table.max_price[0], table.modal_price[0]) == (2701.0, 2856.0, 2775.0)
+    assert np.all(table.min_price <= table.max_price)
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_page_without_a_table(backend):
+    assert extract_price_table("<html><body><p>Maintenance</p></body></html>", backend) is None
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_rows_without_prices_are_skipped(backend):
+    html = ("<table><tr><th>Market</th></tr>"
+            "<tr><td>Indore</td><td>Lokwan</td><td>₹2,500</td><td>₹2,900</td><td>₹2,700</td><td>05-Aug-2026</td></tr>"
+            "<tr><td>Dewas</td><td>Lokwan</td><td>NR</td><td>NR</td><td>NR</td></tr></table>")
+    table = extract_price_table(html, backend)
+    assert table.markets == ["Indore"]
+    assert table.dates == ["2026-08-05"]
+    assert table.modal_price.tolist() == [2700.0]
+
+
+def test_cell_parsers():
+    assert parse_price("₹4,525 ") == 4525.0
+    assert parse_date("05-Aug-2026") == "2026-08-05"
+    assert parse_date("today") is None
+
+
+def test_auto_picks_the_fastest_installed_backend(monkeypatch):
+    monkeypatch.setattr(price_table, "backend_available", lambda name: name != "selectolax")
+    assert resolve_backend("auto") == "lxml"
+    monkeypatch.setattr(price_table, "backend_available", lambda name: name in ("stdlib", "bs4"))
+    assert resolve_backend("auto") == "stdlib"
+
+
+def test_missing_backend_falls_back(monkeypatch, capsys):
+    monkeypatch.setattr(price_table, "backend_available", lambda name: name == "stdlib")
+    assert resolve_backend("selectolax") == "stdlib"
+    assert "not installed" in capsys.readouterr().out
+    assert resolve_backend("stdlib") == "stdlib"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend("regex")
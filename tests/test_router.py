@@ -0,0 +1,106 @@
+import ast
+import os
+import re
+
+import pytest
+
+from agents.dispatch import intent_router
+from agents.intent_classifier import IntentClassifier, train_from_file
+from agents.router import IntentRouter, create_default_router
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture(scope="module")
+def router():
+    return create_default_router()
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("soyabean price in indore", "price"),
+    ("what are the mandi rates today", "price"),
+    ("इंदौर में सोयाबीन का भाव", "price"),
+    ("weather forecast for pune", "weather"),
+    ("will it rain tomorrow", "weather"),
+    ("कल मौसम कैसा रहेगा", "weather"),
+    ("my tomato leaves have brown spots", "disease"),
+    ("पत्तों पर कीट लगे हैं", "disease"),
+])
+def test_keyword_intents(router, query, intent):
+    assert router.classify(query) == intent
+
+
+def test_keywords_match_whole_words_only(router):
+    # "ill" inside "will", "rate" inside "accurate"
+    assert router.classify("will you be accurate") is None
+
+
+def test_strong_keywords_outweigh_weak_ones(router):
+    assert router.classify("price of plant leaves") == "price"
+
+
+def test_resolve_returns_the_registered_handler():
+    router = IntentRouter()
+    handler = lambda query: "answered"
+    router.register("price", ["price"], handler=handler)
+    assert router.resolve("price of wheat") == ("price", handler)
+    assert router.route("price of wheat") == "answered"
+    assert router.route("hello") is None
+
+
+class FixedClassifier:
+    def __init__(self, intent, confidence, margin=1.0):
+        self.prediction = (intent, confidence, margin)
+
+    def predict(self, queries):
+        return [self.prediction] * len(queries)
+
+
+def test_classifier_is_used_only_when_confident():
+    confident = create_default_router(FixedClassifier("weather", 0.9), min_confidence=0.7)
+    unsure = create_default_router(FixedClassifier("weather", 0.5), min_confidence=0.7)
+    assert confident.classify("soyabean price") == "weather"
+    assert unsure.classify("soyabean price") == "price"
+
+
+def test_classifier_needs_a_margin_over_the_runner_up():
+    close_call = create_default_router(FixedClassifier("weather", 0.72, 0.2), min_confidence=0.7, min_margin=0.4)
+    clear = create_default_router(FixedClassifier("weather", 0.72, 0.5), min_confidence=0.7, min_margin=0.4)
+    assert close_call.classify("soyabean price") == "price"
+    assert clear.classify("soyabean price") == "weather"
+
+
+def test_predict_reports_the_margin():
+    classifier = IntentClassifier.train(["wheat price", "rain today", "hello"], ["price", "weather", "other"])
+    (intent, probability, margin), = classifier.predict(["wheat price"])
+    probabilities = sorted(classifier.predict_proba(["wheat price"])[0], reverse=True)
+    assert intent == "price"
+    assert probability == pytest.approx(probabilities[0])
+    assert margin == pytest.approx(probabilities[0] - probabilities[1])
+
+
+@pytest.mark.parametrize("query", ["what should I grow", "मुझे क्या उगाना चाहिए?", "कौन सी फसल बोऊं?", "best crop this month"])
+def test_crop_choice_questions_reach_no_agent(query):
+    assert intent_router.classify(query) is None
+
+
+def home_card_texts():
+    """Every language's text of each home-screen card in app.py (the text a click submits)."""
+    with open(APP_PATH, encoding="utf-8") as f:
+        source = f.read()
+    text_node = next(node.value for node in ast.parse(source).body
+                     if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "TEXT")
+    text = {}
+    for key, value in zip(text_node.keys, text_node.values):
+        try:
+            text[ast.literal_eval(key)] = ast.literal_eval(value)
+        except ValueError:
+            pass  # entries built from other values, none of them cards
+    keys = re.findall(r'"desc": TEXT\[\'(\w+)\'\]\[lang\]', source)
+    assert keys, "no home cards found in app.py"
+    return [text[key][lang] for key in keys for lang in text[key]]
+
+
+@pytest.mark.parametrize("query", home_card_texts())
+def test_home_cards_route_like_the_keyword_router(query):
+    assert intent_router.classify(query) == intent_router.classify_keywords(query)
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from model import pest_detector
+from model.batching import MicroBatcher
+from services import tracing
+from services.executor import AgentExecutor
+from services.tracing import Tracer, span, summarize_log, traced
+
+
+@pytest.fixture
+def trace_log(tmp_path, monkeypatch):
+    """Enables tracing into a temporary log; returns a function reading back its spans by name."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(enabled=True, log_path=str(path), window=100)
+    monkeypatch.setattr(tracing, "tracer", tracer)
+
+    def spans():
+        tracer.close()
+        return {record["name"]: record for record in map(json.loads, path.read_text(encoding="utf-8").splitlines())}
+    return spans
+
+
+def test_nested_spans_share_the_trace(trace_log):
+    @traced("extract_location")
+    def extract():
+        tracing.current_span().set(city="Indore")
+
+    with span("route_query"):
+        extract()
+    spans = trace_log()
+    assert spans["extract_location"]["parent"] == spans["route_query"]["span"]
+    assert spans["extract_location"]["trace"] == spans["route_query"]["trace"]
+    assert spans["extract_location"]["attributes"] == {"city": "Indore"}
+
+
+def test_agent_pool_calls_join_the_callers_trace(trace_log):
+    def agent():
+        with span("agent.price"):
+            pass
+
+    executor = AgentExecutor(max_workers=2)
+    try:
+        with span("route_query"):
+            executor.submit("price", agent).result()
+    finally:
+        executor.shutdown()
+    spans = trace_log()
+    assert spans["agent.price"]["parent"] == spans["route_query"]["span"]
+
+
+def test_batched_prediction_is_a_child_of_the_caller(trace_log, monkeypatch):
+    monkeypatch.setattr(pest_detector.pest_model, "get", lambda: lambda batch: np.ones((len(batch), 3)) / 3)
+    batcher = MicroBatcher(pest_detector._forward, max_batch_size=4, max_wait_ms=1)
+    monkeypatch.setattr(pest_detector, "_batcher", batcher)
+    try:
+        with span("route_query"):
+            row = pest_detector._predict_queued(np.zeros((2, 2, 3), dtype=np.float32))
+    finally:
+        batcher.close()
+    assert row.shape == (3,)
+    spans = trace_log()
+    predict = spans["model.predict"]
+    assert predict["parent"] == spans["route_query"]["span"]
+    assert predict["trace"] == spans["route_query"]["trace"]
+    assert predict["attributes"]["batch_size"] == 1
+    assert predict["attributes"]["forward_ms"] >= 0
+
+
+def test_disabled_tracing_records_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "tracer", Tracer(enabled=False, log_path=str(tmp_path / "traces.jsonl")))
+    with span("route_query") as trace:
+        trace.set(intent="price")
+    assert tracing.tracer.summary() == {}
+    assert not (tmp_path / "traces.jsonl").exists()
+
+
+def test_summary_and_offline_log_agree(trace_log, tmp_path):
+    for _ in range(3):
+        with span("translate"):
+            pass
+    summary = tracing.tracer.summary()
+    trace_log()
+    assert summary["translate"]["count"] == summarize_log(str(tmp_path / "traces.jsonl"))["translate"]["count"] == 3
+    assert 'stage="translate"' in tracing.tracer.prometheus_text()
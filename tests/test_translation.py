@@ -0,0 +1,97 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from services.translation import SEGMENT_MARKER, GoogleTransBackend, OfflineBackend, TranslationService
+
+PHRASES = {"Price": "भाव", "Weather": "मौसम", "Rain": "बारिश"}
+
+
+class FakeTranslator:
+    """googletrans.Translator stand-in: translates known words and lets `mangle` edit batched replies."""
+
+    def __init__(self, mangle=lambda text: text):
+        self.mangle = mangle
+        self.requests = []
+
+    def translate(self, text, dest, raise_exception=False):
+        self.requests.append(text)
+        for source, translated in PHRASES.items():
+            text = text.replace(source, translated)
+        return SimpleNamespace(text=self.mangle(text) if "[[" in text else text)
+
+
+def backend_with(translator):
+    backend = GoogleTransBackend()
+    backend._translator = translator
+    return backend
+
+
+def test_batch_goes_out_as_one_marked_request():
+    translator = FakeTranslator()
+    assert backend_with(translator).translate_batch(["Price", "Weather", "Rain"], "hi") == ["भाव", "मौसम", "बारिश"]
+    assert translator.requests == ["\n".join(SEGMENT_MARKER.format(i) + text for i, text in enumerate(["Price", "Weather", "Rain"]))]
+
+
+def test_markers_with_devanagari_digits_and_extra_spaces_still_split():
+    translator = FakeTranslator(lambda text: text.replace("[[1]] ", "[[१]]   ").replace("\n", " "))
+    assert backend_with(translator).translate_batch(["Price", "Weather"], "hi") == ["भाव", "मौसम"]
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda text: text.replace("[[1]] ", ""),                          # dropped marker: two segments merged
+    lambda text: text.replace("[[1]]", "[[2]]"),                      # altered marker
+    lambda text: "Note: " + text,                                     # text before the first marker
+    lambda text: "\n".join(reversed(text.split("\n"))),              # reordered segments
+])
+def test_mangled_markers_fall_back_to_one_request_per_text(mangle):
+    translator = FakeTranslator(mangle)
+    assert backend_with(translator).translate_batch(["Price", "Weather", "Rain"], "hi") == ["भाव", "मौसम", "बारिश"]
+    assert translator.requests[1:] == ["Price", "Weather", "Rain"]
+
+
+def test_texts_containing_markers_are_sent_one_by_one():
+    translator = FakeTranslator()
+    assert backend_with(translator).translate_batch(["[[0]] Price", "Rain"], "hi") == ["[[0]] भाव", "बारिश"]
+    assert translator.requests == ["[[0]] Price", "Rain"]
+
+
+def test_requests_run_concurrently():
+    inside = threading.Barrier(2, timeout=5)
+
+    class BlockingTranslator(FakeTranslator):
+        def translate(self, text, dest, raise_exception=False):
+            inside.wait()  # both threads must be in a request at the same time
+            return super().translate(text, dest, raise_exception)
+
+    backend = backend_with(BlockingTranslator())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(backend.translate_batch(["Rain"], "hi"))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == [["बारिश"], ["बारिश"]]
+
+
+def test_service_sends_only_uncached_segments(tmp_path):
+    backend = OfflineBackend({"hi": PHRASES})
+    path = str(tmp_path / "translations.sqlite")
+    service = TranslationService(backend, path)
+    assert service.translate("Price\n  Rain") == "भाव\n  बारिश"
+    assert service.translate_batch(["Rain", "Weather", ""]) == ["बारिश", "मौसम", ""]
+    assert backend.requests == 2
+
+    # A new process starts from the persisted cache
+    reopened = TranslationService(OfflineBackend(), path)
+    assert reopened.translate_batch(["Price", "Weather"]) == ["भाव", "मौसम"]
+    assert reopened.backend.requests == 0
+
+
+def test_backend_errors_return_the_original_text():
+    class FailingBackend:
+        def translate_batch(self, texts, dest):
+            raise ConnectionError("offline")
+
+    assert TranslationService(FailingBackend()).translate_batch(["Price"]) == ["Price"]
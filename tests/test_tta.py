@@ -0,0 +1,39 @@
+import pytest
+
+from model.tta import VIEWS, ViewBudget, view_box
+
+
+def test_all_views_before_the_first_observation():
+    assert ViewBudget(100, max_views=4).views() == 4
+
+
+def test_fitted_fixed_and_per_view_cost():
+    budget = ViewBudget(50, max_views=8, smoothing=0.5)
+    # 40 ms fixed + 5 ms per view
+    for views in (1, 4, 2, 8, 1, 4):
+        budget.record(views, (40 + 5 * views) / 1000)
+    assert budget.predict_ms(3) == pytest.approx(55)
+    assert budget.views() == 2
+    stats = budget.stats()
+    assert stats["fixed_ms"] == pytest.approx(40)
+    assert stats["ms_per_view"] == pytest.approx(5)
+
+
+def test_single_view_count_scales_in_proportion():
+    budget = ViewBudget(100, max_views=8)
+    budget.record(2, 0.04)
+    assert budget.predict_ms(1) == pytest.approx(40)
+    assert budget.predict_ms(4) == pytest.approx(80)
+    assert budget.views() == 5
+
+
+def test_never_fewer_than_one_view():
+    budget = ViewBudget(1, max_views=4)
+    budget.record(1, 1.0)
+    assert budget.views() == 1
+
+
+@pytest.mark.parametrize("name", VIEWS)
+def test_view_boxes_stay_inside_the_photo(name):
+    y1, x1, y2, x2 = view_box(name, 480, 640)
+    assert 0 <= y1 < y2 <= 1 and 0 <= x1 < x2 <= 1
@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.ttl_cache import TTLCache
+
+
+def test_concurrent_misses_call_the_loader_once():
+    calls = []
+    release = threading.Event()
+
+    def loader(key):
+        calls.append(key)
+        release.wait(5)
+        return key.upper()
+
+    cache = TTLCache(loader, ttl=60)
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(cache.get, "indore") for _ in range(8)]
+        # Let every caller reach the cache before the one load finishes
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+    assert results == ["INDORE"] * 8
+    assert calls == ["indore"]
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_hits_within_ttl_and_reload_after():
+    calls = []
+    cache = TTLCache(lambda key: calls.append(key) or len(calls), ttl=0.05)
+    assert cache.get("pune") == 1
+    assert cache.get("pune") == 1
+    time.sleep(0.06)
+    assert cache.get("pune") == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_value_is_served_when_a_reload_fails():
+    values = iter([1])
+
+    def loader(key):
+        return next(values)  # StopIteration on the second load
+
+    cache = TTLCache(loader, ttl=0.01, stale_ttl=60)
+    assert cache.get("pune") == 1
+    time.sleep(0.02)
+    assert cache.get("pune") == 1
+    assert cache.stats()["stale_served"] == 1
+
+
+def test_loader_errors_propagate_without_a_stale_value():
+    def loader(key):
+        raise ValueError("upstream down")
+
+    cache = TTLCache(loader, ttl=60)
+    with pytest.raises(ValueError):
+        cache.get("pune")
+
+
+def test_request_counts_stay_bounded():
+    cache = TTLCache(str, ttl=60, max_entries=10)
+    for i in range(1000):
+        cache.get(f"city-{i}")
+        if i % 5 == 0:
+            cache.get("popular")
+    assert len(cache.requests) <= cache.max_tracked
+    assert cache.most_requested(1) == ["popular"]